@@ -0,0 +1,102 @@
+import { prisma } from '@/lib/db/prisma';
+
+// 进度中继地址（backend/scraper/scripts/progress_relay.py）
+const PROGRESS_RELAY_URL = process.env.PROGRESS_RELAY_URL || 'http://127.0.0.1:8765';
+
+const NDJSON_HEADERS = {
+  'Content-Type': 'application/x-ndjson; charset=utf-8',
+  'Cache-Control': 'no-cache',
+};
+
+// 与 NOTIFY crawl_progress 负载相同格式的一行
+function taskLine(task: { id: number; status: string; progress: number; message: string | null; total_repositories: number | null }) {
+  return JSON.stringify({
+    id: task.id,
+    status: task.status,
+    progress: task.progress,
+    message: task.message || '',
+    total: task.total_repositories ?? undefined,
+  }) + '\n';
+}
+
+// 订阅爬虫任务进度（NDJSON 流）：先返回数据库中的当前状态，之后转发进度中继推送的更新，
+// 任务结束后关闭；中继不可用时只返回当前状态，客户端可退回轮询
+export async function GET(request: Request) {
+  const { searchParams } = new URL(request.url);
+  const taskId = parseInt(searchParams.get('taskId') || '', 10);
+
+  if (!Number.isInteger(taskId)) {
+    return new Response(JSON.stringify({ error: '任务ID无效' }) + '\n', { status: 400, headers: NDJSON_HEADERS });
+  }
+
+  try {
+    const task = await prisma.crawlTask.findUnique({ where: { id: taskId } });
+    if (!task) {
+      return new Response(JSON.stringify({ error: '未找到指定的任务' }) + '\n', { status: 404, headers: NDJSON_HEADERS });
+    }
+
+    const initial = taskLine(task);
+    if (task.status === 'completed' || task.status === 'failed') {
+      return new Response(initial, { headers: NDJSON_HEADERS });
+    }
+
+    let upstream: Response;
+    try {
+      upstream = await fetch(`${PROGRESS_RELAY_URL}/progress?task_id=${taskId}`, {
+        signal: request.signal,
+        cache: 'no-store',
+      });
+    } catch (error) {
+      console.warn('进度中继不可用，只返回当前状态:', error);
+      return new Response(initial, { headers: NDJSON_HEADERS });
+    }
+    if (!upstream.ok || !upstream.body) {
+      return new Response(initial, { headers: NDJSON_HEADERS });
+    }
+
+    // 读取当前状态与订阅中继之间任务可能已经结束，订阅后再确认一次
+    const latest = await prisma.crawlTask.findUnique({ where: { id: taskId } });
+    if (latest && (latest.status === 'completed' || latest.status === 'failed')) {
+      upstream.body.cancel().catch(() => {});
+      return new Response(initial + taskLine(latest), { headers: NDJSON_HEADERS });
+    }
+
+    const encoder = new TextEncoder();
+    const relayBody = upstream.body;
+    // 客户端断开后 cancel() 先于 start() 的循环结束执行，此后不能再 enqueue / close
+    let closed = false;
+    const stream = new ReadableStream<Uint8Array>({
+      async start(controller) {
+        controller.enqueue(encoder.encode(initial));
+        const reader = relayBody.getReader();
+        try {
+          while (!closed) {
+            const { done, value } = await reader.read();
+            if (done || closed) break;
+            controller.enqueue(value);
+          }
+        } catch (error) {
+          // 客户端断开或中继中断
+        } finally {
+          if (!closed) {
+            closed = true;
+            try {
+              controller.close();
+            } catch (error) {
+              // 流已被取消
+            }
+          }
+        }
+      },
+      cancel() {
+        closed = true;
+        relayBody.cancel().catch(() => {});
+      },
+    });
+
+    return new Response(stream, { headers: NDJSON_HEADERS });
+  } catch (error) {
+    console.error('订阅任务进度失败:', error);
+    return new Response(JSON.stringify({ error: '订阅任务进度失败，请稍后再试' }) + '\n', { status: 500, headers: NDJSON_HEADERS });
+  }
+}
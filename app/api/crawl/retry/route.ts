@@ -1,20 +1,13 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { prisma } from '@/lib/db/prisma';
+import { updateCrawlTaskStatus } from '@/lib/db/crawl-progress';
 import { exec } from 'child_process';
 import path from 'path';
 
 // 更新任务状态的辅助函数
 async function updateTaskStatus(taskId: number, status: string, progress: number, message: string) {
   try {
-    await prisma.crawlTask.update({
-      where: { id: taskId },
-      data: {
-        status,
-        progress,
-        message,
-        ...(status === 'completed' ? { completed_at: new Date() } : {})
-      }
-    });
+    await updateCrawlTaskStatus(taskId, status, progress, message);
   } catch (error) {
     console.error('更新任务状态失败:', error);
   }
@@ -137,6 +130,9 @@ export async function POST(request: NextRequest) {
     
     // 构建爬虫命令（使用默认参数）
     let cmd = `${PYTHON_BIN} "${scraperPath}" --keywords "${keyword}" --task-id ${retryTask.id}`;
+
+    // 从原任务的检查点恢复，已完成的搜索页、补全和代码分析不再重复请求
+    cmd += ` --resume-from ${originalTask.id}`;
     
     // 添加默认语言参数
     cmd += ` --languages "python,java,javascript"`;
@@ -67,6 +67,18 @@ export async function DELETE(
         fs.unlinkSync(analysisFile)
         console.log(`删除了分析文件: ${analysisFile}`)
       }
+
+      // 预压缩副本和仓库分页目录
+      for (const sibling of [`${analysisFile}.gz`, `${analysisFile}.br`]) {
+        if (fs.existsSync(sibling)) {
+          fs.unlinkSync(sibling)
+        }
+      }
+      const pagesDir = path.join(analysisDir, `analysis_${keyword}`)
+      if (fs.existsSync(pagesDir)) {
+        fs.rmSync(pagesDir, { recursive: true, force: true })
+        console.log(`删除了分析分页目录: ${pagesDir}`)
+      }
     } catch (fileError) {
       console.warn('删除分析文件失败:', fileError)
       // 文件删除失败不影响整体操作
@@ -202,6 +202,17 @@ export async function POST(request: NextRequest) {
           fs.unlinkSync(analysisFilePath)
           console.log(`删除了分析文件: ${analysisFile}`)
         }
+
+        // 预压缩副本和仓库分页目录
+        for (const sibling of [`${analysisFilePath}.gz`, `${analysisFilePath}.br`]) {
+          if (fs.existsSync(sibling)) {
+            fs.unlinkSync(sibling)
+          }
+        }
+        const pagesDir = analysisFilePath.replace(/\.json$/, '')
+        if (fs.existsSync(pagesDir)) {
+          fs.rmSync(pagesDir, { recursive: true, force: true })
+        }
         
         // 从 all_keywords_analysis.json 中移除
         const cleanedAllKeywordsData = allKeywordsData.filter(item => 
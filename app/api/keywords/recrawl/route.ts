@@ -1,5 +1,6 @@
 import { NextResponse } from 'next/server';
 import { prisma } from '@/lib/db/prisma';
+import { updateCrawlTaskStatus } from '@/lib/db/crawl-progress';
 import { exec } from 'child_process';
 import { promisify } from 'util';
 import path from 'path';
@@ -58,7 +59,8 @@ export async function POST(request: Request) {
       keyword, 
       languages, 
       limits,
-      codeAnalysisLimit
+      codeAnalysisLimit,
+      incremental
     } = data;
     
     if (!keyword || typeof keyword !== 'string' || keyword.trim() === '') {
@@ -152,6 +154,11 @@ export async function POST(request: Request) {
       }
     }
     
+    // 重新爬取默认走增量模式，只有显式传入 incremental: false 时才全量爬取
+    if (incremental !== false) {
+      cmd += ' --incremental';
+    }
+    
     console.log(`执行重新爬取命令: ${cmd}`);
 
     // 运行爬虫脚本 (异步执行，不等待完成) —— 显式传递必要环境变量
@@ -212,21 +219,8 @@ export async function POST(request: Request) {
 // 更新任务状态的辅助函数
 async function updateTaskStatus(taskId: number, status: string, progress: number, message?: string) {
   try {
-    const updateData: any = {
-      status,
-      progress,
-      ...(status === 'completed' || status === 'failed' ? { completed_at: new Date() } : {})
-    };
-    
-    // 只有当message有值时才添加到更新数据中
-    if (message !== undefined) {
-      updateData.message = message;
-    }
-    
-    await prisma.crawlTask.update({
-      where: { id: taskId },
-      data: updateData
-    });
+    // 只有当message有值时才更新
+    await updateCrawlTaskStatus(taskId, status, progress, message);
   } catch (error) {
     console.error(`更新任务状态失败 (ID: ${taskId}):`, error);
   }
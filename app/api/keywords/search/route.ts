@@ -1,5 +1,6 @@
 import { NextResponse } from 'next/server';
 import { prisma } from '@/lib/db/prisma';
+import { updateCrawlTaskStatus } from '@/lib/db/crawl-progress';
 import { exec } from 'child_process';
 import { promisify } from 'util';
 import path from 'path';
@@ -205,15 +206,7 @@ export async function POST(request: Request) {
 // 更新任务状态的辅助函数
 async function updateTaskStatus(taskId: number, status: string, progress: number, message?: string) {
   try {
-    await prisma.crawlTask.update({
-      where: { id: taskId },
-      data: {
-        status,
-        progress,
-        message,
-        ...(status === 'completed' || status === 'failed' ? { completed_at: new Date() } : {})
-      }
-    });
+    await updateCrawlTaskStatus(taskId, status, progress, message);
   } catch (error) {
     console.error(`更新任务状态失败 (ID: ${taskId}):`, error);
   }
@@ -11,73 +11,175 @@ interface HistoricalDate {
   fullTimestamp: string
 }
 
+// 快照存储（backend/scraper/storage/snapshot_store.py）的索引条目
+interface SnapshotEntry {
+  id: string
+  created_at: string
+  segment: string
+  type: 'keyframe' | 'delta'
+}
+
+interface ListDelta {
+  entered?: [number, any][]
+  left?: string[]
+  moved?: Record<string, number>
+  stars?: Record<string, number>
+  fields?: Record<string, Record<string, any>>
+  unset?: Record<string, string[]>
+}
+
+interface SnapshotRecord {
+  id: string
+  type: 'keyframe' | 'delta'
+  lists: Record<string, any[]> | Record<string, ListDelta>
+  meta: Record<string, any>
+}
+
+function loadSnapshotIndex(snapshotDir: string): SnapshotEntry[] {
+  const indexPath = path.join(snapshotDir, 'index.json')
+  if (!fs.existsSync(indexPath)) {
+    return []
+  }
+  return JSON.parse(fs.readFileSync(indexPath, 'utf-8')).snapshots || []
+}
+
+function applyListDelta(previous: any[], delta: ListDelta): any[] {
+  const left = new Set(delta.left || [])
+  const moved = delta.moved || {}
+  const stars = delta.stars || {}
+  const fields = delta.fields || {}
+  const unset = delta.unset || {}
+
+  const ranked: [number, any][] = []
+  previous.forEach((item, rank) => {
+    const name = item.full_name
+    if (left.has(name)) {
+      return
+    }
+    if (name in fields || name in stars || name in unset) {
+      item = { ...item, ...(fields[name] || {}) }
+      for (const key of unset[name] || []) {
+        delete item[key]
+      }
+      if (name in stars) {
+        item.stargazers_count = (item.stargazers_count || 0) + stars[name]
+      }
+    }
+    ranked.push([name in moved ? moved[name] : rank, item])
+  })
+
+  ranked.push(...(delta.entered || []))
+  ranked.sort((a, b) => a[0] - b[0])
+  return ranked.map(([, item]) => item)
+}
+
+// 从所在段的关键帧开始重放到目标快照
+function reconstructSnapshot(snapshotDir: string, entry: SnapshotEntry): Record<string, any> {
+  const lines = fs.readFileSync(path.join(snapshotDir, entry.segment), 'utf-8').split('\n')
+  let lists: Record<string, any[]> | null = null
+
+  for (const line of lines) {
+    if (!line.trim()) {
+      continue
+    }
+    const record: SnapshotRecord = JSON.parse(line)
+    if (record.type === 'keyframe') {
+      lists = { ...(record.lists as Record<string, any[]>) }
+    } else {
+      if (!lists) {
+        throw new Error(`增量快照 ${record.id} 之前缺少关键帧`)
+      }
+      for (const [key, delta] of Object.entries(record.lists as Record<string, ListDelta>)) {
+        lists[key] = applyListDelta(lists[key] || [], delta)
+      }
+    }
+    if (record.id === entry.id) {
+      return { ...lists, ...record.meta }
+    }
+  }
+
+  throw new Error(`快照 ${entry.id} 不在段 ${entry.segment} 中`)
+}
+
+function toHistoricalDate(fullTimestamp: string, filename: string): HistoricalDate | null {
+  const match = fullTimestamp.match(/^(\d{8})_(\d{6})/)
+  if (!match) {
+    return null
+  }
+  const dateStr = match[1] // YYYYMMDD
+  const timeStr = match[2] // HHMMSS
+  return {
+    date: dateStr,
+    time: timeStr,
+    filename,
+    displayDate: `${dateStr.slice(0, 4)}-${dateStr.slice(4, 6)}-${dateStr.slice(6, 8)}`,
+    displayTime: `${timeStr.slice(0, 2)}:${timeStr.slice(2, 4)}:${timeStr.slice(4, 6)}`,
+    fullTimestamp
+  }
+}
+
 export async function GET(request: NextRequest) {
   try {
     const { searchParams } = new URL(request.url)
     const date = searchParams.get('date') // 格式: YYYYMMDD 或 YYYYMMDD_HHMMSS
     const month = searchParams.get('month') // 格式: YYYYMM，用于按月查询
-    
+
     const dataDir = path.join(process.cwd(), 'public', 'trends', 'data')
-    
+    const snapshotDir = path.join(dataDir, 'snapshots')
+
+    if (!fs.existsSync(dataDir)) {
+      return NextResponse.json({
+        success: true,
+        dates: [],
+        count: 0
+      })
+    }
+
+    const snapshots = loadSnapshotIndex(snapshotDir)
+    const snapshotIds = new Set(snapshots.map(entry => entry.id))
+    // 兼容尚未导入快照存储的旧完整备份: trends_backup_20251021_161939.json
+    const legacyFiles = fs.readdirSync(dataDir)
+      .filter(file => /^trends_backup_\d{8}_\d{6}\.json$/.test(file))
+      .filter(file => !snapshotIds.has(file.slice('trends_backup_'.length, -'.json'.length)))
+
     // 如果没有指定日期，返回所有可用的历史数据日期
     if (!date) {
-      if (!fs.existsSync(dataDir)) {
-        return NextResponse.json({
-          success: true,
-          dates: [],
-          count: 0
-        })
-      }
-      
-      const files = fs.readdirSync(dataDir)
-        .filter(file => file.startsWith('trends_backup_') && file.endsWith('.json'))
-      
-      // 如果指定了月份，只返回该月的数据
-      const filteredFiles = month 
-        ? files.filter(file => file.includes(`trends_backup_${month}`))
-        : files
-      
-      const availableDates = filteredFiles
-        .map(file => {
-          // 从文件名中提取日期: trends_backup_20251021_161939.json
-          const match = file.match(/trends_backup_(\d{8})_(\d{6})\.json/)
-          if (match) {
-            const dateStr = match[1] // YYYYMMDD
-            const timeStr = match[2] // HHMMSS
-            
-            return {
-              date: dateStr,
-              time: timeStr,
-              filename: file,
-              displayDate: `${dateStr.slice(0, 4)}-${dateStr.slice(4, 6)}-${dateStr.slice(6, 8)}`,
-              displayTime: `${timeStr.slice(0, 2)}:${timeStr.slice(2, 4)}:${timeStr.slice(4, 6)}`,
-              fullTimestamp: `${dateStr}_${timeStr}`
-            }
-          }
-          return null
-        })
+      const availableDates = [
+        ...snapshots.map(entry => toHistoricalDate(entry.id, `snapshots/${entry.segment}`)),
+        ...legacyFiles.map(file => toHistoricalDate(file.slice('trends_backup_'.length, -'.json'.length), file))
+      ]
         .filter((item): item is HistoricalDate => item !== null)
+        // 如果指定了月份，只返回该月的数据
+        .filter(item => !month || item.date.startsWith(month))
         .sort((a, b) => b.fullTimestamp.localeCompare(a.fullTimestamp))
-      
+
       return NextResponse.json({
         success: true,
         dates: availableDates,
         count: availableDates.length
       })
     }
-    
-    // 查找匹配的备份文件
-    const files = fs.readdirSync(dataDir)
-    const matchingFile = files.find(file => {
-      if (date.includes('_')) {
-        // 完整的时间戳格式
-        return file === `trends_backup_${date}.json`
-      } else {
-        // 只有日期，匹配该日期的任意备份
-        return file.startsWith(`trends_backup_${date}_`) && file.endsWith('.json')
-      }
-    })
-    
+
+    // 完整时间戳精确匹配；只有日期时匹配该日期最早的一份
+    const matches = (id: string) => date.includes('_') ? id === date : id.startsWith(`${date}_`)
+
+    const matchingSnapshot = snapshots.find(entry => matches(entry.id))
+    if (matchingSnapshot) {
+      return NextResponse.json({
+        success: true,
+        data: reconstructSnapshot(snapshotDir, matchingSnapshot),
+        metadata: {
+          date: date,
+          snapshotId: matchingSnapshot.id,
+          isBackup: true
+        }
+      })
+    }
+
+    const matchingFile = legacyFiles
+      .sort()
+      .find(file => matches(file.slice('trends_backup_'.length, -'.json'.length)))
+
     if (!matchingFile) {
       // 如果没找到备份，尝试读取当前数据
       const currentDataPath = path.join(dataDir, 'trends.json')
@@ -93,17 +195,17 @@ export async function GET(request: NextRequest) {
           }
         })
       }
-      
+
       return NextResponse.json({
         success: false,
         message: `未找到日期 ${date} 的数据`
       }, { status: 404 })
     }
-    
+
     // 读取备份数据
     const filePath = path.join(dataDir, matchingFile)
     const backupData = JSON.parse(fs.readFileSync(filePath, 'utf-8'))
-    
+
     return NextResponse.json({
       success: true,
       data: backupData,
@@ -113,10 +215,10 @@ export async function GET(request: NextRequest) {
         isBackup: true
       }
     })
-    
+
   } catch (error) {
     console.error('获取历史数据失败:', error)
-    
+
     return NextResponse.json({
       success: false,
       message: '获取历史数据失败',
@@ -124,4 +226,3 @@ export async function GET(request: NextRequest) {
     }, { status: 500 })
   }
 }
-
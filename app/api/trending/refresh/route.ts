@@ -105,11 +105,36 @@ export async function GET() {
     const fs = require('fs')
     const path = require('path')
     
-    const trendsPath = path.join(process.cwd(), 'public', 'analytics', 'trends.json')
-    
-    if (fs.existsSync(trendsPath)) {
-      const stats = fs.statSync(trendsPath)
-      const data = JSON.parse(fs.readFileSync(trendsPath, 'utf8'))
+    // 调度器按时间段写入 public/analytics/trends/<period>.json，并维护 manifest.json
+    const trendsDir = path.join(process.cwd(), 'public', 'analytics', 'trends')
+    const manifestPath = path.join(trendsDir, 'manifest.json')
+    const legacyPath = path.join(process.cwd(), 'public', 'analytics', 'trends.json')
+
+    if (fs.existsSync(manifestPath)) {
+      const stats = fs.statSync(manifestPath)
+      const manifest = JSON.parse(fs.readFileSync(manifestPath, 'utf8'))
+      const periods = manifest.periods || {}
+      const fileSize = Object.values(periods).reduce((total: number, entry: any) => {
+        const periodPath = path.join(trendsDir, entry.file)
+        return total + (fs.existsSync(periodPath) ? fs.statSync(periodPath).size : 0)
+      }, 0)
+
+      return NextResponse.json({
+        exists: true,
+        lastModified: stats.mtime.toISOString(),
+        lastUpdated: manifest.lastUpdated || null,
+        version: manifest.version,
+        metadata: Object.fromEntries(
+          Object.entries(periods).map(([period, entry]: [string, any]) => [
+            period,
+            { count: entry.count, lastUpdated: entry.lastUpdated, languages: Object.keys(entry.languages || {}).length }
+          ])
+        ),
+        fileSize
+      })
+    } else if (fs.existsSync(legacyPath)) {
+      const stats = fs.statSync(legacyPath)
+      const data = JSON.parse(fs.readFileSync(legacyPath, 'utf8'))
       
       return NextResponse.json({
         exists: true,
@@ -21,6 +21,7 @@ import Link from 'next/link'
 import { ArrowLeft } from 'lucide-react'
 import { BarChartComponent, PieChartComponent } from '@/components/ui/charts'
 import CrawlerMonitor from '@/components/CrawlerMonitor'
+import { subscribeTaskProgress, isTerminalStatus } from '@/lib/crawl-progress'
 
 // 导入新组件
 import RepositoryList from '@/components/features/repository-list'
@@ -254,9 +255,14 @@ function KeywordsPage() {
     debounceTimerRef.current = window.setTimeout(() => func(), delay)
   }
 
-  // 统一轮询控制：使用 ref 存储 interval，避免重复轮询
+  // 统一轮询控制：使用 ref 存储 interval 和进度流的取消函数，避免重复轮询
   const pollRef = useRef<any>(null)
+  const streamRef = useRef<(() => void) | null>(null)
   const stopPolling = () => {
+    if (streamRef.current) {
+      streamRef.current()
+      streamRef.current = null
+    }
     if (pollRef.current) {
       clearInterval(pollRef.current)
       pollRef.current = null
@@ -270,6 +276,47 @@ function KeywordsPage() {
     }, intervalMs)
   }
 
+  // 推送流正常时仍低频轮询，防止爬虫进程异常退出等未推送终态的情况让页面一直停在运行中
+  const SAFETY_POLL_MS = 20000
+
+  // 跟踪任务进度：优先订阅 /api/crawl/progress 推送流，没有任务ID或流中断时退回轮询
+  const startTracking = (kw: string, taskId?: number) => {
+    if (!taskId) {
+      startPolling(kw, 3000)
+      return
+    }
+    stopPolling()
+    currentTaskKeyword.current = kw
+    streamRef.current = subscribeTaskProgress(
+      taskId,
+      (update) => {
+        if (currentTaskKeyword.current !== kw) return
+        if (isTerminalStatus(update.status)) {
+          // 完成通知和结果刷新交给 fetchTaskStatus；数据库尚未更新时由轮询兜底
+          startPolling(kw, 3000)
+          fetchTaskStatus(kw)
+          return
+        }
+        setTaskStatus((prev: any) => ({
+          ...prev,
+          status: update.status,
+          progress: update.progress,
+          message: update.message || undefined,
+          totalRepositories: update.total ?? prev?.totalRepositories
+        }))
+      },
+      (finished) => {
+        streamRef.current = null
+        if (!finished && currentTaskKeyword.current === kw) {
+          startPolling(kw, 3000)
+        }
+      }
+    )
+    pollRef.current = setInterval(() => {
+      fetchTaskStatus(currentTaskKeyword.current)
+    }, SAFETY_POLL_MS)
+  }
+
   // 添加全局错误处理器
   useEffect(() => {
     const handleGlobalError = (event: ErrorEvent) => {
@@ -427,6 +474,11 @@ function KeywordsPage() {
         try {
           const processedData = processAnalysisData(data, file);
           setAnalysisResults(processedData);
+
+          // 分片格式：摘要先渲染，仓库分页随后加载
+          if (processedData && !data.repositories && data.repository_pages?.manifest) {
+            loadRepositoryPages(data.repository_pages.manifest, processedData.keyword);
+          }
         } catch (processError) {
           console.error('数据处理失败:', processError);
           setAnalysisResults(null);
@@ -443,6 +495,38 @@ function KeywordsPage() {
     }
   }
 
+  // 按清单加载仓库分页（按星数降序），逐页追加到当前分析结果
+  async function loadRepositoryPages(manifestUrl: string, keyword: string) {
+    try {
+      const manifestResponse = await fetch(manifestUrl);
+      if (!manifestResponse.ok) {
+        throw new Error(`加载分页清单失败: ${manifestResponse.status}`);
+      }
+      const manifest = await manifestResponse.json();
+
+      const repositories: any[] = [];
+      for (const page of manifest.pages || []) {
+        const pageResponse = await fetch(page.file);
+        if (!pageResponse.ok) {
+          throw new Error(`加载仓库分页失败: ${page.file}`);
+        }
+        const pageData = await pageResponse.json();
+        repositories.push(...(pageData.repositories || []));
+
+        const loaded = [...repositories];
+        setAnalysisResults((prev: any) => {
+          if (!prev || prev.keyword !== keyword) return prev;
+          // 摘要中没有、由仓库列表推导的图表按已加载的全部仓库重新计算，与下方列表保持一致
+          const charts = { ...prev.charts };
+          (prev.derivedCharts || []).forEach((name: string) => delete charts[name]);
+          return processAnalysisData({ ...prev, charts, repositories: loaded }, '');
+        });
+      }
+    } catch (error) {
+      console.error('加载仓库分页失败:', error);
+    }
+  }
+
   // 处理和规范化分析数据
   function processAnalysisData(data: any, filePath: string) {
     console.log('处理分析数据，检查结构');
@@ -456,6 +540,9 @@ function KeywordsPage() {
       data.charts = {};
     }
 
+    // 由仓库列表推导的图表（摘要文件中没有），仓库分页加载后需要重新计算
+    const derivedCharts: string[] = [];
+
     // 提取关键词 - 如果没有keyword字段，尝试从文件路径中提取
     if (!data.keyword && filePath) {
       const match = filePath.match(/analysis_([^/.]+)\.json/);
@@ -469,6 +556,7 @@ function KeywordsPage() {
     if (!data.charts.language_distribution) {
       console.log('缺少语言分布数据，尝试从仓库信息创建');
       data.charts.language_distribution = { data: {} };
+      derivedCharts.push('language_distribution');
 
       // 如果有仓库数据，尝试从中构建语言分布
       if (data.repositories && Array.isArray(data.repositories)) {
@@ -492,6 +580,7 @@ function KeywordsPage() {
     if (!data.charts.stars_distribution) {
       console.log('缺少星标分布数据，尝试从仓库信息创建');
       data.charts.stars_distribution = { data: { mean: 0, min: 0, max: 0, total: 0 } };
+      derivedCharts.push('stars_distribution');
 
       // 如果有仓库数据，尝试从中构建星标分布
       if (data.repositories && Array.isArray(data.repositories)) {
@@ -512,6 +601,7 @@ function KeywordsPage() {
     if (!data.charts.tag_analysis) {
       console.log('缺少标签分析数据，尝试从仓库标签创建');
       data.charts.tag_analysis = { data: {} };
+      derivedCharts.push('tag_analysis');
 
       // 如果有仓库数据，尝试从中构建标签分析
       if (data.repositories && Array.isArray(data.repositories)) {
@@ -580,6 +670,7 @@ function KeywordsPage() {
     if (!data.charts.description_keywords) {
       console.log('缺少描述关键词数据，尝试从仓库描述创建');
       data.charts.description_keywords = { data: {} };
+      derivedCharts.push('description_keywords');
 
       // 如果有仓库数据，尝试从中提取关键词
       if (data.repositories && Array.isArray(data.repositories)) {
@@ -643,6 +734,7 @@ function KeywordsPage() {
       }
     }
 
+    data.derivedCharts = derivedCharts;
     return data;
   }
 
@@ -701,8 +793,8 @@ function KeywordsPage() {
         // 刷新关键词列表
         await fetchKeywords()
 
-        // 开始轮询任务状态（统一用 startPolling，避免重复 setInterval）
-        startPolling(keyword, 3000)
+        // 开始跟踪任务状态（统一用 startTracking，避免重复订阅）
+        startTracking(keyword, data.taskId)
       } else {
         setSearchMessage(`爬取请求失败: ${data.error || '未知错误'}`)
         addNotification('error', `关键词 "${keyword}" 爬取请求失败: ${data.error || '未知错误'}`, keyword);
@@ -1063,8 +1155,8 @@ function KeywordsPage() {
         setSearchMessage(`重新爬取请求已提交! ${data.message || ''}`)
         addNotification('info', `关键词 "${selectedKeyword}" 重新爬取任务已开始，请等待完成通知`, selectedKeyword);
 
-        // 开始轮询任务状态（统一控制）
-        startPolling(selectedKeyword, 3000)
+        // 开始跟踪任务状态（统一控制）
+        startTracking(selectedKeyword, data.taskId)
         
         // 关闭确认对话框
         setShowRecrawlConfirm(false)
@@ -1308,8 +1400,8 @@ function KeywordsPage() {
         setSearchMessage(`重试任务已提交! ${data.message || ''}`)
         // 清除之前的失败状态
         setTaskStatus(null)
-        // 开始新的轮询
-        startPolling(keyword, 3000)
+        // 开始新的跟踪
+        startTracking(keyword, data.taskId)
       } else {
         setSearchMessage(`重试任务失败: ${data.error || '未知错误'}`)
       }
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+趋势统计引擎
+一次排序计算所有条目的排名、百分位、四分位数和 IQR 异常值，
+供库、包、函数的趋势分析共用
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# numpy 为可选加速：条目较多时使用 searchsorted 批量计算排名
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# 超过该条目数时才切换到 numpy，避免小数据集的数组转换开销
+NUMPY_THRESHOLD = 2000
+
+
+def summarize_counts(sorted_counts: List[int]) -> Dict[str, Any]:
+    """基于已排序的计数列表计算分布指标
+
+    四分位数沿用原有的下标取值方式（n//4 与 3n//4），保证趋势判定结果不变。
+    """
+    n = len(sorted_counts)
+    if n == 0:
+        return {}
+
+    if n % 2 == 1:
+        median = sorted_counts[n // 2]
+    else:
+        median = (sorted_counts[n // 2 - 1] + sorted_counts[n // 2]) / 2
+
+    q1 = sorted_counts[n // 4]
+    q3 = sorted_counts[3 * n // 4]
+    iqr = q3 - q1
+
+    # 单次遍历得到均值与方差
+    total = 0
+    total_sq = 0
+    for value in sorted_counts:
+        total += value
+        total_sq += value * value
+    mean = total / n
+    variance = max(total_sq / n - mean * mean, 0.0)
+
+    return {
+        'count': n,
+        'min': sorted_counts[0],
+        'max': sorted_counts[-1],
+        'mean': round(mean, 2),
+        'std_dev': round(variance ** 0.5, 2),
+        'median': median,
+        'q1': q1,
+        'q3': q3,
+        'iqr': iqr,
+        'outlier_lower': q1 - 1.5 * iqr,
+        'outlier_upper': q3 + 1.5 * iqr,
+    }
+
+
+def rank_percentiles(counts: Dict[str, int], sorted_counts: Optional[List[int]] = None) -> Dict[str, float]:
+    """计算每个条目的百分位（平均排名法）
+
+    percentile = (小于该值的个数 + 等于该值的个数 / 2) / 总数 * 100
+    """
+    if not counts:
+        return {}
+
+    if sorted_counts is None:
+        sorted_counts = sorted(counts.values())
+    n = len(sorted_counts)
+
+    names = list(counts.keys())
+    values = [counts[name] for name in names]
+
+    if NUMPY_AVAILABLE and n >= NUMPY_THRESHOLD:
+        sorted_arr = np.asarray(sorted_counts)
+        value_arr = np.asarray(values)
+        below = np.searchsorted(sorted_arr, value_arr, side='left')
+        upto = np.searchsorted(sorted_arr, value_arr, side='right')
+        pct = np.round((below + (upto - below) / 2) / n * 100, 1)
+        return dict(zip(names, pct.tolist()))
+
+    # 相同计数只做一次二分查找
+    cache: Dict[int, float] = {}
+    percentiles = {}
+    for name, value in zip(names, values):
+        pct = cache.get(value)
+        if pct is None:
+            below = bisect_left(sorted_counts, value)
+            equal = bisect_right(sorted_counts, value) - below
+            pct = round((below + equal / 2) / n * 100, 1)
+            cache[value] = pct
+        percentiles[name] = pct
+    return percentiles
+
+
+def classify_trend(count: int, stats: Dict[str, Any]) -> str:
+    """根据分布指标判断趋势方向"""
+    if count >= stats['outlier_upper']:
+        return 'up'
+    if count <= stats['outlier_lower']:
+        return 'down'
+    if count >= stats['q3']:
+        return 'up'
+    if count >= stats['q1']:
+        return 'stable'
+    return 'down'
+
+
+def calculate_trends(counts: Dict[str, int],
+                     category_fn: Optional[Callable[[str], str]] = None,
+                     names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """为计数字典中的条目计算趋势、百分位和异常值标记
+
+    names: 只输出这些条目（统计仍基于全量数据），None 表示全部输出
+    """
+    if not counts:
+        return {}
+
+    sorted_counts = sorted(counts.values())
+    stats = summarize_counts(sorted_counts)
+
+    selected = counts if names is None else {name: counts[name] for name in names if name in counts}
+    percentiles = rank_percentiles(selected, sorted_counts)
+
+    trends = {}
+    for name, count in selected.items():
+        entry = {
+            'trend': classify_trend(count, stats),
+            'count': count,
+            'percentile': percentiles[name],
+            'outlier': count > stats['outlier_upper'] or count < stats['outlier_lower'],
+        }
+        if category_fn:
+            entry['category'] = category_fn(name)
+        trends[name] = entry
+
+    return trends
+
+
+def calculate_code_statistics(libraries: Dict[str, int],
+                              packages: Dict[str, int],
+                              functions: Dict[str, int],
+                              top_n: int = 20) -> Dict[str, Dict[str, Any]]:
+    """统一计算库、包、函数的分布指标
+
+    统计基于全量计数，只为排名前 top_n 的条目输出明细，避免报告体积随导入数量膨胀。
+    """
+    result = {}
+    for label, counts in (('libraries', libraries), ('packages', packages), ('functions', functions)):
+        if not counts:
+            result[label] = {}
+            continue
+
+        sorted_counts = sorted(counts.values())
+        stats = summarize_counts(sorted_counts)
+        top_names = sorted(counts, key=counts.get, reverse=True)[:top_n]
+        top_counts = {name: counts[name] for name in top_names}
+        percentiles = rank_percentiles(top_counts, sorted_counts)
+
+        result[label] = {
+            'summary': stats,
+            'outlier_count': len(sorted_counts) - bisect_right(sorted_counts, stats['outlier_upper'])
+                             + bisect_left(sorted_counts, stats['outlier_lower']),
+            'top': {
+                name: {
+                    'count': count,
+                    'percentile': percentiles[name],
+                    'trend': classify_trend(count, stats),
+                    'outlier': count > stats['outlier_upper'] or count < stats['outlier_lower'],
+                }
+                for name, count in top_counts.items()
+            },
+        }
+
+    return result
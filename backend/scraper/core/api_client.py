@@ -6,14 +6,22 @@ GitHub API 客户端（重构后版本）
 提供统一的 GitHub API 访问接口
 """
 
+import os
 import time
 import logging
 import requests
 from typing import Dict, Any, Optional, List
 from .token_manager import GitHubTokenManager
+from .host_budget import HostBudget
 
 logger = logging.getLogger(__name__)
 
+# 搜索 API 有单独的限额（认证后每分钟 30 次），进程内所有搜索请求共享这一预算
+SEARCH_API_BUDGET = HostBudget(
+    max_concurrent=int(os.getenv('SEARCH_CONCURRENCY', '4')),
+    min_interval=float(os.getenv('SEARCH_MIN_INTERVAL', '2.0'))
+)
+
 class GitHubAPIClient:
     """GitHub API 客户端"""
     
@@ -89,6 +97,24 @@ class GitHubAPIClient:
         
         return None
     
+    def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """GraphQL 查询，返回 data 字段（部分节点出错时仍返回其余数据）"""
+        url = f"{self.base_url}/graphql"
+        response = self._make_request('POST', url, json={'query': query, 'variables': variables or {}})
+        
+        if response and response.status_code == 200:
+            try:
+                payload = response.json()
+            except ValueError as e:
+                logger.error(f"JSON 解析失败: {e}")
+                return None
+            
+            if payload.get('errors'):
+                logger.warning(f"GraphQL 查询部分失败: {str(payload['errors'])[:200]}")
+            return payload.get('data')
+        
+        return None
+    
     def search_repositories(self, query: str, sort: str = 'stars', order: str = 'desc', 
                           per_page: int = 100, page: int = 1) -> Optional[Dict[str, Any]]:
         """搜索仓库"""
@@ -100,7 +126,11 @@ class GitHubAPIClient:
             'page': page
         }
         
-        return self.get('search/repositories', params)
+        with SEARCH_API_BUDGET.slot():
+            result = self.get('search/repositories', params)
+        if result is not None:
+            SEARCH_API_BUDGET.on_success()
+        return result
     
     def get_repository(self, owner: str, repo: str) -> Optional[Dict[str, Any]]:
         """获取仓库详情"""
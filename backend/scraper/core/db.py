@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PostgreSQL 连接池
+所有模块共用的数据库访问层：按连接字符串共享连接池，
+热点查询使用按连接缓存的预备语句，并统计连接池使用情况
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psycopg2
+    import psycopg2.extensions
+    PSYCOPG2_AVAILABLE = True
+except ImportError:
+    PSYCOPG2_AVAILABLE = False
+
+project_root = Path(__file__).parent.parent.parent.parent
+
+# 连接池耗尽时 connect() 默认最多等待的秒数，避免连接泄漏时调用方无限阻塞
+DEFAULT_ACQUIRE_TIMEOUT = 30.0
+
+
+def resolve_database_url(default: Optional[str] = None) -> Optional[str]:
+    """数据库连接字符串：优先环境变量 DATABASE_URL，其次项目根目录的 .env，最后使用 default"""
+    db_url = os.environ.get('DATABASE_URL', '').strip()
+    if db_url:
+        return db_url
+
+    env_path = project_root / '.env'
+    if env_path.exists():
+        # 优先 UTF-8，失败时尝试 Windows 本地编码
+        for encoding in ('utf-8', 'mbcs' if os.name == 'nt' else 'latin-1'):
+            try:
+                with open(env_path, 'r', encoding=encoding) as f:
+                    for raw_line in f:
+                        line = raw_line.strip()
+                        if line.startswith('DATABASE_URL='):
+                            return line.split('=', 1)[1].strip().strip('"').strip("'")
+                break
+            except (UnicodeDecodeError, LookupError):
+                continue
+            except OSError as e:
+                logger.warning(f"读取 .env 失败: {e}")
+                break
+    return default
+
+
+class ConnectionPool:
+    """线程安全的连接池
+
+    - 连接数达到上限时 acquire 阻塞等待（psycopg2 的连接池在耗尽时直接抛错）
+    - 新建的连接统一设置 UTF8 客户端编码
+    - 归还时回滚未提交的事务，已断开的连接直接丢弃
+    - 创建时预先建立 minconn 个连接；归还的连接全部保留复用（最多 maxconn 个），
+      不像 psycopg2 的连接池那样在空闲连接超过 minconn 时关闭，连同其预备语句一起丢掉
+    """
+
+    def __init__(self, dsn: str, minconn: int = 1, maxconn: int = 10):
+        self.dsn = dsn
+        self.maxconn = max(1, maxconn)
+        self.minconn = min(max(0, minconn), self.maxconn)
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._lock = threading.Lock()
+        # 空闲连接，后进先出：优先复用最近用过的连接
+        self._idle: List[Any] = []
+        self._known = set()
+        # 每个连接已创建的预备语句（预备语句只在所属会话内有效）
+        self._prepared: Dict[int, set] = {}
+        self._stats = {
+            'acquired': 0,
+            'created': 0,
+            'discarded': 0,
+            'in_use': 0,
+            'max_in_use': 0,
+            'wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'prepares': 0,
+            'prepared_executions': 0,
+        }
+        for _ in range(self.minconn):
+            self._idle.append(self._open())
+
+    def _open(self):
+        conn = psycopg2.connect(self.dsn)
+        try:
+            conn.set_client_encoding('UTF8')
+        except Exception:
+            pass
+        with self._lock:
+            self._known.add(id(conn))
+            self._stats['created'] += 1
+        return conn
+
+    def acquire(self, timeout: Optional[float] = None):
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=timeout if timeout is not None else -1):
+            raise TimeoutError(f"等待数据库连接超时（{timeout} 秒）")
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._open()
+        except Exception:
+            self._slots.release()
+            raise
+        waited = time.monotonic() - started
+
+        with self._lock:
+            self._stats['acquired'] += 1
+            self._stats['in_use'] += 1
+            self._stats['max_in_use'] = max(self._stats['max_in_use'], self._stats['in_use'])
+            self._stats['wait_seconds'] += waited
+            self._stats['max_wait_seconds'] = max(self._stats['max_wait_seconds'], waited)
+        return conn
+
+    def release(self, conn) -> None:
+        discard = bool(conn.closed)
+        if not discard:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        if discard:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+        with self._lock:
+            self._stats['in_use'] -= 1
+            if discard:
+                self._stats['discarded'] += 1
+                self._known.discard(id(conn))
+                self._prepared.pop(id(conn), None)
+            else:
+                self._idle.append(conn)
+        self._slots.release()
+
+    def execute_prepared(self, cursor, name: str, sql: str, params: Sequence[Any]) -> None:
+        """以预备语句执行 sql（参数占位符使用 $1, $2 ...）
+
+        每个连接第一次执行时 PREPARE，之后只发送 EXECUTE 和参数，省去重复的解析和规划
+        """
+        conn = cursor.connection
+        with self._lock:
+            prepared = self._prepared.setdefault(id(conn), set())
+            needs_prepare = name not in prepared
+        if needs_prepare:
+            cursor.execute(f"PREPARE {name} AS {sql}")
+            with self._lock:
+                prepared.add(name)
+                self._stats['prepares'] += 1
+        placeholders = ', '.join(['%s'] * len(params))
+        cursor.execute(f"EXECUTE {name} ({placeholders})" if params else f"EXECUTE {name}", tuple(params))
+        with self._lock:
+            self._stats['prepared_executions'] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """连接池统计：获取次数、新建/丢弃的连接数、使用中与空闲连接数、等待时间、预备语句使用情况"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['min'] = self.minconn
+        stats['max'] = self.maxconn
+        stats['open'] = len(self._known)
+        stats['idle'] = stats['open'] - stats['in_use']
+        stats['avg_wait_ms'] = round(stats['wait_seconds'] * 1000 / stats['acquired'], 2) if stats['acquired'] else 0.0
+        stats['wait_seconds'] = round(stats['wait_seconds'], 3)
+        stats['max_wait_seconds'] = round(stats['max_wait_seconds'], 3)
+        return stats
+
+    def close(self) -> None:
+        """关闭所有空闲连接（借出中的连接归还时照常处理）"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            for conn in idle:
+                self._known.discard(id(conn))
+                self._prepared.pop(id(conn), None)
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class PooledConnection:
+    """从连接池借出的连接
+
+    除 close() 外的属性和方法都转发给底层 psycopg2 连接；close() 把连接归还连接池。
+    推荐用 with 语句借用，离开代码块时（包括提前 return 和异常）自动归还：
+
+        with connect() as conn:
+            ...
+            conn.commit()
+
+    注意与 psycopg2 连接的 with 语义不同：退出时不会自动提交，未提交的事务在归还时回滚
+    """
+
+    def __init__(self, pool: ConnectionPool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name: str) -> Any:
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            raise AttributeError(f"连接已归还连接池: {name}")
+        return getattr(conn, name)
+
+    @property
+    def raw(self):
+        return self._conn
+
+    def execute_prepared(self, cursor, name: str, sql: str, params: Sequence[Any]) -> None:
+        self._pool.execute_prepared(cursor, name, sql, params)
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn)
+
+    def __enter__(self) -> 'PooledConnection':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(dsn: Optional[str] = None) -> Optional[ConnectionPool]:
+    """按连接字符串共享的连接池（大小由 DB_POOL_MIN / DB_POOL_MAX 控制）；psycopg2 或连接字符串不可用时返回 None"""
+    if not PSYCOPG2_AVAILABLE:
+        return None
+    dsn = dsn or resolve_database_url()
+    if not dsn:
+        logger.warning("DATABASE_URL 环境变量未设置")
+        return None
+
+    with _pools_lock:
+        pool = _pools.get(dsn)
+        if pool is None:
+            pool = ConnectionPool(
+                dsn,
+                minconn=int(os.getenv('DB_POOL_MIN', '1')),
+                maxconn=int(os.getenv('DB_POOL_MAX', '10')),
+            )
+            _pools[dsn] = pool
+        return pool
+
+
+def connect(dsn: Optional[str] = None, timeout: Optional[float] = None) -> Optional[PooledConnection]:
+    """从连接池借出一个连接（可用作上下文管理器），不可用时返回 None
+
+    timeout 为连接池耗尽时最多等待的秒数，默认取 DB_POOL_TIMEOUT（30 秒），超时抛出 TimeoutError
+    """
+    pool = get_pool(dsn)
+    if pool is None:
+        return None
+    if timeout is None:
+        timeout = float(os.getenv('DB_POOL_TIMEOUT', str(DEFAULT_ACQUIRE_TIMEOUT)))
+    return PooledConnection(pool, pool.acquire(timeout))
+
+
+def pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """所有连接池的统计（键为去掉凭据的连接字符串）"""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {dsn.split('@')[-1]: pool.metrics() for dsn, pool in pools}
+
+
+def close_all() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        try:
+            pool.close()
+        except Exception as e:
+            logger.warning(f"关闭数据库连接池失败: {e}")
+
+
+atexit.register(close_all)
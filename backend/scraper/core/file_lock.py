@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+跨进程文件锁
+多个爬虫进程写同一个目录（趋势文件、速度索引）时，用目录下的锁文件互斥读-改-写；
+POSIX 使用 fcntl，Windows 使用 msvcrt，都不可用时不加锁
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+try:
+    import msvcrt
+    MSVCRT_AVAILABLE = True
+except ImportError:
+    MSVCRT_AVAILABLE = False
+
+LOCK_FILE = '.lock'
+
+
+@contextmanager
+def file_lock(directory: Union[str, Path], name: str = LOCK_FILE) -> Iterator[None]:
+    """持有 directory/name 的排他锁直到退出代码块（目录不存在时创建）
+
+    只在进程之间互斥，同一进程内的线程应另外持有线程锁
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / name, 'a+b') as lock_file:
+        if FCNTL_AVAILABLE:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        elif MSVCRT_AVAILABLE:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif MSVCRT_AVAILABLE:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+单主机访问预算
+限制对同一主机的并发请求数和相邻请求的最小间隔，供多线程并发抓取时共享；
+遇到限流（429）时按 AIMD 收缩并发窗口并进入冷却，成功后逐步恢复
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COOLDOWN = 60.0
+
+
+class Throttled(Exception):
+    """请求被主机限流，调用方应在冷却结束后重新排队"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"请求被限流，{retry_after:.0f} 秒后重试")
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str], default: float = DEFAULT_COOLDOWN) -> float:
+    """解析 Retry-After 响应头（仅支持秒数形式）"""
+    try:
+        return max(0.0, float(value)) if value is not None else default
+    except ValueError:
+        return default
+
+
+class HostBudget:
+    """对同一主机的礼貌访问预算（线程安全）
+
+    - max_concurrent：并发窗口上限，实际窗口按 AIMD 调整：
+      每次成功加 1/窗口（约每轮请求加 1），每次限流减半，最小为 1
+    - min_interval：相邻两次请求开始之间的最小间隔（秒），限流时加倍，成功后逐步回落
+    - 限流后整个主机进入冷却期，冷却期内不发出新请求
+    """
+
+    def __init__(self, max_concurrent: int = 6, min_interval: float = 0.25,
+                 max_interval: float = 10.0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_interval = max(0.0, min_interval)
+        self.max_interval = max(max_interval, self.min_interval)
+        self._cond = threading.Condition(threading.Lock())
+        self._limit = float(self.max_concurrent)
+        self._interval = self.min_interval
+        self._active = 0
+        self._blocked_until = 0.0
+        self._next_start = 0.0
+        self._requests = 0
+        self._throttles = 0
+        self._waited = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """占用一个请求名额，退出时释放（冷却期或窗口已满时在当前线程等待）"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    self._cond.wait(self._blocked_until - now)
+                elif self._active >= int(self._limit):
+                    self._cond.wait()
+                else:
+                    break
+            self._active += 1
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+            self._requests += 1
+            self._waited += start - now
+            delay = start - now
+
+        try:
+            if delay > 0:
+                time.sleep(delay)
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def on_success(self) -> None:
+        """加性增：窗口 +1/窗口，间隔回落到基线"""
+        with self._cond:
+            self._limit = min(float(self.max_concurrent), self._limit + 1.0 / self._limit)
+            self._interval = max(self.min_interval, self._interval * 0.9)
+            self._cond.notify_all()
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> float:
+        """乘性减：窗口减半、间隔加倍，并让主机进入冷却，返回冷却剩余秒数"""
+        cooldown = DEFAULT_COOLDOWN if retry_after is None else retry_after
+        with self._cond:
+            now = time.monotonic()
+            self._limit = max(1.0, self._limit / 2)
+            self._interval = min(self.max_interval, max(self._interval * 2, 0.5))
+            self._blocked_until = max(self._blocked_until, now + cooldown)
+            self._throttles += 1
+            remaining = self._blocked_until - now
+        logger.warning(f"主机限流：并发窗口降为 {int(self._limit)}，请求间隔 {self._interval:.2f} 秒，"
+                       f"冷却 {remaining:.0f} 秒")
+        return remaining
+
+    def cooldown_remaining(self) -> float:
+        with self._cond:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+    async def wait_ready(self) -> None:
+        """在事件循环中等待冷却结束（不阻塞其他协程）"""
+        remaining = self.cooldown_remaining()
+        while remaining > 0:
+            await asyncio.sleep(remaining)
+            remaining = self.cooldown_remaining()
+
+    def stats(self) -> Dict[str, Any]:
+        """已发出的请求数、限流次数和当前窗口"""
+        with self._cond:
+            return {
+                'requests': self._requests,
+                'throttles': self._throttles,
+                'waited_seconds': round(self._waited, 3),
+                'concurrency': int(self._limit),
+                'max_concurrent': self.max_concurrent,
+                'interval': round(self._interval, 3),
+            }
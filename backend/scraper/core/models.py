@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+仓库记录模型
+从 GitHub API / Trending 页面数据中只解码一次所需字段，在爬虫、分析器和写入器之间共享，
+仅在输出边界转换为字典
+"""
+
+import datetime
+from typing import Dict, List, Any, Optional, Iterable, Union
+
+
+def _owner_login(owner: Any) -> Optional[str]:
+    if isinstance(owner, dict):
+        return owner.get('login')
+    return owner or None
+
+
+def _license_id(license_info: Any) -> Optional[str]:
+    if isinstance(license_info, dict):
+        return license_info.get('spdx_id') or license_info.get('key') or license_info.get('name')
+    return license_info or None
+
+
+class RepoRecord:
+    """紧凑的仓库记录
+
+    使用 __slots__ 代替字典：没有逐条目的哈希表和重复的字符串键，
+    同时提供 get / [] / in 等只读映射接口，兼容原有按键访问的代码。
+    """
+
+    __slots__ = (
+        'id', 'name', 'full_name', 'owner', 'description', 'html_url', 'language',
+        'stargazers_count', 'forks_count', 'watchers_count', 'open_issues_count', 'size',
+        'created_at', 'updated_at', 'pushed_at', 'topics', 'license', 'today_stars',
+        'languages', 'keyword', 'scraped_at', 'code_analysis_summary',
+    )
+
+    # 始终输出的字段（与原 _process_repository_data 的结果一致）
+    BASE_FIELDS = (
+        'id', 'name', 'full_name', 'owner', 'description', 'html_url', 'language',
+        'stargazers_count', 'forks_count', 'watchers_count', 'size',
+        'created_at', 'updated_at', 'pushed_at', 'keyword', 'scraped_at',
+    )
+    # 有值时才输出的字段
+    OPTIONAL_FIELDS = ('languages', 'topics', 'license', 'today_stars', 'code_analysis_summary')
+
+    def __init__(self, **fields: Any):
+        for slot in self.__slots__:
+            setattr(self, slot, fields.get(slot))
+        if self.stargazers_count is None:
+            self.stargazers_count = 0
+        if self.forks_count is None:
+            self.forks_count = 0
+
+    @classmethod
+    def from_api(cls, data: Union[Dict[str, Any], 'RepoRecord'], keyword: Optional[str] = None) -> 'RepoRecord':
+        """从 GitHub 搜索/仓库 API 的 JSON、Trending 页面条目或已处理的字典解码"""
+        if isinstance(data, RepoRecord):
+            if keyword is not None:
+                data.keyword = keyword
+            return data
+
+        full_name = data.get('full_name') or data.get('fullName')
+        owner = _owner_login(data.get('owner'))
+        name = data.get('name')
+        if full_name and '/' in full_name and (not owner or not name):
+            owner, name = full_name.split('/', 1)
+
+        return cls(
+            id=data.get('id'),
+            name=name,
+            full_name=full_name,
+            owner=owner,
+            description=data.get('description'),
+            html_url=data.get('html_url') or data.get('url'),
+            language=data.get('language'),
+            stargazers_count=data.get('stargazers_count', data.get('stars', 0)),
+            forks_count=data.get('forks_count', data.get('forks', 0)),
+            watchers_count=data.get('watchers_count', 0),
+            open_issues_count=data.get('open_issues_count'),
+            size=data.get('size', 0),
+            created_at=data.get('created_at'),
+            updated_at=data.get('updated_at'),
+            pushed_at=data.get('pushed_at'),
+            topics=data.get('topics'),
+            license=_license_id(data.get('license')),
+            today_stars=data.get('today_stars', data.get('todayStars')),
+            languages=data.get('languages'),
+            keyword=keyword if keyword is not None else data.get('keyword'),
+            scraped_at=data.get('scraped_at'),
+            code_analysis_summary=data.get('code_analysis_summary'),
+        )
+
+    # ---- 映射接口（兼容原有字典访问） ----
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(f"RepoRecord 不支持字段: {key}")
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        # 可选字段与 to_dict() 一致：只有有值时才算存在
+        if key in self.OPTIONAL_FIELDS:
+            return getattr(self, key, None) is not None
+        return key in self.__slots__
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.__slots__:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def keys(self) -> List[str]:
+        return list(self.to_dict().keys())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RepoRecord):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"RepoRecord({self.full_name!r}, stars={self.stargazers_count})"
+
+    # ---- 输出边界 ----
+
+    def to_dict(self) -> Dict[str, Any]:
+        """关键词爬虫 / 分析器使用的格式（owner 为登录名）"""
+        result = {field: getattr(self, field) for field in self.BASE_FIELDS}
+        for field in self.OPTIONAL_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                result[field] = value
+        return result
+
+    def to_trending_item(self) -> Dict[str, Any]:
+        """Trending 数据文件（public/trends/data/trends.json）使用的格式"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'full_name': self.full_name,
+            'description': self.description or "",
+            'html_url': self.html_url,
+            'stargazers_count': self.stargazers_count,
+            'language': self.language or "",
+            'forks_count': self.forks_count,
+            'open_issues_count': self.open_issues_count or 0,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'topics': self.topics or [],
+            'license': self.license,
+            'owner': {
+                'login': self.owner,
+                'avatar_url': f"https://github.com/{self.owner}.png"
+            },
+            'today_stars': self.today_stars or 0,
+            'pushed_at': self.pushed_at,
+            'scraped_at': self.scraped_at,
+        }
+
+    def to_trending_dict(self, period: str) -> Dict[str, Any]:
+        """前端 API（camelCase）使用的格式"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'owner': self.owner,
+            'fullName': self.full_name,
+            'description': self.description,
+            'language': self.language,
+            'stars': self.stargazers_count,
+            'forks': self.forks_count,
+            'todayStars': self.today_stars or 0,
+            'url': self.html_url,
+            'createdAt': self.created_at,
+            'updatedAt': self.updated_at,
+            'pushedAt': self.pushed_at,
+            'topics': self.topics or [],
+            'trendPeriod': period,
+            'scrapedAt': self.scraped_at or datetime.datetime.now().isoformat()
+        }
+
+
+def records_to_dicts(records: Iterable[Union[RepoRecord, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """在输出边界把记录列表转换为字典列表（已是字典的原样保留）"""
+    return [record.to_dict() if isinstance(record, RepoRecord) else record for record in records]
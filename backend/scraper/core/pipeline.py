@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多阶段流水线
+每个阶段有独立的线程池和有界输入队列，队列满时上游阻塞（背压）；
+条目处理完立即流向下一阶段，各阶段的吞吐量和队列深度可随时查看
+"""
+
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, List, Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class PipelineStage:
+    """流水线中的一个阶段
+
+    - func：处理单个条目，返回 None 表示丢弃；fan_out 时返回可迭代对象，每个元素分别流向下游
+    - batch_size > 1 时 func 接收一批条目（凑满或等待 batch_timeout 秒后提交），返回可迭代的输出
+    """
+
+    def __init__(self, name: str, func: Callable, workers: int = 1, queue_size: int = 100,
+                 fan_out: bool = False, batch_size: int = 1, batch_timeout: float = 0.5):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.fan_out = fan_out or batch_size > 1
+        self.batch_size = max(1, batch_size)
+        self.batch_timeout = batch_timeout
+        self._lock = threading.Lock()
+        self._alive = self.workers
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def put(self, item: Any) -> None:
+        self.queue.put(item)
+        depth = self.queue.qsize()
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def take(self):
+        """取出一批条目，返回 (条目列表, 是否收到停止信号)"""
+        item = self.queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def stats(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'processed': self.processed,
+                'emitted': self.emitted,
+                'errors': self.errors,
+                'queue_depth': self.queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'throughput': round(self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+                'utilization': round(self.busy_seconds / (elapsed * self.workers), 2) if elapsed > 0 else 0.0,
+            }
+
+
+class Pipeline:
+    """线程化的多阶段流水线，最后一个阶段的输出按完成顺序收集"""
+
+    def __init__(self, name: str = 'pipeline'):
+        self.name = name
+        self.stages: List[PipelineStage] = []
+        self._results: List[Any] = []
+        self._results_lock = threading.Lock()
+        self._started: Optional[float] = None
+
+    def add_stage(self, name: str, func: Callable, **options) -> 'Pipeline':
+        self.stages.append(PipelineStage(name, func, **options))
+        return self
+
+    def _emit(self, index: int, item: Any) -> None:
+        if index == len(self.stages):
+            with self._results_lock:
+                self._results.append(item)
+        else:
+            self.stages[index].put(item)
+
+    def _worker(self, index: int) -> None:
+        stage = self.stages[index]
+        while True:
+            batch, stopped = stage.take()
+            if batch:
+                started = time.monotonic()
+                try:
+                    result = stage.func(batch if stage.batch_size > 1 else batch[0])
+                    if result is None:
+                        outputs = []
+                    elif stage.fan_out:
+                        outputs = list(result)
+                    else:
+                        outputs = [result]
+                except Exception as e:
+                    logger.error(f"流水线 {self.name} 阶段 {stage.name} 处理失败: {e}")
+                    outputs = []
+                    with stage._lock:
+                        stage.errors += len(batch)
+                with stage._lock:
+                    stage.processed += len(batch)
+                    stage.emitted += len(outputs)
+                    stage.busy_seconds += time.monotonic() - started
+                for output in outputs:
+                    self._emit(index + 1, output)
+            if stopped:
+                break
+
+        # 本阶段最后一个线程退出时通知下游结束
+        with stage._lock:
+            stage._alive -= 1
+            last = stage._alive == 0
+        if last and index + 1 < len(self.stages):
+            for _ in range(self.stages[index + 1].workers):
+                self.stages[index + 1].put(_STOP)
+
+    def _feed(self, items: Iterable[Any]) -> None:
+        try:
+            for item in items:
+                self._emit(0, item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                self.stages[0].put(_STOP)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """各阶段的处理数、吞吐量（条/秒）、利用率和队列深度"""
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return {stage.name: stage.stats(elapsed) for stage in self.stages}
+
+    def run(self, items: Iterable[Any], on_tick: Optional[Callable[[Dict[str, Dict[str, Any]]], None]] = None,
+            tick_interval: float = 5.0) -> List[Any]:
+        """运行流水线直到所有条目处理完毕，期间每 tick_interval 秒回调一次 on_tick(metrics)"""
+        if not self.stages:
+            return list(items)
+
+        self._started = time.monotonic()
+        threads = [threading.Thread(target=self._feed, args=(items,), name=f"{self.name}-feed", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(target=self._worker, args=(index,), name=f"{self.name}-{stage.name}-{i}", daemon=True)
+                for i in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(tick_interval)
+                if on_tick and thread.is_alive():
+                    on_tick(self.metrics())
+
+        return self._results
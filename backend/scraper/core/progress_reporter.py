@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+后台任务进度上报
+爬虫只把最新进度放入内存，由后台线程合并后写入数据库：
+同一任务的多次更新只写最后一次，普通进度至多每 interval 秒写一次，
+状态变化（如 pending -> running）立即写入，completed / failed 写入后才返回；
+写入失败的更新保留在待写入队列中重试，直到成功、被更新的进度取代或达到重试上限
+"""
+
+import time
+import logging
+import datetime
+import threading
+from typing import Callable, Dict, Any, Optional
+
+from backend.scraper.core.serializer import dumps
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+# 任务进度的 LISTEN/NOTIFY 频道
+PROGRESS_CHANNEL = 'crawl_progress'
+# NOTIFY 负载上限为 8000 字节，消息只保留前 200 个字符
+MAX_MESSAGE_LENGTH = 200
+
+
+def progress_payload(task_id: int, status: str, progress: int, message: Optional[str] = None,
+                     total_repositories: Optional[int] = None) -> str:
+    """NOTIFY crawl_progress 的紧凑 JSON 负载"""
+    payload = {
+        'id': task_id,
+        'status': status,
+        'progress': progress,
+        'message': (message or '')[:MAX_MESSAGE_LENGTH],
+        'ts': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    if total_repositories is not None:
+        payload['total'] = total_repositories
+    return dumps(payload, pretty=False).decode('utf-8')
+
+
+class ProgressReporter:
+    """合并、延迟写入的任务进度上报器
+
+    writer(task_id, status, progress, message, total_repositories) 在后台线程中调用，
+    负责真正的数据库写入，失败时应抛出异常；report() 不会阻塞调用方（终态除外）。
+    失败的更新间隔 retry_delay 秒重试，最多尝试 max_attempts 次，flush() / close() 会等待重试结束。
+    """
+
+    def __init__(self, writer: Callable[..., None], interval: float = 1.0,
+                 max_attempts: int = 5, retry_delay: float = 1.0):
+        self.writer = writer
+        self.interval = interval
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flushed = threading.Condition(self._lock)
+        # task_id -> 待写入的最新进度
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        # task_id -> 已写入的状态，用于识别状态变化
+        self._written_status: Dict[int, str] = {}
+        # task_id -> 待写入的更新已失败的次数
+        self._attempts: Dict[int, int] = {}
+        self._urgent = False
+        self._last_flush = 0.0
+        # 写入失败后，下一次重试的最早时间
+        self._retry_at = 0.0
+        self._writing = False
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {'reported': 0, 'written': 0, 'coalesced': 0, 'errors': 0, 'dropped': 0}
+
+    def report(self, task_id: int, status: str, progress: int, message: Optional[str] = None,
+               total_repositories: Optional[int] = None) -> None:
+        """记录最新进度；终态（completed / failed）会等待写入完成后再返回"""
+        update = {
+            'status': status,
+            'progress': progress,
+            'message': message,
+            'total_repositories': total_repositories,
+        }
+        terminal = status in TERMINAL_STATUSES
+        with self._lock:
+            previous = self._pending.get(task_id)
+            if previous is not None:
+                self.stats['coalesced'] += 1
+                # 较早的更新带有仓库总数而新的没有时保留
+                if update['total_repositories'] is None:
+                    update['total_repositories'] = previous['total_repositories']
+            self._pending[task_id] = update
+            self._attempts.pop(task_id, None)
+            self.stats['reported'] += 1
+            if terminal or self._written_status.get(task_id) != status:
+                self._urgent = True
+            self._ensure_thread()
+            self._wakeup.notify()
+
+        if terminal:
+            self.flush()
+
+    def flush(self, timeout: Optional[float] = 30.0) -> bool:
+        """等待已记录的进度全部写入，返回是否在超时前完成"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            if self._pending:
+                self._urgent = True
+                self._ensure_thread()
+                self._wakeup.notify()
+            while self._pending or self._writing:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    logger.warning(f"等待任务进度写入超时，仍有 {len(self._pending)} 条未写入")
+                    return False
+                self._flushed.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """写入剩余进度并停止后台线程"""
+        self.flush(timeout)
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        logger.info(f"任务进度上报统计: {self.stats}")
+
+    def _ensure_thread(self) -> None:
+        # 调用方已持有 self._lock
+        if self._thread is None or not self._thread.is_alive():
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name='progress-reporter', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._closed:
+                    if self._pending:
+                        due = time.monotonic() if self._urgent else self._last_flush + self.interval
+                        wait = max(due, self._retry_at) - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._wakeup.wait(wait)
+                    else:
+                        self._wakeup.wait()
+                if self._closed and not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                attempts = {task_id: self._attempts.pop(task_id, 0) for task_id in batch}
+                self._urgent = False
+                self._writing = True
+
+            failed = False
+            for task_id, update in batch.items():
+                try:
+                    self.writer(task_id, update['status'], update['progress'], update['message'],
+                                update['total_repositories'])
+                    written = True
+                except Exception as e:
+                    written = False
+                    logger.error(f"写入任务 {task_id} 进度失败（第 {attempts[task_id] + 1} 次）: {e}")
+                with self._lock:
+                    if written:
+                        self.stats['written'] += 1
+                        self._written_status[task_id] = update['status']
+                    else:
+                        self.stats['errors'] += 1
+                        failed = True
+                        self._requeue(task_id, update, attempts[task_id] + 1)
+
+            with self._lock:
+                self._retry_at = time.monotonic() + self.retry_delay if failed else 0.0
+                self._writing = False
+                self._last_flush = time.monotonic()
+                self._flushed.notify_all()
+
+    def _requeue(self, task_id: int, update: Dict[str, Any], attempts: int) -> None:
+        """写入失败的更新放回待写入队列（调用方已持有 self._lock）
+
+        写入期间又有新的进度时以新的为准；达到重试上限后放弃
+        """
+        newer = self._pending.get(task_id)
+        if newer is not None:
+            if newer['total_repositories'] is None:
+                newer['total_repositories'] = update['total_repositories']
+            return
+        if attempts >= self.max_attempts:
+            self.stats['dropped'] += 1
+            logger.error(f"任务 {task_id} 的进度（{update['status']}）写入失败 {attempts} 次，已放弃")
+            return
+        self._pending[task_id] = update
+        self._attempts[task_id] = attempts
+        self._urgent = True
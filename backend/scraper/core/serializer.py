@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+JSON 序列化层
+统一所有输出文件的序列化方式：安装了 orjson 时优先使用，默认紧凑输出，
+可选缩进格式，写文件时使用临时文件 + 重命名保证原子性
+"""
+
+import os
+import json
+import logging
+import datetime
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# orjson 为可选加速依赖
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+PathLike = Union[str, Path]
+
+# 进程的 umask（只能通过设置再恢复读取，导入时读取一次，避免写文件时与其他线程竞争）
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _default(obj: Any) -> Any:
+    """处理标准库 json 无法直接序列化的类型"""
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    to_dict = getattr(obj, 'to_dict', None)
+    if callable(to_dict):
+        return to_dict()
+    return str(obj)
+
+
+class StdlibBackend:
+    """标准库 json 后端"""
+
+    name = 'stdlib'
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            text = json.dumps(obj, ensure_ascii=False, indent=2, default=_default)
+        else:
+            text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_default)
+        return text.encode('utf-8')
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonBackend:
+    """orjson 后端（输出 UTF-8，不转义非 ASCII，与 ensure_ascii=False 一致）"""
+
+    name = 'orjson'
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+_BACKENDS = {'stdlib': StdlibBackend}
+if ORJSON_AVAILABLE:
+    _BACKENDS['orjson'] = OrjsonBackend
+
+_backend = None
+
+
+def set_backend(name: str) -> None:
+    """切换序列化后端（'orjson' 或 'stdlib'）"""
+    global _backend
+    if name not in _BACKENDS:
+        raise ValueError(f"不可用的 JSON 后端: {name}（可用: {', '.join(_BACKENDS)}）")
+    _backend = _BACKENDS[name]()
+    logger.debug(f"JSON 后端: {name}")
+
+
+def get_backend():
+    """获取当前后端，可通过 SCRAPER_JSON_BACKEND 环境变量指定"""
+    if _backend is None:
+        preferred = os.getenv('SCRAPER_JSON_BACKEND', '').strip().lower()
+        if preferred in _BACKENDS:
+            set_backend(preferred)
+        else:
+            set_backend('orjson' if ORJSON_AVAILABLE else 'stdlib')
+    return _backend
+
+
+def _resolve_pretty(pretty: Optional[bool]) -> bool:
+    """未显式指定时读取 SCRAPER_JSON_PRETTY 环境变量，默认紧凑输出"""
+    if pretty is not None:
+        return pretty
+    return os.getenv('SCRAPER_JSON_PRETTY', '').strip().lower() in ('1', 'true', 'yes')
+
+
+def dumps(obj: Any, pretty: Optional[bool] = None) -> bytes:
+    """序列化为 UTF-8 字节"""
+    return get_backend().dumps(obj, _resolve_pretty(pretty))
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """反序列化"""
+    return get_backend().loads(data)
+
+
+def _file_mode(path: Path) -> int:
+    """沿用已有文件的权限，新文件按 umask 使用与 open() 相同的默认权限"""
+    try:
+        return path.stat().st_mode & 0o777
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def write_bytes_atomic(path: PathLike, data: bytes) -> None:
+    """写入临时文件后重命名，读者不会看到写了一半的文件"""
+    path = Path(path)
+    mode = _file_mode(path)
+    # mkstemp 生成唯一的临时文件名，同一进程内多个线程同时写同一文件也不会互相覆盖
+    fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=path.parent)
+    temp_path = Path(temp_name)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp 创建的文件权限为 0600，重命名前改为目标文件应有的权限，其他用户（如 Web 服务器）才能读取
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+
+
+def write_json(path: PathLike, obj: Any, pretty: Optional[bool] = None, atomic: bool = True) -> int:
+    """将对象写入 JSON 文件，返回写入的字节数"""
+    data = dumps(obj, pretty)
+    if atomic:
+        write_bytes_atomic(path, data)
+    else:
+        with open(path, 'wb') as f:
+            f.write(data)
+    return len(data)
+
+
+def read_json(path: PathLike) -> Any:
+    """读取 JSON 文件"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def append_jsonl(path: PathLike, obj: Any) -> None:
+    """向 JSON Lines 文件追加一行（始终紧凑）"""
+    with open(path, 'ab') as f:
+        f.write(dumps(obj, pretty=False) + b'\n')
+
+
+def iter_jsonl(path: PathLike):
+    """逐行读取 JSON Lines 文件，跳过空行和损坏的行"""
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield loads(line)
+            except ValueError:
+                logger.warning(f"跳过损坏的 JSON 行: {path}")
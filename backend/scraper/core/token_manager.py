@@ -9,6 +9,7 @@ GitHub Token 管理器（重构后版本）
 import os
 import time
 import logging
+import threading
 import requests
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
@@ -22,6 +23,8 @@ class GitHubTokenManager:
         self.tokens: List[str] = []
         self.current_token_index = 0
         self.token_status: Dict[str, Dict[str, Any]] = {}
+        # 多个关键词 / 语言并发抓取时共享同一个 Token 池
+        self._lock = threading.RLock()
         self.load_tokens()
         
     def load_tokens(self) -> None:
@@ -68,14 +71,15 @@ class GitHubTokenManager:
         if not self.tokens:
             return None
         
-        # 检查当前 Token 是否可用
-        current_token = self.tokens[self.current_token_index]
-        if self._is_token_available(current_token):
-            return current_token
-        
-        # 如果当前 Token 不可用，尝试轮换
-        new_token = self._rotate_token()
-        return new_token
+        with self._lock:
+            # 检查当前 Token 是否可用
+            current_token = self.tokens[self.current_token_index]
+            if self._is_token_available(current_token):
+                return current_token
+            
+            # 如果当前 Token 不可用，尝试轮换
+            new_token = self._rotate_token()
+            return new_token
     
     def get_headers(self) -> Dict[str, str]:
         """获取包含认证信息的请求头"""
@@ -110,30 +114,32 @@ class GitHubTokenManager:
         if not self.tokens:
             return None
         
-        original_index = self.current_token_index
-        
-        # 尝试所有 Token
-        for _ in range(len(self.tokens)):
-            self.current_token_index = (self.current_token_index + 1) % len(self.tokens)
-            token = self.tokens[self.current_token_index]
+        with self._lock:
+            original_index = self.current_token_index
             
-            if self._is_token_available(token):
-                logger.info(f"轮换到 Token {self.current_token_index + 1}")
-                return token
-        
-        # 如果所有 Token 都不可用，回到原来的 Token
-        self.current_token_index = original_index
-        logger.warning("所有 Token 都已达到速率限制")
-        return self.tokens[self.current_token_index] if self.tokens else None
+            # 尝试所有 Token
+            for _ in range(len(self.tokens)):
+                self.current_token_index = (self.current_token_index + 1) % len(self.tokens)
+                token = self.tokens[self.current_token_index]
+                
+                if self._is_token_available(token):
+                    logger.info(f"轮换到 Token {self.current_token_index + 1}")
+                    return token
+            
+            # 如果所有 Token 都不可用，回到原来的 Token
+            self.current_token_index = original_index
+            logger.warning("所有 Token 都已达到速率限制")
+            return self.tokens[self.current_token_index] if self.tokens else None
     
     def update_token_status(self, token: str, remaining: int, reset_time: int) -> None:
         """更新 Token 状态"""
-        if token in self.token_status:
-            self.token_status[token].update({
-                'remaining': remaining,
-                'reset_time': datetime.fromtimestamp(reset_time),
-                'last_check': datetime.now()
-            })
+        with self._lock:
+            if token in self.token_status:
+                self.token_status[token].update({
+                    'remaining': remaining,
+                    'reset_time': datetime.fromtimestamp(reset_time),
+                    'last_check': datetime.now()
+                })
     
     def check_rate_limit(self, token: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """检查指定 Token 的速率限制状态"""
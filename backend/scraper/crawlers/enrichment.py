@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+趋势仓库批量补全
+HTML 页面没有仓库 ID、创建/更新时间、主题和许可证，
+解析后用少量 GraphQL 批量查询补全，结果按 full_name 缓存，跨时间段共享
+"""
+
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+from backend.scraper.core.models import RepoRecord
+from backend.scraper.core.serializer import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent.parent.parent
+DEFAULT_ENRICHMENT_PATH = project_root / 'data' / 'trending_cache' / 'enrichment.json'
+
+REPOSITORY_FIELDS = """
+    databaseId
+    createdAt
+    updatedAt
+    pushedAt
+    licenseInfo { spdxId }
+    repositoryTopics(first: 20) { nodes { topic { name } } }
+    issues(states: OPEN) { totalCount }
+"""
+
+
+def build_batch_query(full_names: List[str]) -> Tuple[str, Dict[str, str]]:
+    """为一批仓库构建带别名的 GraphQL 查询，仓库名通过变量传入"""
+    params = []
+    selections = []
+    variables = {}
+    for i, full_name in enumerate(full_names):
+        owner, name = full_name.split('/', 1)
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = name
+        params.append(f"$o{i}: String!, $n{i}: String!")
+        selections.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{{REPOSITORY_FIELDS}}}")
+    query = f"query({', '.join(params)}) {{\n" + "\n".join(selections) + "\n}"
+    return query, variables
+
+
+def _node_to_fields(node: Dict[str, Any]) -> Dict[str, Any]:
+    topics = (node.get('repositoryTopics') or {}).get('nodes') or []
+    return {
+        'id': node.get('databaseId'),
+        'created_at': node.get('createdAt'),
+        'updated_at': node.get('updatedAt'),
+        'pushed_at': node.get('pushedAt'),
+        'license': (node.get('licenseInfo') or {}).get('spdxId'),
+        'topics': [t['topic']['name'] for t in topics if t.get('topic')],
+        'open_issues_count': (node.get('issues') or {}).get('totalCount', 0),
+    }
+
+
+class RepoEnricher:
+    """基于 GraphQL 的批量补全（线程安全，结果持久化缓存 ttl 秒）"""
+
+    def __init__(self, api_client, cache_path: Optional[Path] = None,
+                 ttl: float = 24 * 3600, batch_size: int = 50):
+        self.api_client = api_client
+        self.cache_path = Path(cache_path) if cache_path else DEFAULT_ENRICHMENT_PATH
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._cache: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_path.exists():
+                try:
+                    self._cache = read_json(self.cache_path).get('repositories', {})
+                except Exception as e:
+                    logger.warning(f"读取补全缓存失败: {e}")
+        return self._cache
+
+    def _fresh(self, entry: Optional[Dict[str, Any]], now: float) -> bool:
+        return bool(entry) and now - entry.get('fetched_at', 0) < self.ttl
+
+    def _query(self, full_names: List[str]) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+        query, variables = build_batch_query(full_names)
+        data = self.api_client.graphql(query, variables)
+        if data is None:
+            return None
+        return {full_name: data.get(f"r{i}") for i, full_name in enumerate(full_names)}
+
+    def enrich(self, records: Iterable[RepoRecord], deadline: Optional[float] = None) -> int:
+        """补全记录（原地修改），返回补全的条数
+
+        缓存未命中的仓库按 batch_size 分批查询；同一时刻只有一个调用方发出查询，
+        并发的其他时间段等待后直接命中缓存。
+        deadline 为 time.monotonic() 的截止时间：到期后不再发出查询，
+        查询结束时已过期则只写入缓存、不修改记录（调用方已不再等待结果）。
+        """
+        records = [r for r in records if r.full_name and '/' in r.full_name]
+        with self._lock:
+            cache = self._load()
+            now = time.time()
+            missing = list(dict.fromkeys(
+                r.full_name for r in records if not self._fresh(cache.get(r.full_name), now)
+            ))
+
+            fetched = 0
+            for start in range(0, len(missing), self.batch_size):
+                if deadline is not None and time.monotonic() >= deadline:
+                    logger.warning(f"补全超出时间预算，跳过剩余 {len(missing) - start} 个仓库")
+                    break
+                batch = missing[start:start + self.batch_size]
+                try:
+                    nodes = self._query(batch)
+                except Exception as e:
+                    logger.warning(f"GraphQL 补全失败: {e}")
+                    nodes = None
+                if nodes is None:
+                    # 通常是缺少 Token 或额度耗尽，本轮不再继续查询
+                    logger.warning(f"GraphQL 补全不可用，跳过剩余 {len(missing) - start} 个仓库")
+                    break
+                for full_name, node in nodes.items():
+                    # 不存在或无权访问的仓库也缓存，避免重复查询
+                    entry = _node_to_fields(node) if node else {'missing': True}
+                    entry['fetched_at'] = now
+                    cache[full_name] = entry
+                    fetched += 1
+
+            if fetched:
+                try:
+                    self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    write_json(self.cache_path, {'repositories': cache}, pretty=False)
+                except Exception as e:
+                    logger.error(f"保存补全缓存失败: {e}")
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return 0
+
+            enriched = 0
+            for record in records:
+                entry = cache.get(record.full_name)
+                if not entry or entry.get('missing'):
+                    continue
+                for field, value in entry.items():
+                    if field != 'fetched_at' and value is not None:
+                        setattr(record, field, value)
+                enriched += 1
+
+        logger.info(f"趋势仓库补全: {enriched}/{len(records)} 条，本次 GraphQL 查询 {fetched} 个仓库")
+        return enriched
@@ -5,23 +5,78 @@ GitHub Trending HTML 爬虫
 解析 https://github.com/trending 上的每日/每周/每月趋势
 """
 
+import os
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from bs4 import BeautifulSoup
 import time
 import random
 
+from backend.scraper.core.models import RepoRecord
+from backend.scraper.core.host_budget import HostBudget, Throttled, parse_retry_after
+from backend.scraper.crawlers.trending_parsers import parse_trending_html, resolve_backend, article_block_hash
+from backend.scraper.storage.page_cache import PageCache
+from backend.scraper.storage.poll_schedule import PollSchedule
+from backend.scraper.crawlers.enrichment import RepoEnricher
+
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://github.com/trending"
 
+# 热门语言的趋势页面
+POPULAR_LANGUAGES = [
+    'javascript', 'python', 'java', 'typescript', 'c++', 'c#', 'php',
+    'c', 'shell', 'go', 'rust', 'kotlin', 'swift', 'dart', 'ruby',
+    'scala', 'r', 'matlab', 'perl', 'lua', 'haskell', 'clojure',
+    'vue', 'html', 'css', 'scss', 'less'
+]
+
+# 同一进程内所有 github.com HTML 请求共享的主机预算（并发数和请求间隔可通过环境变量调整）
+GITHUB_HTML_BUDGET = HostBudget(
+    max_concurrent=int(os.getenv('TRENDING_CONCURRENCY', '6')),
+    min_interval=float(os.getenv('TRENDING_MIN_INTERVAL', '0.25'))
+)
+
+# 搜索 API 补充数据：各时间段的天数和最低星数
+SEARCH_WINDOWS = {
+    'daily': (1, 10),
+    'weekly': (7, 50),
+    'monthly': (30, 100),
+}
+
+# 搜索结果中比 HTML 页面更准确的字段，合并时覆盖 HTML 的占位值
+API_PREFERRED_FIELDS = ('id', 'created_at', 'updated_at', 'pushed_at', 'topics', 'license', 'open_issues_count')
+
 class GitHubTrendingHTMLCrawler:
     """通过解析 GitHub Trending HTML 页面获取趋势仓库"""
 
-    def __init__(self, session: Optional[requests.Session] = None):
+    def __init__(self, session: Optional[requests.Session] = None, budget: Optional[HostBudget] = None,
+                 api_client=None, parser_backend: Optional[str] = None,
+                 page_cache: Optional[PageCache] = None, poll_schedule: Optional[PollSchedule] = None,
+                 enricher: Optional[RepoEnricher] = None):
         self.session = session or requests.Session()
+        # 页面缓存：条件请求和内容哈希，未变化的页面不重新解析
+        self.page_cache = page_cache or PageCache()
+        # 轮询计划：按页面变化频率决定是否需要重新抓取
+        self.poll_schedule = poll_schedule or PollSchedule(
+            path=self.page_cache.path.with_name('schedule.json'),
+            min_interval=float(os.getenv('TRENDING_POLL_MIN_INTERVAL', '900')),
+            max_staleness=float(os.getenv('TRENDING_MAX_STALENESS', str(6 * 3600)))
+        )
+        # 批量补全：有 API 客户端时用 GraphQL 补全 HTML 页面缺少的字段
+        self.enricher = enricher
+        if self.enricher is None and api_client is not None and os.getenv('TRENDING_ENRICH', '1') != '0':
+            self.enricher = RepoEnricher(api_client, cache_path=self.page_cache.path.with_name('enrichment.json'))
+        # HTML 解析后端（selectolax / lxml / bs4），默认按可用情况自动选择
+        self.parser_backend = resolve_backend(parser_backend)
+        # 可选的 GitHub API 客户端，用于搜索补充数据
+        self.api_client = api_client
+        # 所有并发请求共享同一主机预算
+        self.budget = budget or GITHUB_HTML_BUDGET
         # 禁用环境代理（若本地有不可用的代理变量会影响访问）
         self.session.trust_env = False
         self.session.proxies = {}
@@ -44,16 +99,63 @@ class GitHubTrendingHTMLCrawler:
             "Upgrade-Insecure-Requests": "1"
         }
 
-    def fetch(self, period: str = "daily", language: Optional[str] = None, max_retries: int = 3) -> List[Dict[str, Any]]:
+    def fetch(self, period: str = "daily", language: Optional[str] = None, max_retries: int = 3) -> List[RepoRecord]:
         """抓取 GitHub Trending 页面
         period: daily | weekly | monthly
         language: 语言路径段（如 'python'），None 表示全部语言
         max_retries: 最大重试次数
         """
+        return self.fetch_page(period, language, max_retries)[0]
+
+    def fetch_page(self, period: str = "daily", language: Optional[str] = None, max_retries: int = 3,
+                   persist: bool = True) -> Tuple[List[RepoRecord], bool]:
+        """抓取 Trending 页面，返回 (仓库列表, 内容是否变化)
+
+        发送带 ETag / Last-Modified 的条件请求；304 或条目区块哈希未变时直接返回缓存的
+        解析结果。persist=False 时由调用方批量保存缓存。
+        被限流时在当前线程等待主机冷却结束后重试；异步调用方应使用 collect_trending，
+        由事件循环重新排队而不占用线程。
+        """
+        result = None
+        for attempt in range(max_retries + 1):
+            try:
+                result = self._request_page(period, language, max_retries)
+                break
+            except Throttled as e:
+                if attempt == max_retries:
+                    logger.error(f"多次被限流，放弃 {period} {language or '全语言'} 趋势页面")
+                else:
+                    logger.warning(f"{e}，冷却结束后重试 {period} {language or '全语言'} 趋势页面")
+        if persist:
+            self.page_cache.save()
+        return result if result is not None else ([], False)
+
+    def fetch_scheduled(self, period: str = "daily", language: Optional[str] = None,
+                        max_retries: int = 3) -> Tuple[List[RepoRecord], bool]:
+        """按轮询计划抓取：未到期的页面直接使用缓存结果，不发请求
+
+        被限流时抛出 Throttled，由调用方重新排队。
+        """
+        cache_key = _cache_key(period, language)
+        if not self.poll_schedule.is_due(cache_key) and self.page_cache.get(cache_key):
+            return self.page_cache.records(cache_key), False
+
+        result = self._request_page(period, language, max_retries)
+        if result is None:
+            # 抓取失败不计入变化统计，尽量返回旧结果
+            return self.page_cache.records(cache_key), False
+
+        self.poll_schedule.record(cache_key, result[1])
+        return result
+
+    def _request_page(self, period: str, language: Optional[str],
+                      max_retries: int) -> Optional[Tuple[List[RepoRecord], bool]]:
+        """发送（条件）请求并解析，全部重试失败时返回 None，被限流时抛出 Throttled"""
         params = {"since": period}
         url = BASE_URL
         if language and language.lower() != "all":
             url = f"{BASE_URL}/{language}"
+        cache_key = _cache_key(period, language)
 
         for attempt in range(max_retries + 1):
             try:
@@ -65,22 +167,46 @@ class GitHubTrendingHTMLCrawler:
                     logger.info(f"等待 {delay:.1f} 秒后重试...")
                     time.sleep(delay)
 
-                resp = self.session.get(
-                    url,
-                    params=params,
-                    headers=self.headers,
-                    timeout=(10, 30),  # (连接超时, 读取超时)
-                    allow_redirects=True
-                )
+                headers = dict(self.headers)
+                headers.update(self.page_cache.conditional_headers(cache_key))
+
+                with self.budget.slot():
+                    resp = self.session.get(
+                        url,
+                        params=params,
+                        headers=headers,
+                        timeout=(10, 30),  # (连接超时, 读取超时)
+                        allow_redirects=True
+                    )
+
+                etag = resp.headers.get('ETag')
+                last_modified = resp.headers.get('Last-Modified')
+
+                if resp.status_code == 429:
+                    # 不在请求循环内休眠：通知主机预算收缩窗口并冷却，由调用方重新排队
+                    logger.warning(f"请求被限制 (429): {url}")
+                    self.budget.on_throttle(parse_retry_after(resp.headers.get('Retry-After')))
+                    raise Throttled(self.budget.cooldown_remaining())
+
+                if resp.status_code in (200, 304):
+                    self.budget.on_success()
+
+                if resp.status_code == 304 and self.page_cache.get(cache_key):
+                    logger.info(f"{period} 趋势页面未修改 (304): {url}")
+                    self.page_cache.touch(cache_key, etag, last_modified)
+                    return self.page_cache.records(cache_key), False
+                elif resp.status_code == 200:
+                    content_hash = article_block_hash(resp.text)
+                    cached = self.page_cache.get(cache_key)
+                    if cached and cached.get('hash') == content_hash:
+                        logger.info(f"{period} 趋势页面内容未变化，跳过解析: {url}")
+                        self.page_cache.touch(cache_key, etag, last_modified)
+                        return self.page_cache.records(cache_key), False
 
-                if resp.status_code == 200:
                     logger.info(f"成功获取 {period} 趋势页面")
-                    return self._parse_html(resp.text)
-                elif resp.status_code == 429:
-                    logger.warning(f"请求被限制 (429)，等待后重试...")
-                    if attempt < max_retries:
-                        time.sleep(60)  # 等待1分钟
-                        continue
+                    items = self._parse_html(resp.text)
+                    self.page_cache.put(cache_key, etag, last_modified, content_hash, items)
+                    return items, True
                 else:
                     logger.error("请求 Trending 失败: %s - %s", resp.status_code, resp.text[:200])
 
@@ -97,105 +223,173 @@ class GitHubTrendingHTMLCrawler:
                 logger.error(f"所有重试都失败了，无法获取 {period} 趋势数据")
                 break
 
-        return []
+        return None
 
-    def _parse_html(self, html: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(html, "lxml")
-        items = []
-        for article in soup.select("article.Box-row"):
-            try:
-                # 仓库名 owner/name
-                title_a = article.select_one("h2 a")
-                if not title_a:
+    async def get_comprehensive_trending(self, period: str = "daily", languages: Optional[List[str]] = None,
+                                         time_budget: Optional[float] = None,
+                                         include_search: bool = True) -> List[RepoRecord]:
+        """并发汇总多个来源的趋势仓库
+
+        同时抓取全语言页面、各语言页面，以及（配置了 api_client 时）搜索 API 的近期热门仓库，
+        按 full_name 去重合并。超过 time_budget 秒仍未完成的来源被放弃，返回已到达的结果。
+        需要根据页面是否变化决定是否保存的调用方（如定时任务）应使用 collect_trending。
+        """
+        repos, _ = await self.collect_trending(period, languages, time_budget, include_search)
+        return repos
+
+    async def collect_trending(self, period: str = "daily", languages: Optional[List[str]] = None,
+                               time_budget: Optional[float] = None, include_search: bool = True,
+                               max_requeues: int = 3) -> Tuple[List[RepoRecord], bool]:
+        """同 get_comprehensive_trending，额外返回是否有 HTML 页面内容发生变化"""
+        languages = POPULAR_LANGUAGES if languages is None else languages
+        if time_budget is None:
+            time_budget = float(os.getenv('TRENDING_TIME_BUDGET', '120'))
+
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+        # 线程数与主机预算一致，实际并发仍由预算控制
+        executor = ThreadPoolExecutor(max_workers=self.budget.max_concurrent)
+
+        try:
+            # 来源顺序即合并优先级：全语言页面、各语言页面、搜索结果
+            sources = [None] + [lang for lang in languages if lang and lang.lower() != 'all']
+
+            async def fetch_html(lang: Optional[str]) -> Tuple[List[RepoRecord], bool]:
+                # 被限流的页面在事件循环中等待冷却后重新排队，不阻塞其他页面和协程
+                for _ in range(max_requeues + 1):
+                    await self.budget.wait_ready()
+                    try:
+                        return await loop.run_in_executor(executor, self.fetch_scheduled, period, lang)
+                    except Throttled as e:
+                        logger.warning(f"{period} {lang or '全语言'} 页面{e}，重新排队")
+                logger.error(f"{period} {lang or '全语言'} 页面多次被限流，使用缓存结果")
+                return self.page_cache.records(_cache_key(period, lang)), False
+
+            tasks = [asyncio.ensure_future(fetch_html(lang)) for lang in sources]
+            labels = [lang or '全语言' for lang in sources]
+
+            if include_search and self.api_client is not None and period in SEARCH_WINDOWS:
+                days, min_stars = SEARCH_WINDOWS[period]
+                tasks.append(asyncio.ensure_future(self._get_recent_trending(days, min_stars, 100, executor)))
+                labels.append('搜索API')
+
+            done, pending = await asyncio.wait(tasks, timeout=time_budget)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"{period} 趋势汇总超出时间预算 {time_budget:.0f} 秒，"
+                               f"放弃 {len(pending)}/{len(tasks)} 个未完成的来源")
+
+            index: Dict[str, RepoRecord] = {}
+            changed_pages = 0
+            for task, label in zip(tasks, labels):
+                if task not in done:
+                    continue
+                from_api = label == '搜索API'
+                try:
+                    if from_api:
+                        repos = task.result() or []
+                    else:
+                        repos, changed = task.result()
+                        changed_pages += changed
+                except Exception as e:
+                    logger.warning(f"获取 {period} {label} 数据失败: {e}")
                     continue
-                full_name = title_a.get_text(strip=True).replace("\n", "").replace(" ", "")
-                # full_name 形如 owner/repo
-                owner, name = full_name.split("/") if "/" in full_name else (full_name, full_name)
-
-                # 描述
-                desc_el = article.select_one("p")
-                description = desc_el.get_text(strip=True) if desc_el else ""
-
-                # 主要语言
-                lang_el = article.select_one("span[itemprop='programmingLanguage']")
-                language = lang_el.get_text(strip=True) if lang_el else None
-
-                # Star 和 Fork 数（页面上的 total 值）
-                # 尝试多种选择器来获取stars和forks数据
-                stars_el = (article.select_one("a[href*='/stargazers']") or
-                           article.select_one("a[href$='/stargazers']") or
-                           article.select_one("a[aria-label*='star']"))
-                forks_el = (article.select_one("a[href*='/network/members']") or
-                           article.select_one("a[href*='/forks']") or
-                           article.select_one("a[href$='/forks']") or
-                           article.select_one("a[aria-label*='fork']"))
-
-                stars = _parse_number(stars_el.get_text(strip=True)) if stars_el else 0
-                forks = _parse_number(forks_el.get_text(strip=True)) if forks_el else 0
-
-                # 如果仍然获取不到，尝试从页面的其他位置获取
-                if stars == 0:
-                    # 尝试从其他可能的位置获取stars
-                    star_spans = article.select("span")
-                    for span in star_spans:
-                        text = span.get_text(strip=True)
-                        if "star" in text.lower() and any(c.isdigit() for c in text):
-                            stars = _parse_number(text.split()[0])
-                            break
-
-                if forks == 0:
-                    # 尝试从其他可能的位置获取forks
-                    fork_spans = article.select("span")
-                    for span in fork_spans:
-                        text = span.get_text(strip=True)
-                        if "fork" in text.lower() and any(c.isdigit() for c in text):
-                            forks = _parse_number(text.split()[0])
-                            break
-
-                # 今日/本周期新增 star（页面右下角的 "xxx stars today"）
-                today_el = article.select_one("span.d-inline-block.float-sm-right")
-                today_text = today_el.get_text(strip=True) if today_el else ""
-                today_stars = _parse_number(today_text.split(" ")[0]) if today_text else 0
-
-                item = {
-                    "id": hash(f"{owner}/{name}") % 1000000,  # 生成数字ID
-                    "name": name,
-                    "full_name": f"{owner}/{name}",
-                    "description": description or "",
-                    "html_url": f"https://github.com/{owner}/{name}",
-                    "stargazers_count": stars,
-                    "language": language or "",
-                    "forks_count": forks,
-                    "open_issues_count": 0,  # HTML页面无此信息，设为0
-                    "created_at": datetime.now().isoformat(),  # 使用当前时间
-                    "updated_at": datetime.now().isoformat(),  # 使用当前时间
-                    "topics": [],  # HTML页面无此信息，设为空数组
-                    "license": None,  # HTML页面无此信息
-                    "owner": {
-                        "login": owner,
-                        "avatar_url": f"https://github.com/{owner}.png"  # GitHub头像URL格式
-                    },
-                    # 额外字段，用于兼容
-                    "today_stars": today_stars,
-                    "pushed_at": None,
-                    "scraped_at": datetime.now().isoformat(),
-                }
-                items.append(item)
+
+                for repo in repos:
+                    existing = index.get(repo.full_name)
+                    if existing is None:
+                        if repo.full_name:
+                            index[repo.full_name] = repo
+                    elif from_api:
+                        _merge_api_fields(existing, repo)
+
+            results = list(index.values())
+
+            # 补全真实 ID、时间、主题和许可证（缓存跨时间段共享），只使用剩余的时间预算
+            remaining = time_budget - (loop.time() - started)
+            if self.enricher is not None and results and remaining <= 0:
+                logger.warning(f"{period} 趋势汇总已用完时间预算，跳过补全")
+            elif self.enricher is not None and results:
+                try:
+                    await asyncio.wait_for(loop.run_in_executor(
+                        executor, self.enricher.enrich, results, time.monotonic() + remaining
+                    ), timeout=remaining)
+                except asyncio.TimeoutError:
+                    logger.warning(f"{period} 趋势仓库补全超出剩余时间预算 {remaining:.0f} 秒，返回未补全的结果")
+                except Exception as e:
+                    logger.warning(f"{period} 趋势仓库补全失败: {e}")
+
+            logger.info(f"{period} 趋势汇总完成: {len(done)}/{len(tasks)} 个来源"
+                        f"（{changed_pages}/{len(sources)} 个页面有变化），"
+                        f"{len(results)} 个去重后的项目，耗时 {loop.time() - started:.1f} 秒")
+            return results, changed_pages > 0
+
+        finally:
+            self.page_cache.save()
+            self.poll_schedule.save()
+            # 不等待超时来源的线程结束，其结果会被丢弃
+            executor.shutdown(wait=False)
+
+    async def _get_recent_trending(self, days: int, min_stars: int, max_results: int,
+                                   executor: Optional[ThreadPoolExecutor] = None) -> List[RepoRecord]:
+        """通过搜索 API 获取最近指定天数的热门项目（多个查询并发执行）"""
+        since_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+        # 构建多个查询以获取更多样化的数据
+        queries = [
+            f'created:>{since_date} stars:>{min_stars}',
+            f'pushed:>{since_date} stars:>{min_stars//2}',
+            f'created:>{since_date} language:JavaScript stars:>5',
+            f'created:>{since_date} language:Python stars:>5',
+            f'created:>{since_date} language:TypeScript stars:>5',
+        ]
+        loop = asyncio.get_event_loop()
+
+        async def run_query(query: str) -> List[Dict[str, Any]]:
+            items = []
+            try:
+                for page in range(1, 3):  # 最多2页
+                    search_result = await loop.run_in_executor(executor, partial(
+                        self.api_client.search_repositories,
+                        query=query, sort='stars', order='desc', per_page=50, page=page
+                    ))
+                    if not search_result or not search_result.get('items'):
+                        break
+                    items.extend(search_result['items'])
+                    if len(items) >= max_results:
+                        break
             except Exception as e:
-                logger.warning("解析单项失败: %s", e)
-                continue
-        return items
-
-
-def _parse_number(text: str) -> int:
-    """将 '1,234' 或 '1.2k' 等文本解析为整数"""
-    try:
-        t = text.lower().replace(",", "").strip()
-        if t.endswith("k"):
-            return int(float(t[:-1]) * 1000)
-        if t.endswith("m"):
-            return int(float(t[:-1]) * 1_000_000)
-        return int(float(t))
-    except Exception:
-        return 0
+                logger.warning(f"查询失败 '{query}': {e}")
+            return items
+
+        results = await asyncio.gather(*(run_query(query) for query in queries))
+
+        all_repos: Dict[str, RepoRecord] = {}
+        for items in results:
+            for item in items:
+                repo_key = item.get('full_name')
+                if repo_key and repo_key not in all_repos:
+                    all_repos[repo_key] = RepoRecord.from_api(item)
+
+        # 按星数排序
+        repos = sorted(all_repos.values(), key=lambda x: x.stargazers_count, reverse=True)
+        return repos[:max_results]
+
+    def _parse_html(self, html: str) -> List[RepoRecord]:
+        return parse_trending_html(html, self.parser_backend)
+
+
+def _cache_key(period: str, language: Optional[str]) -> str:
+    url = BASE_URL
+    if language and language.lower() != "all":
+        url = f"{BASE_URL}/{language}"
+    return f"{url}?since={period}"
+
 
+def _merge_api_fields(target: RepoRecord, source: RepoRecord) -> None:
+    """用搜索 API 的准确字段补全 HTML 页面解析出的记录"""
+    for field in API_PREFERRED_FIELDS:
+        value = getattr(source, field)
+        if value:
+            setattr(target, field, value)
@@ -9,16 +9,19 @@
 import os
 import sys
 import time
-import json
 import random
 import argparse
 import requests
 import datetime
 import traceback
 import re
+import math
+import asyncio
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union, Iterable
 from urllib.parse import quote_plus
 
 # 添加项目根目录到 Python 路径
@@ -53,7 +56,14 @@ except ImportError:
         except Exception as e:
             print(f"❌ 加载.env文件失败: {e}")
 
-from backend.scraper.core.api_client import GitHubAPIClient
+from backend.scraper.core.api_client import GitHubAPIClient, SEARCH_API_BUDGET
+from backend.scraper.core.serializer import read_json, write_json
+from backend.scraper.core.models import RepoRecord
+from backend.scraper.core.pipeline import Pipeline
+from backend.scraper.core.db import connect as db_connect, pool_metrics
+from backend.scraper.core.progress_reporter import ProgressReporter, PROGRESS_CHANNEL, progress_payload
+from backend.scraper.storage.velocity_index import VelocityIndex
+from backend.scraper.storage.crawl_checkpoint import CrawlCheckpoint
 from backend.scraper.analyzers.code_analyzer import CodeAnalyzer
 from backend.scraper.analyzers.data_analysis import GitHubDataAnalyzer
 
@@ -77,20 +87,73 @@ except ImportError:
     DB_AVAILABLE = False
     logger.warning("psycopg2 未安装，将使用模拟模式")
 
+# 搜索 API 最多返回前 1000 条结果
+SEARCH_RESULT_CAP = 1000
+
+# 批量写入时每条多行语句包含的行数
+DB_BATCH_SIZE = 500
+
+
+def _dedupe_records(records: Iterable[RepoRecord]) -> List[RepoRecord]:
+    """按仓库 ID（没有 ID 时按 full_name）去重，保留首次出现的顺序"""
+    seen = set()
+    unique = []
+    for record in records:
+        key = record.id or (record.full_name or '').lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(record)
+    return unique
+
+
+def _as_utc(value: Any) -> Optional[datetime.datetime]:
+    """把 API 返回的 ISO 时间字符串或数据库返回的时间统一为不带时区的 UTC 时间"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=0)
+
+
 class KeywordScraper:
     """关键词爬虫类"""
     
     def __init__(self):
         self.api_client = GitHubAPIClient()
         self.code_analyzer = CodeAnalyzer()
+        self.velocity = VelocityIndex()
         self.session = requests.Session()
+
+        # 仓库额外信息（语言统计、主题）按 full_name 缓存，多个关键词并发时只请求一次
+        self._extra_info: Dict[str, Future] = {}
+        self._extra_lock = threading.Lock()
+        # 各关键词最近一次流水线的阶段统计
+        self.pipeline_metrics: Dict[str, Dict[str, Any]] = {}
+        # 多关键词并发爬取时各关键词的进度，用于汇总任务总进度
+        self._keyword_progress: Dict[str, int] = {}
+        self._progress_lock = threading.Lock()
+        # 任务进度在后台合并写入（PROGRESS_FLUSH_MS 控制普通进度的最短写入间隔）
+        self.progress = ProgressReporter(
+            self._write_task_status, interval=int(os.getenv('PROGRESS_FLUSH_MS', '1000')) / 1000
+        )
+        # 已入库仓库的 full_name -> 数据库 ID，由批量写入的 RETURNING 填充
+        self._repo_ids: Dict[str, int] = {}
+        self._repo_ids_lock = threading.Lock()
+        # 任务检查点（指定任务 ID 运行时由 main 设置），中断后重新运行可从检查点恢复
+        self.checkpoint: Optional[CrawlCheckpoint] = None
         
         # 设置请求头
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         
-    async def search_repositories_by_keyword(self, keyword: str, max_results: int = 100) -> List[Dict[str, Any]]:
+    async def search_repositories_by_keyword(self, keyword: str, max_results: int = 100) -> List[RepoRecord]:
         """根据关键词搜索仓库"""
         logger.info(f"开始搜索关键词: {keyword}")
         
@@ -140,47 +203,18 @@ class KeywordScraper:
         logger.info(f"关键词 '{keyword}' 搜索完成，共获取 {len(repositories)} 个仓库")
         return repositories
     
-    def _process_repository_data(self, repo_data: Dict[str, Any], keyword: str) -> Optional[Dict[str, Any]]:
-        """处理仓库数据"""
+    def _process_repository_data(self, repo_data: Union[Dict[str, Any], RepoRecord], keyword: str) -> Optional[RepoRecord]:
+        """处理仓库数据（接受 API 原始条目或已解码的记录）"""
         try:
-            # 基本信息
-            processed = {
-                'id': repo_data.get('id'),
-                'name': repo_data.get('name'),
-                'full_name': repo_data.get('full_name'),
-                'owner': repo_data.get('owner', {}).get('login'),
-                'description': repo_data.get('description'),
-                'html_url': repo_data.get('html_url'),
-                'language': repo_data.get('language'),
-                'stargazers_count': repo_data.get('stargazers_count', 0),
-                'forks_count': repo_data.get('forks_count', 0),
-                'watchers_count': repo_data.get('watchers_count', 0),
-                'size': repo_data.get('size', 0),
-                'created_at': repo_data.get('created_at'),
-                'updated_at': repo_data.get('updated_at'),
-                'pushed_at': repo_data.get('pushed_at'),
-                'keyword': keyword,
-                'scraped_at': datetime.datetime.now().isoformat()
-            }
+            # 基本信息：只解码一次，后续流程共享同一条记录
+            processed = RepoRecord.from_api(repo_data, keyword)
+            processed.scraped_at = datetime.datetime.now().isoformat()
             
             # 获取额外信息
             try:
-                # 获取语言统计
-                languages = self.api_client.get_repository_languages(
-                    processed['owner'], 
-                    processed['name']
-                )
-                processed['languages'] = languages
-                
-                # 获取主题标签
-                topics = self.api_client.get_repository_topics(
-                    processed['owner'], 
-                    processed['name']
-                )
-                processed['topics'] = topics
-                
+                processed.languages, processed.topics = self._get_extra_info(processed.owner, processed.name)
             except Exception as e:
-                logger.warning(f"获取仓库 {processed['full_name']} 额外信息失败: {e}")
+                logger.warning(f"获取仓库 {processed.full_name} 额外信息失败: {e}")
             
             return processed
             
@@ -188,8 +222,34 @@ class KeywordScraper:
             logger.error(f"处理仓库数据失败: {e}")
             return None
     
+    def _get_extra_info(self, owner: str, name: str):
+        """获取语言统计和主题标签（同一仓库的并发请求合并为一次，结果在进程内缓存）"""
+        key = f"{owner}/{name}".lower()
+        with self._extra_lock:
+            future = self._extra_info.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._extra_info[key] = Future()
+
+        if is_owner:
+            try:
+                languages = self.api_client.get_repository_languages(owner, name)
+                topics = self.api_client.get_repository_topics(owner, name)
+                future.set_result((languages, topics))
+            except Exception as e:
+                # 失败的结果不缓存，后续请求可以重试
+                with self._extra_lock:
+                    self._extra_info.pop(key, None)
+                future.set_exception(e)
+        return future.result()
+
     async def analyze_repository_code(self, repo_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """分析仓库代码"""
+        """分析仓库代码（在线程池中执行同步版本，不阻塞事件循环）"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.analyze_repository_code_sync, repo_data)
+
+    def analyze_repository_code_sync(self, repo_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """分析仓库代码（阻塞调用，供流水线工作线程直接使用）"""
         try:
             owner = repo_data['owner']
             name = repo_data['name']
@@ -218,7 +278,7 @@ class KeywordScraper:
             
             for content in contents[:max_files]:
                 if content.get('type') == 'file':
-                    file_analysis = await self._analyze_file(owner, name, content)
+                    file_analysis = self._analyze_file(owner, name, content)
                     if file_analysis:
                         analysis_result['file_analysis'].append(file_analysis)
                         analyzed_files += 1
@@ -230,7 +290,7 @@ class KeywordScraper:
             logger.error(f"分析仓库代码失败: {e}")
             return None
     
-    async def _analyze_file(self, owner: str, name: str, file_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _analyze_file(self, owner: str, name: str, file_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """分析单个文件"""
         try:
             file_path = file_info.get('path', '')
@@ -273,6 +333,21 @@ class KeywordScraper:
             logger.error(f"分析文件失败: {e}")
             return None
     
+    def _load_previous_results(self, keyword: str, output_dir: str = 'results') -> Dict[str, Dict[str, Any]]:
+        """最近一次 save_results 保存的该关键词结果（full_name -> 仓库字典），没有时返回空字典"""
+        pattern = re.compile(rf"^{re.escape(keyword)}_\d{{8}}_\d{{6}}\.json$")
+        output_path = Path(output_dir)
+        if not output_path.is_dir():
+            return {}
+        files = sorted(p for p in output_path.iterdir() if pattern.match(p.name))
+        if not files:
+            return {}
+        try:
+            return {repo['full_name']: repo for repo in read_json(files[-1]) if repo.get('full_name')}
+        except Exception as e:
+            logger.warning(f"读取上次的结果文件失败: {files[-1]}: {e}")
+            return {}
+
     def save_results(self, results: List[Dict[str, Any]], keyword: str, output_dir: str = 'results') -> bool:
         """保存搜索结果"""
         try:
@@ -286,8 +361,7 @@ class KeywordScraper:
             filepath = output_path / filename
             
             # 保存数据
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+            write_json(filepath, results)
             
             logger.info(f"结果已保存到: {filepath}")
             return True
@@ -296,17 +370,23 @@ class KeywordScraper:
             logger.error(f"保存结果失败: {e}")
             return False
 
-    async def crawl_keyword(self, keyword: str, languages: List[str] = None, limits: Dict[str, int] = None, task_id: int = None) -> Dict[str, Any]:
-        """爬取指定关键词的仓库"""
+    async def crawl_keyword(self, keyword: str, languages: List[str] = None, limits: Dict[str, int] = None,
+                            task_id: int = None, incremental: bool = False) -> Dict[str, Any]:
+        """爬取指定关键词的仓库
+
+        incremental 时与数据库中已保存的 pushed_at 和星数比较：未变化的仓库只用搜索结果刷新基本信息，
+        跳过额外信息补全和代码分析，语言、主题和代码分析摘要从上次的结果文件或已保存的代码文件恢复
+        """
+        # 阻塞的 API / 数据库调用放到线程池，多个关键词可以在同一事件循环中并发
+        loop = asyncio.get_running_loop()
         try:
             logger.info(f"开始爬取关键词: {keyword}")
 
             # 确保关键词在数据库中存在
-            self._ensure_keyword_exists(keyword)
+            await loop.run_in_executor(None, self._ensure_keyword_exists, keyword)
 
             # 更新任务状态
-            if task_id:
-                self.update_task_status(task_id, 'running', 10, f"开始搜索关键词: {keyword}")
+            await self._report_progress(task_id, keyword, 10, f"开始搜索关键词: {keyword}")
 
             # 确定搜索参数
             max_results = 100
@@ -314,108 +394,29 @@ class KeywordScraper:
                 # 计算总的最大结果数
                 max_results = sum(limits.values()) if limits else 100
 
-            # 搜索仓库
-            repositories = []
-
-            # 如果指定了语言，按语言搜索
+            # 每种语言一个搜索查询；未指定语言时做通用搜索
             if languages:
-                for lang in languages:
-                    lang_limit = limits.get(lang.lower(), 20) if limits else 20
-                    lang_query = f"{keyword} language:{lang}"
-
-                    logger.info(f"搜索语言 {lang} 的仓库，限制 {lang_limit} 个")
-
-                    try:
-                        lang_repos = self._search_repositories_sync(lang_query, lang_limit)
-                        repositories.extend(lang_repos)
-
-                        if task_id:
-                            progress = 10 + (len(repositories) / max_results) * 60
-                            self.update_task_status(task_id, 'running', int(progress),
-                                                  f"已搜索到 {len(repositories)} 个仓库")
-
-                        # 避免API限制
-                        time.sleep(2)
-
-                    except Exception as e:
-                        logger.error(f"搜索语言 {lang} 失败: {e}")
+                queries = [
+                    (f"{keyword} language:{lang}", limits.get(lang.lower(), 20) if limits else 20)
+                    for lang in languages
+                ]
             else:
-                # 通用搜索
-                repositories = self._search_repositories_sync(keyword, max_results)
-
-            # 处理结果
-            processed_repos = []
-            for i, repo in enumerate(repositories):
-                processed = self._process_repository_data(repo, keyword)
-                if processed:
-                    processed_repos.append(processed)
-
-            # 先保存基本仓库数据到数据库
-            if DB_AVAILABLE and task_id:
-                try:
-                    self._save_to_database(processed_repos, keyword, task_id)
-                    logger.info(f"已保存 {len(processed_repos)} 个仓库到数据库")
-                except Exception as e:
-                    logger.error(f"保存到数据库失败: {e}")
+                queries = [(keyword, max_results)]
 
-            # 然后进行代码分析
-            # 可通过环境变量 CODE_ANALYSIS_LIMIT 控制分析数量
-            # 0 = 全部分析, -1 = 不分析, >0 = 分析指定数量
-            total_repos = len(processed_repos)
-            analysis_limit = int(os.getenv('CODE_ANALYSIS_LIMIT', '100'))
-            
-            if analysis_limit == 0:
-                # 全部分析
-                analyze_count = total_repos
-                logger.info(f"将分析所有 {total_repos} 个仓库的代码（全量分析模式）")
-            elif analysis_limit == -1:
-                # 不分析
-                analyze_count = 0
-                logger.info("跳过代码分析（已禁用）")
-            else:
-                # 限制分析数量
-                analyze_count = min(analysis_limit, total_repos)
-                logger.info(f"将分析 {analyze_count}/{total_repos} 个仓库的代码（限制模式）")
-            
-            if analyze_count == 0:
-                logger.info("跳过代码分析步骤")
-            
-            for i, processed in enumerate(processed_repos[:analyze_count]):
-                try:
-                    logger.info(f"开始分析仓库代码 ({i+1}/{analyze_count}): {processed['full_name']}")
-                    code_analysis = await self.analyze_repository_code(processed)
-                    if code_analysis:
-                        # 只保存简化的分析结果，避免循环引用
-                        processed['code_analysis_summary'] = {
-                            'analyzed_files': len(code_analysis.get('file_analysis', [])),
-                            'languages_found': list(code_analysis.get('language_stats', {}).keys()),
-                            'analyzed_at': code_analysis.get('analyzed_at')
-                        }
-                        # 保存代码文件数据到数据库
-                        if DB_AVAILABLE:
-                            self._save_code_analysis_to_db(processed, code_analysis)
-                        logger.info(f"✅ 成功分析并保存 {processed['full_name']} 的代码数据")
-                    else:
-                        logger.warning(f"⚠️ 未获取到 {processed['full_name']} 的代码分析数据")
-                except Exception as e:
-                    logger.warning(f"❌ 代码分析失败 {processed['full_name']}: {e}")
+            # 搜索 → 补全 → 入库 → 代码分析 流水线
+            processed_repos = await loop.run_in_executor(
+                None, self._run_pipeline, keyword, queries, task_id, max_results, incremental
+            )
 
-                # 更新进度
-                if task_id:
-                    progress = 70 + ((i + 1) / analyze_count) * 20
-                    self.update_task_status(task_id, 'running', int(progress),
-                                          f"已分析 {i+1}/{analyze_count} 个仓库代码")
-                
-                # 添加延时避免API限制（每分析5个仓库休息一下）
-                if (i + 1) % 5 == 0:
-                    logger.info(f"已分析 {i+1} 个仓库，休息2秒...")
-                    time.sleep(2)
+            # 搜索结果按星数排序，位置不代表趋势排名，只记录星数
+            self.velocity.observe_records(processed_repos, source=f"keyword:{keyword}", ranked=False)
+            self.velocity.save()
 
             # 保存到文件
-            self.save_results(processed_repos, keyword)
+            await loop.run_in_executor(None, self.save_results, processed_repos, keyword)
 
             # 生成分析文件
-            self._generate_analysis_file(processed_repos, keyword)
+            await loop.run_in_executor(None, self._generate_analysis_file, processed_repos, keyword)
 
             result = {
                 'keyword': keyword,
@@ -425,50 +426,280 @@ class KeywordScraper:
             }
 
             logger.info(f"关键词 '{keyword}' 爬取完成，共获取 {len(processed_repos)} 个仓库")
+            await self._report_progress(task_id, keyword, 100, f"关键词 '{keyword}' 爬取完成")
             return result
 
         except Exception as e:
             logger.error(f"爬取关键词 '{keyword}' 失败: {e}")
-            if task_id:
+            if task_id and keyword in self._keyword_progress:
+                # 多关键词并发时其他关键词仍在进行，最终状态由调用方汇总后更新
+                await self._report_progress(task_id, keyword, 100, f"爬取失败: {str(e)[:200]}")
+            elif task_id:
                 self.update_task_status(task_id, 'failed', 0, f"爬取失败: {str(e)[:200]}")
             return None
 
-    def _search_repositories_sync(self, query: str, max_results: int) -> List[Dict[str, Any]]:
-        """同步搜索仓库"""
-        repositories = []
-        page = 1
-        per_page = min(100, max_results)
+    async def crawl_keywords(self, keywords: List[str], languages: List[str] = None, limits: Dict[str, int] = None,
+                             task_id: int = None, concurrency: int = 3,
+                             incremental: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """并发爬取多个关键词，返回与 keywords 顺序一致的结果（失败的关键词为 None）
 
-        while len(repositories) < max_results:
-            try:
-                search_result = self.api_client.search_repositories(
-                    query=query,
-                    sort='stars',
-                    order='desc',
-                    per_page=per_page,
-                    page=page
-                )
+        所有关键词共享同一个 API 客户端（Token 池）和仓库额外信息缓存，
+        同时进行的关键词数不超过 concurrency，任务进度为各关键词进度的平均值。
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        with self._progress_lock:
+            self._keyword_progress = {keyword: 0 for keyword in keywords} if len(keywords) > 1 else {}
 
-                if not search_result or 'items' not in search_result:
-                    break
+        async def crawl_one(keyword: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self.crawl_keyword(keyword, languages, limits, task_id, incremental)
+                except Exception as e:
+                    logger.error(f"爬取关键词 '{keyword}' 时发生异常: {e}")
+                    logger.error(traceback.format_exc())
+                    return None
 
-                items = search_result['items']
-                if not items:
-                    break
+        try:
+            return await asyncio.gather(*(crawl_one(keyword) for keyword in keywords))
+        finally:
+            with self._progress_lock:
+                self._keyword_progress = {}
+
+    async def _report_progress(self, task_id: Optional[int], keyword: str, progress: int, message: str) -> None:
+        """上报任务进度（只写入内存，由后台线程落库，不阻塞事件循环）"""
+        self._report_progress_sync(task_id, keyword, progress, message)
+
+    def _report_progress_sync(self, task_id: Optional[int], keyword: str, progress: int, message: str) -> None:
+        """上报任务进度；多关键词并发时按各关键词进度的平均值汇总"""
+        if not task_id:
+            return
+        with self._progress_lock:
+            if keyword in self._keyword_progress:
+                self._keyword_progress[keyword] = progress
+                progress = sum(self._keyword_progress.values()) // len(self._keyword_progress)
+                message = f"[{keyword}] {message}"
+        self.update_task_status(task_id, 'running', int(progress), message)
+
+    def _run_pipeline(self, keyword: str, queries: List[tuple], task_id: Optional[int],
+                      max_results: int, incremental: bool = False) -> List[RepoRecord]:
+        """以流水线方式完成搜索、补全、入库和代码分析（阻塞调用，在线程池中运行）
+
+        各阶段有独立的线程池和有界队列：仓库补全后立即入库（按批），
+        入库后立即进入代码分析，不必等待上一阶段全部完成。
+        返回处理后的仓库，保持搜索结果的顺序。
+        """
+        # 可通过环境变量 CODE_ANALYSIS_LIMIT 控制分析数量
+        # 0 = 全部分析, -1 = 不分析, >0 = 分析指定数量（按完成补全的先后）
+        analysis_limit = int(os.getenv('CODE_ANALYSIS_LIMIT', '100'))
+        analysis_target = max_results if analysis_limit == 0 else analysis_limit
+        if analysis_limit == -1:
+            logger.info("跳过代码分析（已禁用）")
+        save_to_db = DB_AVAILABLE and task_id
+
+        lock = threading.Lock()
+        order: Dict[Any, int] = {}
+        counts = {'enriched': 0, 'persisted': 0, 'analyzed': 0}
+        # 增量模式下 pushed_at 未变化的仓库 -> 数据库中保存的状态（星数仍由本批入库时更新）
+        unchanged: Dict[Any, Dict[str, Any]] = {}
+        # 上一次保存的结果，用于恢复未变化仓库的补全字段
+        previous = self._load_previous_results(keyword) if incremental else {}
+
+        def record_key(record: RepoRecord) -> Any:
+            return record.id or (record.full_name or '').lower()
+
+        def search(query: tuple) -> List[RepoRecord]:
+            text, limit = query
+            logger.info(f"搜索 '{text}'，限制 {limit} 个")
+            return self._search_repositories_sync(text, limit)
+
+        def diff(batch: List[RepoRecord]) -> List[RepoRecord]:
+            # 一次查询整批仓库已保存的 pushed_at 和代码文件；只有星数变化的仓库不重新补全，
+            # 新的星数随搜索结果一起写入数据库
+            stored = self._load_stored_state([record.full_name for record in batch])
+            for record in batch:
+                state = stored.get(record.full_name)
+                if state is not None and state['pushed_at'] == _as_utc(record.pushed_at):
+                    with lock:
+                        unchanged[record_key(record)] = state
+            return batch
+
+        def restore(processed: RepoRecord, state: Dict[str, Any]) -> None:
+            # 未变化的仓库沿用上次的补全结果，没有结果文件时用已保存的代码文件生成摘要
+            last = previous.get(processed.full_name, {})
+            processed.languages = last.get('languages')
+            processed.topics = last.get('topics')
+            processed.code_analysis_summary = last.get('code_analysis_summary')
+            if processed.code_analysis_summary is None and state['code_files']:
+                processed.code_analysis_summary = {
+                    'analyzed_files': state['code_files'],
+                    'languages_found': [],
+                    'analyzed_at': state['analyzed_at'].isoformat() if state['analyzed_at'] else None,
+                }
 
-                repositories.extend(items)
+        def enrich(record: RepoRecord) -> Optional[RepoRecord]:
+            # 多个语言的查询命中同一仓库时只补全一次
+            with lock:
+                if record_key(record) in order:
+                    return None
+                order[record_key(record)] = len(order)
+            saved = self.checkpoint.get_enriched(record.full_name) if self.checkpoint else None
+            state = unchanged.get(record_key(record))
+            if state is not None or saved is not None:
+                # 未变化或检查点中已补全的仓库不再请求额外信息
+                processed = RepoRecord.from_api(record, keyword)
+                processed.scraped_at = datetime.datetime.now().isoformat()
+                if state is not None:
+                    restore(processed, state)
+                if saved is not None:
+                    processed.languages, processed.topics = saved['languages'], saved['topics']
+                return processed
+            processed = self._process_repository_data(record, keyword)
+            if processed and self.checkpoint and (processed.languages is not None or processed.topics is not None):
+                self.checkpoint.record_enriched(processed.full_name, processed.languages, processed.topics)
+            if processed:
+                with lock:
+                    counts['enriched'] += 1
+                    enriched = counts['enriched']
+                if enriched % 10 == 0:
+                    progress = min(70, 10 + (enriched / max_results) * 60)
+                    self._report_progress_sync(task_id, keyword, int(progress), f"已补全 {enriched} 个仓库")
+            return processed
 
-                if len(items) < per_page:
-                    break
+        def persist(batch: List[RepoRecord]) -> List[RepoRecord]:
+            if save_to_db:
+                with lock:
+                    counts['persisted'] += len(batch)
+                    persisted = counts['persisted']
+                try:
+                    self._save_to_database(batch, keyword, task_id, total_repositories=persisted)
+                except Exception as e:
+                    logger.error(f"保存到数据库失败: {e}")
+            return batch
+
+        def analyze(processed: RepoRecord) -> RepoRecord:
+            with lock:
+                if record_key(processed) in unchanged:
+                    return processed
+                if analysis_limit == -1 or (analysis_limit > 0 and counts['analyzed'] >= analysis_limit):
+                    return processed
+                counts['analyzed'] += 1
+                analyzed = counts['analyzed']
+
+            if self.checkpoint and self.checkpoint.is_analyzed(processed.full_name):
+                # 代码文件在中断前已入库，只恢复摘要
+                processed.code_analysis_summary = self.checkpoint.get_analysis(processed.full_name)
+                return processed
+
+            self._analyze_and_store(processed, analyzed)
+            if self.checkpoint and processed.code_analysis_summary:
+                self.checkpoint.record_analyzed(processed.full_name, processed.code_analysis_summary)
+            progress = min(90, 70 + (analyzed / max(1, analysis_target)) * 20)
+            self._report_progress_sync(task_id, keyword, int(progress), f"已分析 {analyzed} 个仓库代码")
+
+            # 添加延时避免API限制（每分析5个仓库休息一下）
+            if analyzed % 5 == 0:
+                logger.info(f"已分析 {analyzed} 个仓库，休息2秒...")
+                time.sleep(2)
+            return processed
 
-                page += 1
-                time.sleep(1)  # 避免API限制
+        pipeline = Pipeline(f"keyword:{keyword}").add_stage(
+            'search', search, workers=min(len(queries), SEARCH_API_BUDGET.max_concurrent),
+            queue_size=len(queries), fan_out=True
+        )
+        if incremental and DB_AVAILABLE:
+            pipeline.add_stage('diff', diff, batch_size=100, queue_size=200)
+        elif incremental:
+            logger.warning("数据库不可用，增量模式退化为全量爬取")
+        (
+            pipeline
+            .add_stage('enrich', enrich, workers=int(os.getenv('KEYWORD_ENRICH_WORKERS', '4')), queue_size=50)
+            .add_stage('persist', persist, batch_size=25, queue_size=50)
+            .add_stage('analyze', analyze, workers=int(os.getenv('CODE_ANALYSIS_WORKERS', '2')), queue_size=20)
+        )
+
+        def log_metrics(metrics: Dict[str, Dict[str, Any]]) -> None:
+            logger.info(f"流水线 '{keyword}': " + ", ".join(
+                f"{name} 已处理 {m['processed']} 队列 {m['queue_depth']}" for name, m in metrics.items()
+            ))
+
+        processed_repos = pipeline.run(queries, on_tick=log_metrics)
+        processed_repos.sort(key=lambda record: order[record_key(record)])
+
+        if incremental:
+            logger.info(f"增量模式：{len(unchanged)}/{len(processed_repos)} 个仓库未变化，已跳过补全和代码分析")
+        self.pipeline_metrics[keyword] = pipeline.metrics()
+        logger.info(f"关键词 '{keyword}' 流水线统计: {self.pipeline_metrics[keyword]}")
+        return processed_repos
+
+    def _analyze_and_store(self, processed: RepoRecord, index: int) -> None:
+        """分析单个仓库的代码并保存摘要和代码文件数据"""
+        try:
+            logger.info(f"开始分析仓库代码 ({index}): {processed['full_name']}")
+            # 流水线工作线程中直接同步调用，不再为每个仓库创建和销毁事件循环
+            code_analysis = self.analyze_repository_code_sync(processed)
+            if code_analysis:
+                # 只保存简化的分析结果，避免循环引用
+                processed['code_analysis_summary'] = {
+                    'analyzed_files': len(code_analysis.get('file_analysis', [])),
+                    'languages_found': list(code_analysis.get('language_stats', {}).keys()),
+                    'analyzed_at': code_analysis.get('analyzed_at')
+                }
+                # 保存代码文件数据到数据库
+                if DB_AVAILABLE:
+                    self._save_code_analysis_to_db(processed, code_analysis)
+                logger.info(f"✅ 成功分析并保存 {processed['full_name']} 的代码数据")
+            else:
+                logger.warning(f"⚠️ 未获取到 {processed['full_name']} 的代码分析数据")
+        except Exception as e:
+            logger.warning(f"❌ 代码分析失败 {processed['full_name']}: {e}")
+
+    def _search_page(self, query: str, per_page: int, page: int) -> Optional[Dict[str, Any]]:
+        """请求一页搜索结果（失败时返回 None）；检查点中已有的页面直接返回"""
+        if self.checkpoint:
+            saved = self.checkpoint.get_page(query, per_page, page)
+            if saved is not None:
+                return saved
+        try:
+            result = self.api_client.search_repositories(
+                query=query,
+                sort='stars',
+                order='desc',
+                per_page=per_page,
+                page=page
+            )
+        except Exception as e:
+            logger.error(f"搜索第 {page} 页时出错: {e}")
+            return None
+        if result and self.checkpoint:
+            # 只记录后续流程需要的字段，不保存完整的 API 条目
+            self.checkpoint.record_page(query, per_page, page, result.get('total_count', 0),
+                                        [RepoRecord.from_api(item).to_dict() for item in result.get('items') or []])
+        return result
+
+    def _search_repositories_sync(self, query: str, max_results: int) -> List[RepoRecord]:
+        """同步搜索仓库，返回解码后的仓库记录（不保留完整的 API 条目）
+
+        第一页确定结果总数后，其余页面并发请求，请求节奏由搜索 API 预算控制；
+        翻页期间排序可能变化，结果按仓库 ID 去重。
+        """
+        per_page = min(100, max_results)
 
-            except Exception as e:
-                logger.error(f"搜索第 {page} 页时出错: {e}")
-                break
+        first = self._search_page(query, per_page, 1)
+        if not first or not first.get('items'):
+            return []
+
+        total = min(first.get('total_count', 0), SEARCH_RESULT_CAP)
+        pages = min(math.ceil(max_results / per_page), math.ceil(total / per_page))
+
+        page_items = [first['items']]
+        if pages > 1:
+            workers = min(pages - 1, SEARCH_API_BUDGET.max_concurrent)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(lambda page: self._search_page(query, per_page, page), range(2, pages + 1))
+                page_items.extend((result or {}).get('items') or [] for result in results)
 
-        return repositories[:max_results]
+        records = _dedupe_records(RepoRecord.from_api(item) for items in page_items for item in items)
+        return records[:max_results]
 
     def _ensure_keyword_exists(self, keyword: str):
         """确保关键词在数据库中存在"""
@@ -476,6 +707,7 @@ class KeywordScraper:
             logger.info(f"数据库不可用，跳过关键词 '{keyword}' 的数据库操作")
             return
 
+        conn = None
         try:
             conn = self._get_db_connection()
             if not conn:
@@ -502,12 +734,13 @@ class KeywordScraper:
 
             conn.commit()
             cursor.close()
-            conn.close()
 
         except Exception as e:
             logger.error(f"确保关键词存在时出错: {e}")
             if conn:
                 conn.rollback()
+        finally:
+            if conn:
                 conn.close()
 
     def _generate_analysis_file(self, repositories: List[Dict[str, Any]], keyword: str):
@@ -515,22 +748,10 @@ class KeywordScraper:
         try:
             logger.info(f"开始生成关键词 '{keyword}' 的分析文件...")
 
-            # 创建临时数据文件
-            temp_file = f"temp_analysis_{keyword.replace(' ', '_')}.json"
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(repositories, f, ensure_ascii=False, indent=2)
-
-            # 创建分析器
+            # 创建分析器，直接传入内存中的数据（无需临时文件）
             analyzer = GitHubDataAnalyzer()
             analyzer.keyword = keyword
-
-            # 加载数据
-            if not analyzer.load_data_from_json(temp_file):
-                logger.error(f"加载临时数据文件失败: {temp_file}")
-                return
-
-            # 生成分析报告
-            analyzer.generate_summary_report()
+            analyzer.data = repositories
 
             # 确保analytics目录存在
             analytics_dir = project_root / 'public' / 'analytics'
@@ -546,19 +767,33 @@ class KeywordScraper:
             else:
                 logger.error(f"保存分析文件失败: {output_file}")
 
-            # 清理临时文件
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-
         except Exception as e:
             logger.error(f"生成分析文件失败: {e}")
             logger.error(traceback.format_exc())
 
+    def _lookup_repo_id(self, conn, cursor, full_name: str) -> Optional[int]:
+        """仓库的数据库 ID：优先使用本次爬取入库时记录的映射，没有时再查询"""
+        with self._repo_ids_lock:
+            repo_id = self._repo_ids.get(full_name)
+        if repo_id is not None:
+            return repo_id
+
+        conn.execute_prepared(
+            cursor, 'repo_id_by_full_name', 'SELECT id FROM repositories WHERE full_name = $1', (full_name,)
+        )
+        repo_record = cursor.fetchone()
+        if not repo_record:
+            return None
+        with self._repo_ids_lock:
+            self._repo_ids[full_name] = repo_record[0]
+        return repo_record[0]
+
     def _save_code_analysis_to_db(self, repo_data: Dict[str, Any], code_analysis: Dict[str, Any]):
-        """保存代码分析数据到数据库"""
+        """保存代码分析数据到数据库（一个仓库的全部代码文件用一条多行 upsert 写入）"""
         if not DB_AVAILABLE:
             return
 
+        conn = None
         try:
             conn = self._get_db_connection()
             if not conn:
@@ -566,71 +801,70 @@ class KeywordScraper:
 
             cursor = conn.cursor()
 
-            # 查找仓库ID
-            cursor.execute('SELECT id FROM repositories WHERE full_name = %s', (repo_data['full_name'],))
-            repo_record = cursor.fetchone()
-
-            if not repo_record:
+            repo_id = self._lookup_repo_id(conn, cursor, repo_data['full_name'])
+            if repo_id is None:
                 logger.warning(f"未找到仓库记录: {repo_data['full_name']}")
                 return
 
-            repo_id = repo_record[0]
-
-            # 保存代码文件分析数据
+            # 同一路径只保留最后一条（ON CONFLICT 不能在一条语句中两次更新同一行）
+            now = datetime.datetime.now()
+            rows = {}
             for file_analysis in code_analysis.get('file_analysis', []):
-                try:
-                    # 提取库和包信息
-                    imported_libraries = file_analysis.get('imports', [])
-                    packages = []  # 暂时为空，可以后续扩展
-                    functions = []  # 暂时为空，可以后续扩展
-
-                    # 插入代码文件记录
-                    cursor.execute('''
-                        INSERT INTO code_files
-                        (filename, path, repository_id, "importedLibraries", packages, functions, created_at, updated_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (repository_id, path) DO UPDATE SET
-                        "importedLibraries" = EXCLUDED."importedLibraries",
-                        packages = EXCLUDED.packages,
-                        functions = EXCLUDED.functions,
-                        updated_at = EXCLUDED.updated_at
-                    ''', (
-                        file_analysis.get('filename', ''),
-                        file_analysis.get('path', ''),
-                        repo_id,
-                        imported_libraries,
-                        packages,
-                        functions,
-                        datetime.datetime.now(),
-                        datetime.datetime.now()
-                    ))
+                path = file_analysis.get('path', '')
+                rows[path] = (
+                    file_analysis.get('filename', ''),
+                    path,
+                    repo_id,
+                    file_analysis.get('imports', []),
+                    [],  # packages，暂时为空，可以后续扩展
+                    [],  # functions，暂时为空，可以后续扩展
+                    now,
+                    now
+                )
 
-                except Exception as e:
-                    logger.warning(f"保存文件分析数据失败: {e}")
-                    continue
+            if rows:
+                psycopg2.extras.execute_values(cursor, '''
+                    INSERT INTO code_files
+                    (filename, path, repository_id, "importedLibraries", packages, functions, created_at, updated_at)
+                    VALUES %s
+                    ON CONFLICT (repository_id, path) DO UPDATE SET
+                    "importedLibraries" = EXCLUDED."importedLibraries",
+                    packages = EXCLUDED.packages,
+                    functions = EXCLUDED.functions,
+                    updated_at = EXCLUDED.updated_at
+                ''', list(rows.values()), page_size=DB_BATCH_SIZE)
 
             conn.commit()
             cursor.close()
-            conn.close()
 
-            logger.info(f"已保存仓库 {repo_data['full_name']} 的代码分析数据")
+            logger.info(f"已保存仓库 {repo_data['full_name']} 的代码分析数据（{len(rows)} 个文件）")
 
         except Exception as e:
             logger.error(f"保存代码分析数据失败: {e}")
             if conn:
                 conn.rollback()
+        finally:
+            if conn:
                 conn.close()
 
     def update_task_status(self, task_id: int, status: str, progress: int, message: str = None, total_repositories: int = None):
-        """更新任务状态"""
+        """更新任务状态（后台合并写入，不阻塞爬取；completed / failed 写入数据库后才返回）"""
+        self.progress.report(task_id, status, progress, message, total_repositories)
+
+    def _write_task_status(self, task_id: int, status: str, progress: int, message: str = None, total_repositories: int = None):
+        """把任务状态写入数据库（由进度上报线程调用）
+
+        写入失败时抛出异常，由 ProgressReporter 保留该更新并重试
+        """
         if not DB_AVAILABLE:
             logger.info(f"任务 {task_id} 状态更新: {status} ({progress}%) - {message}")
             return
 
+        conn = None
         try:
             conn = self._get_db_connection()
             if not conn:
-                return
+                raise RuntimeError("数据库连接不可用")
 
             cursor = conn.cursor()
 
@@ -679,130 +913,180 @@ class KeywordScraper:
                         'task_id': task_id
                     })
             else:
-                cursor.execute('''
+                # 进度更新是最频繁的写入，使用预备语句
+                conn.execute_prepared(cursor, 'crawl_task_progress', '''
                     UPDATE crawl_tasks
-                    SET status = %(status)s,
-                        progress = %(progress)s,
-                        message = %(message)s
-                    WHERE id = %(task_id)s
-                ''', {
-                    'status': status,
-                    'progress': progress,
-                    'message': message or '',
-                    'task_id': task_id
-                })
+                    SET status = $1, progress = $2, message = $3
+                    WHERE id = $4
+                ''', (status, progress, message or '', task_id))
+
+            # 与 UPDATE 同一事务，提交后订阅方才会收到
+            conn.execute_prepared(cursor, 'crawl_task_notify', 'SELECT pg_notify($1, $2)', (
+                PROGRESS_CHANNEL, progress_payload(task_id, status, progress, message, total_repositories)
+            ))
 
             conn.commit()
             cursor.close()
-            conn.close()
 
             logger.info(f"任务 {task_id} 状态已更新: {status} ({progress}%)")
 
-        except Exception as e:
-            logger.error(f"更新任务状态失败: {e}")
+        finally:
+            # 出错时未提交的事务在归还连接池时回滚
+            if conn:
+                conn.close()
 
     def _get_db_connection(self):
-        """获取数据库连接"""
+        """从共享连接池借出数据库连接（调用方在 finally 中 close() 归还连接池）"""
         if not DB_AVAILABLE:
             return None
 
         try:
-            db_url = os.getenv('DATABASE_URL')
-            if not db_url:
-                logger.warning("DATABASE_URL 环境变量未设置")
-                return None
-
-            conn = psycopg2.connect(db_url)
-            return conn
+            return db_connect()
 
         except Exception as e:
             logger.error(f"数据库连接失败: {e}")
             return None
 
-    def _save_to_database(self, repositories: List[Dict[str, Any]], keyword: str, task_id: int):
-        """保存仓库数据到数据库"""
+    def _load_stored_state(self, full_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """一次查询一批仓库在数据库中保存的 pushed_at、代码文件数和最近分析时间
+
+        未保存过或没有 pushed_at 的仓库不在结果中
+        """
+        if not DB_AVAILABLE or not full_names:
+            return {}
+
+        conn = self._get_db_connection()
+        if not conn:
+            return {}
+        try:
+            cursor = conn.cursor()
+            conn.execute_prepared(
+                cursor, 'repo_stored_state',
+                'SELECT r.full_name, r.pushed_at, COUNT(c.id), MAX(c.updated_at) '
+                'FROM repositories r LEFT JOIN code_files c ON c.repository_id = r.id '
+                'WHERE r.full_name = ANY($1::text[]) AND r.pushed_at IS NOT NULL '
+                'GROUP BY r.id',
+                (list(full_names),)
+            )
+            stored = {
+                full_name: {
+                    'pushed_at': _as_utc(pushed_at),
+                    'code_files': code_files,
+                    'analyzed_at': analyzed_at,
+                }
+                for full_name, pushed_at, code_files, analyzed_at in cursor.fetchall()
+            }
+            cursor.close()
+            return stored
+        except Exception as e:
+            logger.error(f"查询已保存的仓库状态失败，按全量处理: {e}")
+            return {}
+        finally:
+            conn.close()
+
+    def _save_to_database(self, repositories: List[Dict[str, Any]], keyword: str, task_id: int,
+                          total_repositories: Optional[int] = None):
+        """保存仓库数据到数据库（分批保存时 total_repositories 为截至本批的累计数）
+
+        仓库用一条 INSERT ... ON CONFLICT (full_name) DO UPDATE ... RETURNING 批量写入，
+        关键词关联再用一条多行 INSERT，每批只需几次往返；返回的仓库 ID 记入 self._repo_ids。
+        批量语句失败时（一行数据有问题就会使整条语句失败）改为逐行写入，只跳过出错的仓库
+        """
         if not DB_AVAILABLE:
             return
 
+        conn = None
         try:
             conn = self._get_db_connection()
             if not conn:
                 return
 
             cursor = conn.cursor()
+            now = datetime.datetime.now()
 
-            # 确保关键词存在（使用正确的字段名）
-            cursor.execute('SELECT id FROM keywords WHERE text = %s', (keyword,))
-            keyword_record = cursor.fetchone()
-
-            if not keyword_record:
-                cursor.execute('INSERT INTO keywords (text, created_at) VALUES (%s, %s) RETURNING id',
-                             (keyword, datetime.datetime.now()))
-                keyword_id = cursor.fetchone()[0]
-            else:
-                keyword_id = keyword_record[0]
-
-            # 保存仓库数据
+            # 同一条语句不能两次更新同一行，批内重复的仓库只保留最后一条
+            rows = {}
             for repo in repositories:
-                try:
-                    # 检查仓库是否已存在（使用正确的字段名）
-                    cursor.execute('SELECT id FROM repositories WHERE full_name = %s', (repo['full_name'],))
-                    existing = cursor.fetchone()
-
-                    if existing:
-                        repo_id = existing[0]
-                        # 更新仓库信息（使用正确的字段名）
-                        cursor.execute('''
-                            UPDATE repositories
-                            SET name = %s, description = %s, language = %s,
-                                stars = %s, forks = %s, url = %s, updated_at = %s
-                            WHERE id = %s
-                        ''', (
-                            repo['name'], repo['description'], repo['language'],
-                            repo['stargazers_count'], repo['forks_count'], repo['html_url'],
-                            datetime.datetime.now(), repo_id
-                        ))
-                    else:
-                        # 插入新仓库（使用正确的字段名）
-                        cursor.execute('''
-                            INSERT INTO repositories
-                            (name, full_name, description, language, stars, forks, url, created_at, updated_at, owner, trending, trend_date, trend_period)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            RETURNING id
-                        ''', (
-                            repo['name'], repo['full_name'], repo['description'], repo['language'],
-                            repo['stargazers_count'], repo['forks_count'], repo['html_url'],
-                            datetime.datetime.now(), datetime.datetime.now(), repo['owner'],
-                            False, datetime.datetime.now(), 'keyword_search'
-                        ))
-                        repo_id = cursor.fetchone()[0]
-
-                    # 关联关键词和仓库（使用双引号包围字段名）
-                    cursor.execute('''
-                        INSERT INTO repository_keywords ("repositoryId", "keywordId", created_at)
-                        VALUES (%s, %s, %s)
-                        ON CONFLICT ("repositoryId", "keywordId") DO NOTHING
-                    ''', (repo_id, keyword_id, datetime.datetime.now()))
+                rows[repo['full_name']] = (
+                    repo['name'], repo['full_name'], repo['description'], repo['language'],
+                    repo['stargazers_count'], repo['forks_count'], repo['html_url'],
+                    now, now, repo['owner'], False, now, 'keyword_search', repo.get('pushed_at')
+                )
 
-                except Exception as e:
-                    logger.error(f"保存仓库 {repo.get('full_name', 'unknown')} 失败: {e}")
-                    continue
+            try:
+                keyword_id = self._upsert_keyword(cursor, keyword, now)
+                repo_ids = self._upsert_repositories(cursor, list(rows.values()), keyword_id, now)
+            except Exception as e:
+                logger.warning(f"批量保存 {len(rows)} 个仓库失败，改为逐行保存: {e}")
+                conn.rollback()
+                keyword_id = self._upsert_keyword(cursor, keyword, now)
+                repo_ids = {}
+                for row in rows.values():
+                    # 每行一个保存点，出错的行回滚后不影响同一事务中的其他行
+                    cursor.execute('SAVEPOINT repository_row')
+                    try:
+                        repo_ids.update(self._upsert_repositories(cursor, [row], keyword_id, now))
+                        cursor.execute('RELEASE SAVEPOINT repository_row')
+                    except Exception as row_error:
+                        cursor.execute('ROLLBACK TO SAVEPOINT repository_row')
+                        logger.warning(f"保存仓库 {row[1]} 失败，已跳过: {row_error}")
 
             # 更新任务的仓库总数
             cursor.execute('''
                 UPDATE crawl_tasks
                 SET total_repositories = %s
                 WHERE id = %s
-            ''', (len(repositories), task_id))
+            ''', (len(repositories) if total_repositories is None else total_repositories, task_id))
 
             conn.commit()
             cursor.close()
-            conn.close()
 
-            logger.info(f"已保存 {len(repositories)} 个仓库到数据库，并更新任务仓库总数")
+            with self._repo_ids_lock:
+                self._repo_ids.update(repo_ids)
+            logger.info(f"已保存 {len(repo_ids)} 个仓库到数据库，并更新任务仓库总数")
 
         except Exception as e:
             logger.error(f"保存到数据库失败: {e}")
+            if conn:
+                conn.rollback()
+        finally:
+            if conn:
+                conn.close()
+
+    def _upsert_keyword(self, cursor, keyword: str, now: datetime.datetime) -> int:
+        """确保关键词存在并返回其 ID（冲突时的空更新让 RETURNING 也能返回已有的行）"""
+        cursor.execute('''
+            INSERT INTO keywords (text, created_at) VALUES (%s, %s)
+            ON CONFLICT (text) DO UPDATE SET text = EXCLUDED.text
+            RETURNING id
+        ''', (keyword, now))
+        return cursor.fetchone()[0]
+
+    def _upsert_repositories(self, cursor, rows: List[tuple], keyword_id: int,
+                             now: datetime.datetime) -> Dict[str, int]:
+        """写入仓库行并关联关键词，返回 full_name -> 仓库 ID"""
+        if not rows:
+            return {}
+        returned = psycopg2.extras.execute_values(cursor, '''
+            INSERT INTO repositories
+            (name, full_name, description, language, stars, forks, url, created_at, updated_at, owner, trending, trend_date, trend_period, pushed_at)
+            VALUES %s
+            ON CONFLICT (full_name) DO UPDATE SET
+                name = EXCLUDED.name, description = EXCLUDED.description, language = EXCLUDED.language,
+                stars = EXCLUDED.stars, forks = EXCLUDED.forks, url = EXCLUDED.url,
+                updated_at = EXCLUDED.updated_at,
+                pushed_at = COALESCE(EXCLUDED.pushed_at, repositories.pushed_at)
+            RETURNING id, full_name
+        ''', rows, page_size=DB_BATCH_SIZE, fetch=True)
+        repo_ids = {full_name: repo_id for repo_id, full_name in returned}
+
+        # 关联关键词和仓库（使用双引号包围字段名）
+        psycopg2.extras.execute_values(cursor, '''
+            INSERT INTO repository_keywords ("repositoryId", "keywordId", created_at)
+            VALUES %s
+            ON CONFLICT ("repositoryId", "keywordId") DO NOTHING
+        ''', [(repo_id, keyword_id, now) for repo_id in repo_ids.values()], page_size=DB_BATCH_SIZE)
+        return repo_ids
 
 def main():
     """主函数"""
@@ -811,6 +1095,12 @@ def main():
     parser.add_argument('--task-id', type=int, help='任务ID，用于更新任务状态')
     parser.add_argument('--languages', type=str, help='要搜索的编程语言，多个语言用逗号分隔，例如: python,java,javascript')
     parser.add_argument('--limits', type=str, help='各语言的爬取数量限制，例如: python=50,java=30,javascript=20')
+    parser.add_argument('--resume-from', type=int,
+                        help='从指定任务的检查点恢复（重试失败任务时传入原任务ID）；重新运行同一任务ID时自动恢复')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量模式：pushed_at 未变化的仓库只刷新星数，跳过补全和代码分析')
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('KEYWORD_CONCURRENCY', '3')),
+                        help='同时爬取的关键词数量（默认 3，可通过 KEYWORD_CONCURRENCY 环境变量设置）')
 
     args = parser.parse_args()
     keywords = [k.strip() for k in args.keywords.split(',')]
@@ -844,6 +1134,8 @@ def main():
     try:
         # 创建爬虫实例
         scraper = KeywordScraper()
+        if task_id:
+            scraper.checkpoint = CrawlCheckpoint(task_id, resume_from=args.resume_from)
 
         # 执行爬取任务
         success = True
@@ -854,20 +1146,16 @@ def main():
 
         async def run_crawling():
             nonlocal success, total_repos
-            for keyword in keywords:
-                logger.info(f"开始爬取关键词: {keyword}")
-                try:
-                    result = await scraper.crawl_keyword(keyword, languages, limits, task_id)
-                    if result:
-                        total_repos += result.get('total_repositories', 0)
-                        logger.info(f"关键词 '{keyword}' 爬取完成，获得 {result.get('total_repositories', 0)} 个仓库")
-                    else:
-                        success = False
-                        logger.error(f"关键词 '{keyword}' 爬取失败")
-                except Exception as e:
-                    logger.error(f"爬取关键词 '{keyword}' 时发生异常: {e}")
-                    logger.error(traceback.format_exc())
+            logger.info(f"开始爬取 {len(keywords)} 个关键词，并发数 {args.concurrency}")
+            results = await scraper.crawl_keywords(keywords, languages, limits, task_id, args.concurrency,
+                                                   args.incremental)
+            for keyword, result in zip(keywords, results):
+                if result:
+                    total_repos += result.get('total_repositories', 0)
+                    logger.info(f"关键词 '{keyword}' 爬取完成，获得 {result.get('total_repositories', 0)} 个仓库")
+                else:
                     success = False
+                    logger.error(f"关键词 '{keyword}' 爬取失败")
 
         # 运行异步任务
         asyncio.run(run_crawling())
@@ -876,10 +1164,14 @@ def main():
         if task_id:
             if success:
                 scraper.update_task_status(task_id, 'completed', 100, f"爬取完成，共处理 {total_repos} 个仓库", total_repos)
+                scraper.checkpoint.clear()
             else:
                 scraper.update_task_status(task_id, 'failed', 0, f"爬取失败，共处理 {total_repos} 个仓库", total_repos)
 
         logger.info(f"所有关键词爬取完成，总共处理 {total_repos} 个仓库")
+        scraper.progress.close()
+        if DB_AVAILABLE:
+            logger.info(f"数据库连接池统计: {pool_metrics()}")
 
     except Exception as e:
         logger.error(f"爬虫执行失败: {e}")
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+GitHub Trending 页面解析后端
+- selectolax：最快，需安装 selectolax
+- lxml：XPath 只遍历 article.Box-row 子树
+- bs4：原有的 BeautifulSoup 实现，作为兜底
+三种后端输出相同的仓库记录
+"""
+
+import os
+import hashlib
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.scraper.core.models import RepoRecord
+
+logger = logging.getLogger(__name__)
+
+# 解析库均为可选依赖：按可用情况选择后端
+try:
+    # selectolax 1.0 起推荐 lexbor 引擎，旧版本只有 modest 引擎
+    try:
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    HTMLParser = None
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    from lxml import html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    lxml_html = None
+    LXML_AVAILABLE = False
+
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BeautifulSoup = None
+    BS4_AVAILABLE = False
+
+# 单个条目提取出的原始字段：
+# (full_name, description, language, stars_text, forks_text, today_text, 含 star/fork 的 span 文本惰性获取函数)
+Fields = Tuple[str, str, Optional[str], Optional[str], Optional[str], str, Callable[[], List[str]]]
+
+
+def _parse_number(text: str) -> int:
+    """将 '1,234' 或 '1.2k' 等文本解析为整数"""
+    try:
+        t = text.lower().replace(",", "").strip()
+        if t.endswith("k"):
+            return int(float(t[:-1]) * 1000)
+        if t.endswith("m"):
+            return int(float(t[:-1]) * 1_000_000)
+        return int(float(t))
+    except Exception:
+        return 0
+
+
+def _number_from_spans(span_texts: List[str], word: str) -> int:
+    """从包含 star/fork 字样的 span 文本中取数字（页面结构变化时的兜底）"""
+    for text in span_texts:
+        if word in text.lower() and any(c.isdigit() for c in text):
+            return _parse_number(text.split()[0])
+    return 0
+
+
+def stable_repo_id(full_name: str) -> int:
+    """由 full_name 计算的稳定临时ID（GitHub 仓库名不区分大小写）
+
+    取 63 位哈希的负数：不会与 GitHub 的仓库 databaseId（正整数）重合，
+    未补全的记录不会被误当作某个真实仓库
+    """
+    digest = hashlib.blake2b(full_name.lower().encode('utf-8'), digest_size=8).digest()
+    return -(int.from_bytes(digest, 'big') >> 1) - 1
+
+
+def _to_record(fields: Fields) -> Optional[RepoRecord]:
+    full_name, description, language, stars_text, forks_text, today_text, span_texts = fields
+    full_name = full_name.replace("\n", "").replace(" ", "")
+    if not full_name:
+        return None
+    # full_name 形如 owner/repo
+    owner, name = full_name.split("/", 1) if "/" in full_name else (full_name, full_name)
+
+    stars = _parse_number(stars_text) if stars_text else 0
+    forks = _parse_number(forks_text) if forks_text else 0
+    if stars == 0:
+        stars = _number_from_spans(span_texts(), "star")
+    if forks == 0:
+        forks = _number_from_spans(span_texts(), "fork")
+
+    # 今日/本周期新增 star（页面右下角的 "xxx stars today"）
+    today_stars = _parse_number(today_text.split(" ")[0]) if today_text else 0
+
+    return RepoRecord(
+        # 补全前的临时ID（负数）：跨进程稳定（内置 hash() 每个进程随机加盐），补全后替换为真实ID
+        id=stable_repo_id(f"{owner}/{name}"),
+        name=name,
+        full_name=f"{owner}/{name}",
+        owner=owner,
+        description=description or "",
+        html_url=f"https://github.com/{owner}/{name}",
+        stargazers_count=stars,
+        language=language or "",
+        forks_count=forks,
+        open_issues_count=0,  # HTML页面无此信息，设为0
+        created_at=None,  # HTML页面无此信息，由补全阶段填入
+        updated_at=None,
+        topics=[],  # HTML页面无此信息，设为空数组
+        today_stars=today_stars,
+        scraped_at=datetime.now().isoformat(),
+    )
+
+
+def _collect(articles, extract: Callable) -> List[RepoRecord]:
+    items = []
+    for article in articles:
+        try:
+            fields = extract(article)
+            record = _to_record(fields) if fields else None
+            if record:
+                items.append(record)
+        except Exception as e:
+            logger.warning("解析单项失败: %s", e)
+            continue
+    return items
+
+
+# ---- selectolax ----
+
+def _sx_text(node) -> Optional[str]:
+    return node.text(deep=True, separator='', strip=True) if node is not None else None
+
+
+def _sx_first(article, *selectors):
+    for selector in selectors:
+        node = article.css_first(selector)
+        if node is not None:
+            return node
+    return None
+
+
+def _sx_extract(article) -> Optional[Fields]:
+    title = article.css_first("h2 a")
+    if title is None:
+        return None
+    stars = _sx_first(article, "a[href*='/stargazers']", "a[aria-label*='star']")
+    forks = _sx_first(article, "a[href*='/network/members']", "a[href*='/forks']", "a[aria-label*='fork']")
+    return (
+        _sx_text(title),
+        _sx_text(article.css_first("p")) or "",
+        _sx_text(article.css_first("span[itemprop='programmingLanguage']")),
+        _sx_text(stars),
+        _sx_text(forks),
+        _sx_text(article.css_first("span.d-inline-block.float-sm-right")) or "",
+        lambda: [_sx_text(span) for span in article.css("span")],
+    )
+
+
+def parse_selectolax(html: str) -> List[RepoRecord]:
+    tree = HTMLParser(html)
+    return _collect(tree.css("article.Box-row"), _sx_extract)
+
+
+# ---- lxml ----
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+ARTICLE_XPATH = f"//article[{_has_class('Box-row')}]"
+TITLE_XPATH = "(.//h2//a)[1]"
+DESCRIPTION_XPATH = "(.//p)[1]"
+LANGUAGE_XPATH = "(.//span[@itemprop='programmingLanguage'])[1]"
+STARS_XPATHS = ("(.//a[contains(@href, '/stargazers')])[1]", "(.//a[contains(@aria-label, 'star')])[1]")
+FORKS_XPATHS = (
+    "(.//a[contains(@href, '/network/members')])[1]",
+    "(.//a[contains(@href, '/forks')])[1]",
+    "(.//a[contains(@aria-label, 'fork')])[1]",
+)
+TODAY_XPATH = f"(.//span[{_has_class('d-inline-block')} and {_has_class('float-sm-right')}])[1]"
+
+
+def _lx_text(node) -> Optional[str]:
+    # 与 BeautifulSoup 的 get_text(strip=True) 一致：逐段去空白后直接拼接
+    if node is None:
+        return None
+    return ''.join(part.strip() for part in node.itertext())
+
+
+def _lx_first(article, *xpaths):
+    for xpath in xpaths:
+        nodes = article.xpath(xpath)
+        if nodes:
+            return nodes[0]
+    return None
+
+
+def _lx_extract(article) -> Optional[Fields]:
+    title = _lx_first(article, TITLE_XPATH)
+    if title is None:
+        return None
+    return (
+        _lx_text(title),
+        _lx_text(_lx_first(article, DESCRIPTION_XPATH)) or "",
+        _lx_text(_lx_first(article, LANGUAGE_XPATH)),
+        _lx_text(_lx_first(article, *STARS_XPATHS)),
+        _lx_text(_lx_first(article, *FORKS_XPATHS)),
+        _lx_text(_lx_first(article, TODAY_XPATH)) or "",
+        lambda: [_lx_text(span) for span in article.iter('span')],
+    )
+
+
+def parse_lxml(html: str) -> List[RepoRecord]:
+    if not html.strip():
+        return []
+    tree = lxml_html.fromstring(html)
+    return _collect(tree.xpath(ARTICLE_XPATH), _lx_extract)
+
+
+# ---- BeautifulSoup（原有实现） ----
+
+def _bs_text(node) -> Optional[str]:
+    return node.get_text(strip=True) if node else None
+
+
+def _bs_extract(article) -> Optional[Fields]:
+    title = article.select_one("h2 a")
+    if not title:
+        return None
+    # 尝试多种选择器来获取stars和forks数据
+    stars = (article.select_one("a[href*='/stargazers']") or
+             article.select_one("a[aria-label*='star']"))
+    forks = (article.select_one("a[href*='/network/members']") or
+             article.select_one("a[href*='/forks']") or
+             article.select_one("a[aria-label*='fork']"))
+    return (
+        _bs_text(title),
+        _bs_text(article.select_one("p")) or "",
+        _bs_text(article.select_one("span[itemprop='programmingLanguage']")),
+        _bs_text(stars),
+        _bs_text(forks),
+        _bs_text(article.select_one("span.d-inline-block.float-sm-right")) or "",
+        lambda: [_bs_text(span) for span in article.select("span")],
+    )
+
+
+def parse_bs4(html: str) -> List[RepoRecord]:
+    soup = BeautifulSoup(html, "lxml" if LXML_AVAILABLE else "html.parser")
+    return _collect(soup.select("article.Box-row"), _bs_extract)
+
+
+PARSERS: Dict[str, Callable[[str], List[RepoRecord]]] = {
+    'selectolax': parse_selectolax,
+    'lxml': parse_lxml,
+    'bs4': parse_bs4,
+}
+
+AVAILABLE = {
+    'selectolax': SELECTOLAX_AVAILABLE,
+    'lxml': LXML_AVAILABLE,
+    'bs4': BS4_AVAILABLE,
+}
+
+
+def available_backends() -> List[str]:
+    return [name for name in PARSERS if AVAILABLE[name]]
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """确定解析后端：显式指定 > 环境变量 TRENDING_PARSER > 按速度自动选择"""
+    name = (name or os.getenv('TRENDING_PARSER') or 'auto').lower()
+    if name != 'auto':
+        if AVAILABLE.get(name):
+            return name
+        logger.warning(f"解析后端 '{name}' 不可用，自动选择")
+
+    backends = available_backends()
+    if not backends:
+        raise ImportError("没有可用的 HTML 解析库（需要 selectolax、lxml 或 beautifulsoup4）")
+    return backends[0]
+
+
+def parse_trending_html(html: str, backend: Optional[str] = None) -> List[RepoRecord]:
+    """解析 Trending 页面，快速后端出错时回退到 BeautifulSoup"""
+    backend = resolve_backend(backend)
+    try:
+        return PARSERS[backend](html)
+    except Exception as e:
+        if backend == 'bs4' or not BS4_AVAILABLE:
+            raise
+        logger.warning(f"{backend} 解析失败，回退到 BeautifulSoup: {e}")
+        return parse_bs4(html)
+
+
+def article_block_hash(html: str) -> str:
+    """条目区块（第一个 <article 到最后一个 </article>）的内容哈希
+
+    只做字符串查找不解析页面；页头页脚中的随机令牌等内容不影响哈希。
+    """
+    start = html.find('<article')
+    end = html.rfind('</article>')
+    block = html[start:end] if start != -1 and end > start else ''
+    return hashlib.sha1(block.encode('utf-8')).hexdigest()
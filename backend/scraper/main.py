@@ -11,6 +11,7 @@ import sys
 import asyncio
 import logging
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 
 # 添加项目根目录到 Python 路径
@@ -39,7 +40,7 @@ class GitHubTrendingScraper:
     def __init__(self):
         self.api_client = GitHubAPIClient()
         self.token_manager = GitHubTokenManager()
-        self.trending_crawler = GitHubTrendingHTMLCrawler()
+        self.trending_crawler = GitHubTrendingHTMLCrawler(api_client=self.api_client)
         self.code_analyzer = CodeAnalyzer()
         
     async def run_daily_scraping(self):
@@ -52,10 +53,9 @@ class GitHubTrendingScraper:
                 logger.error("GitHub API 连接失败")
                 return False
             
-            # 获取趋势仓库
-            trending_repos = self.trending_crawler.fetch(
-                period='daily',
-                language=None
+            # 获取趋势仓库（同步抓取放到线程中，限流等待不阻塞事件循环）
+            trending_repos = await asyncio.get_event_loop().run_in_executor(
+                None, partial(self.trending_crawler.fetch, period='daily', language=None)
             )
             
             if not trending_repos:
@@ -20,6 +20,10 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from backend.scraper.main import GitHubTrendingScraper
+from backend.scraper.core.models import RepoRecord
+from backend.scraper.storage.snapshot_store import SnapshotStore
+from backend.scraper.storage.velocity_index import VelocityIndex
+from backend.scraper.storage.trend_files import TrendFileStore
 
 # 配置日志
 logging.basicConfig(
@@ -37,22 +41,19 @@ class TrendingScheduler:
     
     def __init__(self):
         self.scraper = GitHubTrendingScraper()
+        self.snapshots = SnapshotStore(Path('data/trending/snapshots'))
+        self.velocity = VelocityIndex()
+        self.trend_files = TrendFileStore(Path('public/analytics/trends'))
         
     async def run_daily_job(self):
         """执行每日爬取任务"""
         try:
             logger.info("开始执行每日爬取任务...")
 
-            # 使用新的综合趋势方法获取更多数据
-            daily_repos = await self.scraper.trending_crawler.get_comprehensive_trending(
-                period='daily'
-            )
+            daily_repos = await self._collect_and_save('daily')
 
             logger.info(f"每日爬取任务完成，获取 {len(daily_repos)} 个仓库")
 
-            # 保存数据到文件（这里可以根据需要调整保存逻辑）
-            await self._save_trending_data(daily_repos, 'daily')
-
         except Exception as e:
             logger.error(f"每日爬取任务异常: {e}")
     
@@ -61,16 +62,10 @@ class TrendingScheduler:
         try:
             logger.info("开始执行每周爬取任务...")
 
-            # 使用综合趋势方法获取每周数据
-            weekly_repos = await self.scraper.trending_crawler.get_comprehensive_trending(
-                period='weekly'
-            )
+            weekly_repos = await self._collect_and_save('weekly')
 
             logger.info(f"每周爬取任务完成，获取 {len(weekly_repos)} 个仓库")
 
-            # 保存数据
-            await self._save_trending_data(weekly_repos, 'weekly')
-
         except Exception as e:
             logger.error(f"每周爬取任务异常: {e}")
     
@@ -79,13 +74,7 @@ class TrendingScheduler:
         try:
             logger.info("开始执行每月爬取任务...")
 
-            # 使用综合趋势方法获取每月数据
-            monthly_repos = await self.scraper.trending_crawler.get_comprehensive_trending(
-                period='monthly'
-            )
-
-            # 保存数据
-            await self._save_trending_data(monthly_repos, 'monthly')
+            monthly_repos = await self._collect_and_save('monthly')
 
             # 执行关键词分析
             keywords = ['react', 'vue', 'python', 'javascript', 'machine-learning', 'ai', 'blockchain',
@@ -97,85 +86,41 @@ class TrendingScheduler:
         except Exception as e:
             logger.error(f"每月爬取任务异常: {e}")
 
+    async def _collect_and_save(self, period):
+        """汇总某个时间段的趋势仓库并保存；所有页面内容都未变化时跳过保存
+
+        页面未变化时汇总结果来自页面缓存，与上次保存的数据相同，重写快照、速度索引和趋势文件没有意义
+        """
+        repositories, changed = await self.scraper.trending_crawler.collect_trending(period=period)
+        if changed:
+            await self._save_trending_data(repositories, period)
+        else:
+            logger.info(f"{period} 趋势页面均未变化，跳过保存")
+        return repositories
+
     async def _save_trending_data(self, repositories, period):
         """保存趋势数据到文件"""
         try:
-            import json
-            from pathlib import Path
-
-            # 1. 保存到数据目录（备份）
-            data_dir = Path('data/trending')
-            data_dir.mkdir(parents=True, exist_ok=True)
-
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{period}_trending_{timestamp}.json"
-            filepath = data_dir / filename
-
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'period': period,
-                    'timestamp': datetime.now().isoformat(),
-                    'count': len(repositories),
-                    'repositories': repositories
-                }, f, ensure_ascii=False, indent=2)
-
-            logger.info(f"趋势数据已保存到: {filepath}")
-
-            # 2. 更新API使用的trends.json文件
+            # 1. 追加历史快照（只记录该时间段相对上一快照的变化）
+            self.snapshots.append({
+                period: [RepoRecord.from_api(repo).to_trending_item() for repo in repositories],
+                'timestamp': datetime.now().isoformat(),
+            })
+            self.velocity.observe_records(repositories, period)
+            self.velocity.save()
+
+            # 2. 更新API使用的分时间段趋势文件
             await self._update_trends_json(repositories, period)
 
         except Exception as e:
             logger.error(f"保存趋势数据失败: {e}")
 
     async def _update_trends_json(self, repositories, period):
-        """更新API使用的trends.json文件"""
+        """更新API使用的趋势文件（只重写该时间段的文件和清单）"""
         try:
-            import json
-            from pathlib import Path
-
-            # API数据文件路径
-            api_data_dir = Path('public/analytics')
-            api_data_dir.mkdir(parents=True, exist_ok=True)
-            trends_file = api_data_dir / 'trends.json'
-
-            # 读取现有数据
-            existing_data = {}
-            if trends_file.exists():
-                try:
-                    with open(trends_file, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                except Exception as e:
-                    logger.warning(f"读取现有trends.json失败: {e}")
-
             # 转换数据格式以匹配API期望的格式
-            formatted_repos = []
-            for repo in repositories:
-                formatted_repo = {
-                    'id': repo.get('id'),
-                    'name': repo.get('name'),
-                    'owner': repo.get('owner', {}).get('login') if isinstance(repo.get('owner'), dict) else repo.get('owner'),
-                    'fullName': repo.get('full_name'),
-                    'description': repo.get('description'),
-                    'language': repo.get('language'),
-                    'stars': repo.get('stargazers_count', 0),
-                    'forks': repo.get('forks_count', 0),
-                    'todayStars': repo.get('today_stars', 0),
-                    'url': repo.get('html_url'),
-                    'createdAt': repo.get('created_at'),
-                    'updatedAt': repo.get('updated_at'),
-                    'trendPeriod': period
-                }
-                formatted_repos.append(formatted_repo)
-
-            # 更新对应时间段的数据
-            existing_data[period] = formatted_repos
-            existing_data['lastUpdated'] = datetime.now().isoformat()
-
-            # 保存更新后的数据
-            with open(trends_file, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, ensure_ascii=False, indent=2)
-
-            logger.info(f"API趋势数据已更新: {trends_file} ({len(formatted_repos)} 个{period}项目)")
+            formatted_repos = [RepoRecord.from_api(repo).to_trending_dict(period) for repo in repositories]
+            self.trend_files.write_period(period, formatted_repos)
 
         except Exception as e:
             logger.error(f"更新API趋势数据失败: {e}")
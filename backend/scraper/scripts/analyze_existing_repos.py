@@ -18,6 +18,7 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from backend.scraper.crawlers.keyword_scraper import KeywordScraper
+from backend.scraper.core.db import connect as db_connect
 
 # 设置日志
 logging.basicConfig(
@@ -29,7 +30,6 @@ logger = logging.getLogger(__name__)
 async def analyze_keyword_repos(keyword: str, limit: int = 50):
     """分析指定关键词的仓库代码"""
     try:
-        import psycopg2
         from dotenv import load_dotenv
         
         # 加载环境变量
@@ -41,37 +41,40 @@ async def analyze_keyword_repos(keyword: str, limit: int = 50):
             logger.error("未找到DATABASE_URL环境变量")
             return
         
-        # 连接数据库
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        
-        # 查找关键词
-        cursor.execute('SELECT id FROM keywords WHERE text = %s', (keyword,))
-        keyword_record = cursor.fetchone()
-        
-        if not keyword_record:
-            logger.error(f"未找到关键词: {keyword}")
+        # 从共享连接池借出连接，查询完即归还（代码分析期间不占用连接）
+        conn = db_connect(DB_URL)
+        if not conn:
+            logger.error("psycopg2 未安装，无法连接数据库")
             return
-        
-        keyword_id = keyword_record[0]
-        
-        # 获取该关键词的仓库（按星标排序，获取前N个）
-        cursor.execute('''
-            SELECT r.id, r.full_name, r.owner, r.name, r.language, r.stars
-            FROM repositories r
-            JOIN repository_keywords rk ON r.id = rk."repositoryId"
-            WHERE rk."keywordId" = %s
-            ORDER BY r.stars DESC
-            LIMIT %s
-        ''', (keyword_id, limit))
-        
-        repos = cursor.fetchall()
+        with conn:
+            cursor = conn.cursor()
+
+            # 查找关键词
+            cursor.execute('SELECT id FROM keywords WHERE text = %s', (keyword,))
+            keyword_record = cursor.fetchone()
+
+            if not keyword_record:
+                logger.error(f"未找到关键词: {keyword}")
+                return
+
+            keyword_id = keyword_record[0]
+
+            # 获取该关键词的仓库（按星标排序，获取前N个）
+            cursor.execute('''
+                SELECT r.id, r.full_name, r.owner, r.name, r.language, r.stars
+                FROM repositories r
+                JOIN repository_keywords rk ON r.id = rk."repositoryId"
+                WHERE rk."keywordId" = %s
+                ORDER BY r.stars DESC
+                LIMIT %s
+            ''', (keyword_id, limit))
+
+            repos = cursor.fetchall()
+            cursor.close()
         logger.info(f"找到 {len(repos)} 个仓库需要分析")
         
         if not repos:
             logger.warning(f"关键词 '{keyword}' 没有关联的仓库")
-            cursor.close()
-            conn.close()
             return
         
         # 初始化爬虫
@@ -113,8 +116,6 @@ async def analyze_keyword_repos(keyword: str, limit: int = 50):
                 logger.error(f"❌ 分析 {full_name} 失败: {e}")
                 continue
         
-        cursor.close()
-        conn.close()
         logger.info(f"\n{'='*60}")
         logger.info(f"✅ 完成！共分析 {len(repos)} 个仓库")
         logger.info(f"{'='*60}")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+JSON 序列化基准测试
+对比原有写法（json.dump indent=2）与序列化层各后端在现有大文件上的耗时和体积
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.core import serializer
+
+DEFAULT_FILES = [
+    'public/trends/data/trends.json',
+    'public/analytics/analysis_Video_API.json',
+    'public/analytics/analysis_Messaging_API.json',
+]
+
+
+def _best_of(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def benchmark_file(path: Path, repeat: int) -> None:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    print(f"\n{path} ({path.stat().st_size / 1024:.0f} KB)")
+    print(f"  {'方式':<28}{'耗时(ms)':>10}{'体积(KB)':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        target = Path(tmp_dir) / 'out.json'
+
+        def legacy_write():
+            with open(target, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+
+        elapsed = _best_of(legacy_write, repeat)
+        print(f"  {'json.dump indent=2 (原有)':<28}{elapsed:>10.1f}{target.stat().st_size / 1024:>10.0f}")
+
+        backends = ['stdlib'] + (['orjson'] if serializer.ORJSON_AVAILABLE else [])
+        for backend in backends:
+            serializer.set_backend(backend)
+            for pretty in (True, False):
+                elapsed = _best_of(lambda: serializer.write_json(target, data, pretty=pretty), repeat)
+                label = f"{backend} {'pretty' if pretty else 'compact'} (原子写入)"
+                print(f"  {label:<28}{elapsed:>10.1f}{target.stat().st_size / 1024:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON 序列化基准测试')
+    parser.add_argument('files', nargs='*', help='要测试的 JSON 文件（默认使用仓库中最大的输出文件）')
+    parser.add_argument('--repeat', type=int, default=5, help='每种方式的重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    files = [Path(f) for f in args.files] or [project_root / f for f in DEFAULT_FILES]
+    for path in files:
+        if path.exists():
+            benchmark_file(path, args.repeat)
+        else:
+            print(f"跳过不存在的文件: {path}")
+
+
+if __name__ == '__main__':
+    main()
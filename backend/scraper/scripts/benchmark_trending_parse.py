@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Trending 页面解析基准测试
+对保存的 Trending HTML 页面比较各解析后端的单页耗时，并校验输出一致
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.crawlers import trending_parsers
+
+DEFAULT_SAMPLE_DIR = project_root / 'data' / 'trending_samples'
+
+
+def _best_of(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _comparable(records):
+    return [(r.full_name, r.description, r.language, r.stargazers_count, r.forks_count, r.today_stars)
+            for r in records]
+
+
+def save_samples(sample_dir: Path, languages) -> None:
+    """抓取 Trending 页面并保存为基准样本"""
+    import requests
+
+    sample_dir.mkdir(parents=True, exist_ok=True)
+    for lang in languages:
+        url = "https://github.com/trending" + (f"/{lang}" if lang else "")
+        resp = requests.get(url, params={'since': 'daily'}, timeout=30,
+                            headers={'User-Agent': 'Mozilla/5.0'})
+        resp.raise_for_status()
+        path = sample_dir / f"trending_{lang or 'all'}.html"
+        path.write_text(resp.text, encoding='utf-8')
+        print(f"已保存样本: {path} ({len(resp.text) / 1024:.0f} KB)")
+
+
+def benchmark_file(path: Path, repeat: int) -> None:
+    html = path.read_text(encoding='utf-8')
+    print(f"\n{path.name} ({len(html) / 1024:.0f} KB)")
+    print(f"  {'后端':<12}{'耗时(ms/页)':>12}{'条目数':>8}  与 bs4 一致")
+
+    reference = None
+    if trending_parsers.BS4_AVAILABLE:
+        reference = _comparable(trending_parsers.parse_bs4(html))
+
+    for backend in trending_parsers.available_backends():
+        parser = trending_parsers.PARSERS[backend]
+        records = parser(html)
+        elapsed = _best_of(lambda: parser(html), repeat)
+        same = '-' if reference is None else ('是' if _comparable(records) == reference else '否')
+        print(f"  {backend:<12}{elapsed:>12.2f}{len(records):>8}  {same}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trending 页面解析基准测试')
+    parser.add_argument('files', nargs='*', help='保存的 Trending HTML 页面（默认读取 data/trending_samples/*.html）')
+    parser.add_argument('--repeat', type=int, default=20, help='每个后端的重复次数（取最快一次）')
+    parser.add_argument('--fetch', nargs='*', metavar='LANG',
+                        help='先抓取并保存样本页面（不带参数时抓取全语言页面）')
+    args = parser.parse_args()
+
+    if args.fetch is not None:
+        save_samples(DEFAULT_SAMPLE_DIR, args.fetch or [None])
+
+    files = [Path(f) for f in args.files] or sorted(DEFAULT_SAMPLE_DIR.glob('*.html'))
+    if not files:
+        print(f"未找到样本页面，可使用 --fetch 保存到 {DEFAULT_SAMPLE_DIR}")
+        return
+
+    print(f"可用解析后端: {', '.join(trending_parsers.available_backends())}")
+    for path in files:
+        benchmark_file(path, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+趋势快照维护工具
+列出快照、导入旧的 trends_backup_*.json 完整备份、压缩过旧的历史
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.storage.snapshot_store import SnapshotStore
+
+DEFAULT_DATA_DIR = project_root / 'public' / 'trends' / 'data'
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.glob('*') if p.is_file()) if path.exists() else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='趋势快照维护工具')
+    parser.add_argument('--data-dir', type=Path, default=DEFAULT_DATA_DIR, help='trends.json 所在目录')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help='列出所有快照')
+
+    import_parser = subparsers.add_parser('import-legacy', help='导入 trends_backup_*.json 完整备份')
+    import_parser.add_argument('--delete', action='store_true', help='导入成功后删除原备份文件')
+
+    compact_parser = subparsers.add_parser('compact', help='压缩历史快照')
+    compact_parser.add_argument('--keep-days', type=int, help='删除早于该天数的快照')
+    compact_parser.add_argument('--daily-after-days', type=int, help='早于该天数的快照每天只保留一个')
+
+    args = parser.parse_args()
+    snapshot_dir = args.data_dir / 'snapshots'
+    store = SnapshotStore(snapshot_dir)
+
+    if args.command == 'list':
+        for entry in store.list_snapshots():
+            print(f"{entry['id']}  {entry['type']:<8}  {entry['segment']}")
+        print(f"共 {len(store.list_snapshots())} 个快照，占用 {_dir_size(snapshot_dir) / 1024:.1f} KB")
+
+    elif args.command == 'import-legacy':
+        legacy = sorted(args.data_dir.glob('trends_backup_*.json'))
+        legacy_size = sum(p.stat().st_size for p in legacy)
+        imported = store.import_files(legacy)
+        print(f"导入 {imported}/{len(legacy)} 个备份：{legacy_size / 1024:.1f} KB -> "
+              f"{_dir_size(snapshot_dir) / 1024:.1f} KB")
+        if args.delete:
+            known = {entry['id'] for entry in store.list_snapshots()}
+            for path in legacy:
+                if path.stem.replace('trends_backup_', '') in known:
+                    path.unlink()
+            print("已删除导入的备份文件")
+
+    elif args.command == 'compact':
+        before_size = _dir_size(snapshot_dir)
+        result = store.compact(keep_days=args.keep_days, daily_after_days=args.daily_after_days)
+        print(f"快照 {result['before']} -> {result['after']}，"
+              f"{before_size / 1024:.1f} KB -> {_dir_size(snapshot_dir) / 1024:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
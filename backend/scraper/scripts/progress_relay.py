@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+爬取进度推送中继
+用一个数据库连接 LISTEN crawl_progress，把收到的进度以 NDJSON（每行一个 JSON）推送给所有订阅方：
+- HTTP 模式（默认）：GET /progress[?task_id=N] 返回持续的 application/x-ndjson 流，
+  供 Next.js 的 /api/crawl/progress 路由转发给浏览器
+- --stdout 模式：直接输出到标准输出，便于调试或由其他进程读取
+"""
+
+import sys
+import queue
+import select
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, Optional, Set, Tuple
+from urllib.parse import urlparse, parse_qs
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.core.db import PSYCOPG2_AVAILABLE, resolve_database_url
+from backend.scraper.core.progress_reporter import PROGRESS_CHANNEL, TERMINAL_STATUSES
+from backend.scraper.core.serializer import dumps, loads
+
+if PSYCOPG2_AVAILABLE:
+    import psycopg2
+    import psycopg2.extensions
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 没有进度时每隔多少秒发送一个空行，防止代理断开空闲连接
+HEARTBEAT_SECONDS = 15
+# 每个订阅方最多缓存的未发送消息数，慢速订阅方丢弃最旧的消息
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class ProgressRelay:
+    """进度广播：保存每个任务的最新进度，新订阅方先收到当前状态，之后收到每次更新"""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Set[Tuple[queue.Queue, Optional[int]]] = set()
+        self._latest: Dict[int, Dict[str, Any]] = {}
+        self.stats = {'received': 0, 'delivered': 0, 'dropped': 0}
+
+    def subscribe(self, task_id: Optional[int] = None) -> Tuple[queue.Queue, Optional[int]]:
+        subscriber = (queue.Queue(maxsize=self.queue_size), task_id)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            current = [self._latest[task_id]] if task_id in self._latest else (
+                list(self._latest.values()) if task_id is None else []
+            )
+        for update in current:
+            subscriber[0].put_nowait(update)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Tuple[queue.Queue, Optional[int]]) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, update: Dict[str, Any]) -> None:
+        task_id = update.get('id')
+        with self._lock:
+            self.stats['received'] += 1
+            if update.get('status') in TERMINAL_STATUSES:
+                # 已结束的任务不再作为"当前状态"发给新的全量订阅方
+                self._latest.pop(task_id, None)
+            else:
+                self._latest[task_id] = update
+            subscribers = list(self._subscribers)
+
+        for messages, wanted in subscribers:
+            if wanted is not None and wanted != task_id:
+                continue
+            while True:
+                try:
+                    messages.put_nowait(update)
+                    break
+                except queue.Full:
+                    try:
+                        messages.get_nowait()
+                        with self._lock:
+                            self.stats['dropped'] += 1
+                    except queue.Empty:
+                        pass
+            with self._lock:
+                self.stats['delivered'] += 1
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+def listen_forever(relay: ProgressRelay, dsn: str, stop: threading.Event, poll_seconds: float = 5.0) -> None:
+    """LISTEN crawl_progress 并把通知转交给 relay；连接断开时退避重连"""
+    backoff = 1.0
+    while not stop.is_set():
+        conn = None
+        try:
+            conn = psycopg2.connect(dsn)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {PROGRESS_CHANNEL}")
+            logger.info(f"已开始监听 {PROGRESS_CHANNEL}")
+            backoff = 1.0
+
+            while not stop.is_set():
+                if select.select([conn], [], [], poll_seconds) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        relay.publish(loads(notify.payload))
+                    except ValueError:
+                        logger.warning(f"忽略无法解析的进度通知: {notify.payload[:100]}")
+        except Exception as e:
+            logger.error(f"监听进度通知失败，{backoff:.0f} 秒后重连: {e}")
+            stop.wait(backoff)
+            backoff = min(backoff * 2, 60.0)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def make_handler(relay: ProgressRelay):
+    class ProgressHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug(format % args)
+
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            if url.path == '/health':
+                body = dumps({'subscribers': relay.subscriber_count, **relay.stats}, pretty=False)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if url.path != '/progress':
+                self.send_error(404)
+                return
+
+            task_id = parse_qs(url.query).get('task_id', [None])[0]
+            try:
+                task_id = int(task_id) if task_id is not None else None
+            except ValueError:
+                self.send_error(400, 'task_id 无效')
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+
+            subscriber = relay.subscribe(task_id)
+            try:
+                while True:
+                    try:
+                        update = subscriber[0].get(timeout=HEARTBEAT_SECONDS)
+                        line = dumps(update, pretty=False) + b'\n'
+                    except queue.Empty:
+                        update, line = None, b'\n'
+                    self._write_chunk(line)
+                    # 单个任务的订阅在任务结束后关闭
+                    if task_id is not None and update and update.get('status') in TERMINAL_STATUSES:
+                        break
+                self._write_chunk(b'')
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                relay.unsubscribe(subscriber)
+
+        def _write_chunk(self, data: bytes) -> None:
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+            self.wfile.flush()
+
+    return ProgressHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬取进度推送中继（LISTEN crawl_progress -> NDJSON）')
+    parser.add_argument('--host', default='127.0.0.1', help='HTTP 监听地址')
+    parser.add_argument('--port', type=int, default=8765, help='HTTP 监听端口')
+    parser.add_argument('--stdout', action='store_true', help='输出到标准输出而不是启动 HTTP 服务')
+    parser.add_argument('--task-id', type=int, help='--stdout 模式下只输出指定任务，任务结束后退出')
+    args = parser.parse_args()
+
+    if not PSYCOPG2_AVAILABLE:
+        logger.error("psycopg2 未安装，无法监听进度通知")
+        sys.exit(1)
+    dsn = resolve_database_url()
+    if not dsn:
+        logger.error("未找到 DATABASE_URL")
+        sys.exit(1)
+
+    relay = ProgressRelay()
+    stop = threading.Event()
+    listener = threading.Thread(target=listen_forever, args=(relay, dsn, stop), name='progress-listener', daemon=True)
+    listener.start()
+
+    try:
+        if args.stdout:
+            messages, _ = relay.subscribe(args.task_id)
+            while True:
+                update = messages.get()
+                sys.stdout.write(dumps(update, pretty=False).decode('utf-8') + '\n')
+                sys.stdout.flush()
+                if args.task_id is not None and update.get('status') in TERMINAL_STATUSES:
+                    break
+        else:
+            server = ThreadingHTTPServer((args.host, args.port), make_handler(relay))
+            server.daemon_threads = True
+            logger.info(f"进度中继已启动: http://{args.host}:{args.port}/progress")
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        listener.join(timeout=2)
+        logger.info(f"进度中继统计: {relay.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分析结果分片输出
+将分析报告拆分为摘要文档、按星数排序的仓库分页和清单文件，并生成预压缩副本
+"""
+
+import os
+import gzip
+import shutil
+import logging
+import datetime
+from pathlib import Path
+from typing import Dict, List, Any
+
+from backend.scraper.core.serializer import dumps, write_bytes_atomic
+
+logger = logging.getLogger(__name__)
+
+# brotli 为可选依赖：未安装时只生成 .gz
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+DEFAULT_PAGE_SIZE = 100
+# 分析文件默认写入 public/analytics，对应的公开 URL 前缀
+DEFAULT_URL_PREFIX = '/analytics'
+
+
+def _repo_stars(repo: Dict[str, Any]) -> int:
+    return repo.get('stargazers_count') or repo.get('stars') or 0
+
+
+def _write_with_siblings(path: Path, payload: Any) -> int:
+    """写入紧凑 JSON，并生成 .gz / .br 预压缩副本，返回原始字节数"""
+    raw = dumps(payload, pretty=False)
+    write_bytes_atomic(path, raw)
+    write_bytes_atomic(path.with_name(path.name + '.gz'), gzip.compress(raw, compresslevel=9))
+
+    br_path = path.with_name(path.name + '.br')
+    if BROTLI_AVAILABLE:
+        write_bytes_atomic(br_path, brotli.compress(raw, quality=11))
+    elif br_path.exists():
+        # 避免残留与新内容不一致的旧副本
+        br_path.unlink()
+
+    return len(raw)
+
+
+def write_sharded_analysis(summary: Dict[str, Any], output_path: str,
+                           page_size: int = DEFAULT_PAGE_SIZE,
+                           url_prefix: str = DEFAULT_URL_PREFIX) -> Dict[str, Any]:
+    """写出分片的分析结果
+
+    output_path 为摘要文件路径（如 public/analytics/analysis_React.json），
+    仓库分页和清单写入同名目录（public/analytics/analysis_React/）。
+    url_prefix 为 output_path 所在目录对外访问的 URL 前缀，清单中的链接据此生成。
+    返回写入的清单。
+    """
+    if page_size < 1:
+        raise ValueError(f"分页大小必须为正整数: {page_size}")
+
+    output_path = Path(output_path)
+    pages_dir = output_path.with_suffix('')
+    base_url = url_prefix.rstrip('/')
+    pages_url = f"{base_url}/{pages_dir.name}"
+
+    summary = dict(summary)
+    repositories: List[Dict[str, Any]] = sorted(
+        summary.pop('repositories', []) or [], key=_repo_stars, reverse=True
+    )
+
+    page_count = (len(repositories) + page_size - 1) // page_size
+    generated_at = datetime.datetime.now().isoformat()
+
+    # 先写入新的分页目录，再整体替换，读者不会看到新旧混合的分页
+    staging_dir = pages_dir.with_name(pages_dir.name + '.staging')
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    staging_dir.mkdir(parents=True)
+
+    pages = []
+    for index in range(page_count):
+        page_number = index + 1
+        page_repos = repositories[index * page_size:(index + 1) * page_size]
+        file_name = f"repos_page_{page_number:04d}.json"
+        size = _write_with_siblings(staging_dir / file_name, {
+            'page': page_number,
+            'page_size': page_size,
+            'page_count': page_count,
+            'total_repositories': len(repositories),
+            'repositories': page_repos
+        })
+        pages.append({
+            'page': page_number,
+            'file': f"{pages_url}/{file_name}",
+            'count': len(page_repos),
+            'bytes': size,
+            'max_stars': _repo_stars(page_repos[0]) if page_repos else 0
+        })
+
+    manifest = {
+        'keyword': summary.get('keyword'),
+        'generated_at': generated_at,
+        'summary': f"{base_url}/{output_path.name}",
+        'sort': 'stars_desc',
+        'page_size': page_size,
+        'page_count': page_count,
+        'total_repositories': len(repositories),
+        'pages': pages
+    }
+    _write_with_siblings(staging_dir / 'manifest.json', manifest)
+
+    if pages_dir.exists():
+        shutil.rmtree(pages_dir)
+    os.replace(staging_dir, pages_dir)
+
+    # 摘要只引用分页，首屏无需加载仓库列表
+    summary['repository_pages'] = {
+        'manifest': f"{pages_url}/manifest.json",
+        'page_size': page_size,
+        'page_count': page_count,
+        'total_repositories': len(repositories),
+        'first_page': pages[0]['file'] if pages else None
+    }
+    summary_size = _write_with_siblings(output_path, summary)
+
+    logger.info(f"分析摘要已写入: {output_path} ({summary_size} 字节)，"
+                f"{len(repositories)} 个仓库分为 {page_count} 页")
+    return manifest
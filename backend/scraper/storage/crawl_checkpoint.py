@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+爬取任务检查点
+记录已完成的搜索页、已补全和已分析的仓库，任务中断后重新运行（或重试）时
+从检查点恢复，不再重复消耗 API 配额
+"""
+
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional
+
+from backend.scraper.core.serializer import append_jsonl, iter_jsonl
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent.parent.parent
+DEFAULT_CHECKPOINT_DIR = project_root / 'data' / 'checkpoints'
+
+# 超过该天数未更新的检查点（失败后一直没有重试的任务）在创建新检查点时删除
+DEFAULT_MAX_AGE_DAYS = 7
+
+
+def prune_checkpoints(base_dir: Optional[Path] = None, max_age_days: Optional[float] = None,
+                      keep: Iterable[Path] = ()) -> int:
+    """删除超过 max_age_days 天未修改的检查点文件（keep 中的除外），返回删除数"""
+    base_dir = Path(base_dir) if base_dir else DEFAULT_CHECKPOINT_DIR
+    if max_age_days is None:
+        max_age_days = float(os.getenv('CHECKPOINT_MAX_AGE_DAYS', str(DEFAULT_MAX_AGE_DAYS)))
+    if max_age_days <= 0 or not base_dir.is_dir():
+        return 0
+
+    keep = {Path(path) for path in keep}
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for path in base_dir.glob('task_*.jsonl'):
+        if path in keep:
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError as e:
+            logger.warning(f"删除过期检查点失败: {path}: {e}")
+    if removed:
+        logger.info(f"已删除 {removed} 个超过 {max_age_days:g} 天的检查点")
+    return removed
+
+
+class CrawlCheckpoint:
+    """单个爬取任务的检查点
+
+    data/checkpoints/task_<id>.jsonl 中每完成一步追加一行：
+    - {"type": "page", "query", "per_page", "page", "total_count", "items"}：一页搜索结果（已解码的仓库字段）
+    - {"type": "enriched", "full_name", "languages", "topics"}：仓库的额外信息
+    - {"type": "analyzed", "full_name", "summary"}：代码分析摘要（代码文件已入库）
+    只追加不改写，进程在写入途中被杀死时最多丢失最后一行。
+    resume_from 指定另一个任务（如重试时的原任务）时，先载入它的检查点并合并到本任务的文件中；
+    任务成功后 clear() 同时删除两个文件。创建时顺带清理过期的检查点（见 prune_checkpoints）。
+    """
+
+    def __init__(self, task_id: int, base_dir: Optional[Path] = None, resume_from: Optional[int] = None,
+                 max_age_days: Optional[float] = None):
+        self.task_id = task_id
+        self.base_dir = Path(base_dir) if base_dir else DEFAULT_CHECKPOINT_DIR
+        self.resume_from = resume_from if resume_from != task_id else None
+        self._lock = threading.Lock()
+        self._pages: Dict[tuple, Dict[str, Any]] = {}
+        self._enriched: Dict[str, Dict[str, Any]] = {}
+        self._analyzed: Dict[str, Optional[Dict[str, Any]]] = {}
+
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        prune_checkpoints(self.base_dir, max_age_days, keep=self._paths())
+        self._load(self.path)
+        if self.resume_from is not None:
+            for entry in self._load(self._path_for(self.resume_from)):
+                append_jsonl(self.path, entry)
+
+        if self._pages or self._enriched or self._analyzed:
+            logger.info(f"任务 {task_id} 从检查点恢复: {len(self._pages)} 页搜索结果，"
+                        f"{len(self._enriched)} 个已补全仓库，{len(self._analyzed)} 个已分析仓库")
+
+    def _path_for(self, task_id: int) -> Path:
+        return self.base_dir / f"task_{task_id}.jsonl"
+
+    @property
+    def path(self) -> Path:
+        return self._path_for(self.task_id)
+
+    def _paths(self) -> List[Path]:
+        """本任务的检查点文件，以及恢复来源任务的文件"""
+        paths = [self.path]
+        if self.resume_from is not None:
+            paths.append(self._path_for(self.resume_from))
+        return paths
+
+    def _load(self, path: Path) -> List[Dict[str, Any]]:
+        """载入检查点文件，返回其中本任务尚未记录的条目"""
+        if not path.exists():
+            return []
+        new_entries = []
+        for entry in iter_jsonl(path):
+            if self._apply(entry):
+                new_entries.append(entry)
+        return new_entries
+
+    def _apply(self, entry: Dict[str, Any]) -> bool:
+        kind = entry.get('type')
+        if kind == 'page':
+            key = (entry['query'], entry['per_page'], entry['page'])
+            if key in self._pages:
+                return False
+            self._pages[key] = {'total_count': entry.get('total_count', 0), 'items': entry.get('items') or []}
+        elif kind == 'enriched':
+            if entry['full_name'] in self._enriched:
+                return False
+            self._enriched[entry['full_name']] = {'languages': entry.get('languages'), 'topics': entry.get('topics')}
+        elif kind == 'analyzed':
+            if entry['full_name'] in self._analyzed:
+                return False
+            self._analyzed[entry['full_name']] = entry.get('summary')
+        else:
+            return False
+        return True
+
+    def _record(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._apply(entry):
+                append_jsonl(self.path, entry)
+
+    # ---- 搜索页 ----
+
+    def get_page(self, query: str, per_page: int, page: int) -> Optional[Dict[str, Any]]:
+        """已完成的搜索页 {total_count, items}，未记录时返回 None"""
+        with self._lock:
+            return self._pages.get((query, per_page, page))
+
+    def record_page(self, query: str, per_page: int, page: int, total_count: int,
+                    items: List[Dict[str, Any]]) -> None:
+        self._record({'type': 'page', 'query': query, 'per_page': per_page, 'page': page,
+                      'total_count': total_count, 'items': items})
+
+    # ---- 补全 ----
+
+    def get_enriched(self, full_name: str) -> Optional[Dict[str, Any]]:
+        """已补全仓库的 {languages, topics}"""
+        with self._lock:
+            return self._enriched.get(full_name)
+
+    def record_enriched(self, full_name: str, languages: Any, topics: Any) -> None:
+        self._record({'type': 'enriched', 'full_name': full_name, 'languages': languages, 'topics': topics})
+
+    # ---- 代码分析 ----
+
+    def is_analyzed(self, full_name: str) -> bool:
+        with self._lock:
+            return full_name in self._analyzed
+
+    def get_analysis(self, full_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._analyzed.get(full_name)
+
+    def record_analyzed(self, full_name: str, summary: Optional[Dict[str, Any]]) -> None:
+        self._record({'type': 'analyzed', 'full_name': full_name, 'summary': summary})
+
+    def clear(self) -> None:
+        """任务成功完成后删除检查点（包括已合并进来的恢复来源任务的检查点）"""
+        with self._lock:
+            for path in self._paths():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._pages.clear()
+            self._enriched.clear()
+            self._analyzed.clear()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Trending 页面缓存
+按 URL 保存 ETag / Last-Modified、条目区块的内容哈希和解析结果，
+用于条件请求和内容未变化时跳过解析
+"""
+
+import logging
+import datetime
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from backend.scraper.core.models import RepoRecord
+from backend.scraper.core.serializer import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent.parent.parent
+DEFAULT_CACHE_PATH = project_root / 'data' / 'trending_cache' / 'pages.json'
+
+
+class PageCache:
+    """线程安全的页面缓存，内存中维护，显式调用 save() 落盘"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path.exists():
+                try:
+                    self._entries = read_json(self.path).get('pages', {})
+                except Exception as e:
+                    logger.warning(f"读取页面缓存失败，将重新抓取: {e}")
+        return self._entries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._load().get(key)
+            return dict(entry) if entry else None
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """条件请求头（没有缓存或缓存无校验值时为空）"""
+        entry = self.get(key)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def records(self, key: str) -> List[RepoRecord]:
+        """缓存的解析结果（每次返回新记录，调用方可自由修改）"""
+        entry = self.get(key)
+        return [RepoRecord.from_api(item) for item in entry.get('items', [])] if entry else []
+
+    def put(self, key: str, etag: Optional[str], last_modified: Optional[str],
+            content_hash: str, items: List[RepoRecord]) -> None:
+        """保存内容已变化的页面"""
+        now = datetime.datetime.now().isoformat()
+        with self._lock:
+            self._load()[key] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'hash': content_hash,
+                'items': [item.to_trending_item() for item in items],
+                'checked_at': now,
+                'changed_at': now,
+            }
+            self._dirty = True
+
+    def touch(self, key: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """记录一次确认未变化的检查，并更新服务端返回的新校验值"""
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is None:
+                return
+            entry['checked_at'] = datetime.datetime.now().isoformat()
+            if etag:
+                entry['etag'] = etag
+            if last_modified:
+                entry['last_modified'] = last_modified
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                write_json(self.path, {'pages': self._entries}, pretty=False)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"保存页面缓存失败: {e}")
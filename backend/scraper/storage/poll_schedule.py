@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Trending 页面自适应轮询计划
+按页面（语言 × 时间段）学习内容实际变化的频率，据此决定本轮是否需要重新抓取
+"""
+
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from backend.scraper.core.serializer import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent.parent.parent
+DEFAULT_SCHEDULE_PATH = project_root / 'data' / 'trending_cache' / 'schedule.json'
+
+
+class PollSchedule:
+    """页面级轮询计划（线程安全）
+
+    每个页面维护观测到的变化间隔的指数移动平均（change_ewma），
+    轮询间隔取其一半并限制在 [min_interval, max_staleness] 之间：
+    - 经常变化的页面按 min_interval 轮询
+    - 很少变化的页面间隔逐步放宽，但不超过 max_staleness，保证数据最多陈旧这么久
+    """
+
+    def __init__(self, path: Optional[Path] = None, min_interval: float = 900,
+                 max_staleness: float = 6 * 3600, smoothing: float = 0.3, backoff: float = 1.5):
+        self.path = Path(path) if path else DEFAULT_SCHEDULE_PATH
+        self.min_interval = min_interval
+        self.max_staleness = max(max_staleness, min_interval)
+        self.smoothing = smoothing
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._pages: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._pages is None:
+            self._pages = {}
+            if self.path.exists():
+                try:
+                    self._pages = read_json(self.path).get('pages', {})
+                except Exception as e:
+                    logger.warning(f"读取轮询计划失败，所有页面将重新抓取: {e}")
+        return self._pages
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_staleness, max(self.min_interval, interval))
+
+    def is_due(self, key: str, now: Optional[float] = None) -> bool:
+        """页面本轮是否需要抓取（从未抓取过的页面总是需要）"""
+        now = time.time() if now is None else now
+        with self._lock:
+            page = self._load().get(key)
+            if not page:
+                return True
+            return now - page['last_checked'] >= self._clamp(page['interval'])
+
+    def record(self, key: str, changed: bool, now: Optional[float] = None) -> float:
+        """记录一次抓取结果，返回下一次的轮询间隔"""
+        now = time.time() if now is None else now
+        with self._lock:
+            pages = self._load()
+            page = pages.get(key)
+
+            if page is None:
+                page = {
+                    'interval': self.min_interval,
+                    'change_ewma': None,
+                    'last_changed': now,
+                    'checks': 0,
+                    'changes': 0,
+                }
+                pages[key] = page
+            elif changed:
+                gap = now - page['last_changed']
+                ewma = page['change_ewma']
+                page['change_ewma'] = gap if ewma is None else self.smoothing * gap + (1 - self.smoothing) * ewma
+                page['interval'] = self._clamp(page['change_ewma'] / 2)
+                page['last_changed'] = now
+                page['changes'] += 1
+            else:
+                # 已超过预期的变化间隔仍未变化：逐步放宽
+                expected = page['change_ewma'] or 0
+                if now - page['last_changed'] >= expected:
+                    page['interval'] = self._clamp(page['interval'] * self.backoff)
+
+            page['last_checked'] = now
+            page['checks'] += 1
+            self._dirty = True
+            return page['interval']
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            pages = self._load()
+            intervals = sorted(self._clamp(p['interval']) for p in pages.values())
+            return {
+                'pages': len(pages),
+                'min_interval': intervals[0] if intervals else None,
+                'max_interval': intervals[-1] if intervals else None,
+            }
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty or self._pages is None:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                write_json(self.path, {'pages': self._pages}, pretty=False)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"保存轮询计划失败: {e}")
@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+趋势快照存储
+只追加的快照序列：每段以完整关键帧开始，之后每次运行只记录相对上一快照的变化
+（进入/离开榜单、排名变化、星数增量、其他字段变化），可重建任意时间点的完整数据
+"""
+
+import os
+import shutil
+import logging
+import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+from backend.scraper.core.serializer import dumps, loads, append_jsonl, iter_jsonl, read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.json'
+DEFAULT_KEYFRAME_INTERVAL = 24
+ID_FORMAT = '%Y%m%d_%H%M%S'
+
+
+def _is_repo_list(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, dict) and 'full_name' in item for item in value)
+
+
+def split_snapshot(snapshot: Dict[str, Any]) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Any]]:
+    """把快照拆分为仓库列表（按 full_name 编码差异）和其余元数据（整体保存）"""
+    lists, meta = {}, {}
+    for key, value in snapshot.items():
+        if _is_repo_list(value) and value:
+            lists[key] = value
+        else:
+            meta[key] = value
+    return lists, meta
+
+
+def diff_list(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """计算两个有序仓库列表之间的差异"""
+    prev_index = {item['full_name']: (rank, item) for rank, item in enumerate(previous)}
+    current_names = set()
+
+    entered, moved, stars, fields, unset = [], {}, {}, {}, {}
+    for rank, item in enumerate(current):
+        name = item['full_name']
+        current_names.add(name)
+        old = prev_index.get(name)
+        if old is None:
+            entered.append([rank, item])
+            continue
+
+        old_rank, old_item = old
+        if old_rank != rank:
+            moved[name] = rank
+        star_delta = (item.get('stargazers_count') or 0) - (old_item.get('stargazers_count') or 0)
+        if star_delta:
+            stars[name] = star_delta
+        changed = {
+            key: value for key, value in item.items()
+            if key != 'stargazers_count' and old_item.get(key) != value
+        }
+        if changed:
+            fields[name] = changed
+        removed = [key for key in old_item if key not in item]
+        if removed:
+            unset[name] = removed
+
+    left = [name for name in prev_index if name not in current_names]
+
+    delta = {}
+    if entered:
+        delta['entered'] = entered
+    if left:
+        delta['left'] = left
+    if moved:
+        delta['moved'] = moved
+    if stars:
+        delta['stars'] = stars
+    if fields:
+        delta['fields'] = fields
+    if unset:
+        delta['unset'] = unset
+    return delta
+
+
+def apply_list_delta(previous: List[Dict[str, Any]], delta: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """在上一快照的列表上应用差异，得到新列表"""
+    left = set(delta.get('left', ()))
+    moved = delta.get('moved', {})
+    stars = delta.get('stars', {})
+    fields = delta.get('fields', {})
+    unset = delta.get('unset', {})
+
+    ranked = []
+    for rank, item in enumerate(previous):
+        name = item['full_name']
+        if name in left:
+            continue
+        if name in fields or name in stars or name in unset:
+            item = dict(item)
+            item.update(fields.get(name, {}))
+            for key in unset.get(name, ()):
+                item.pop(key, None)
+            if name in stars:
+                item['stargazers_count'] = (item.get('stargazers_count') or 0) + stars[name]
+        ranked.append((moved.get(name, rank), item))
+
+    ranked.extend((rank, item) for rank, item in delta.get('entered', ()))
+    ranked.sort(key=lambda pair: pair[0])
+    return [item for _, item in ranked]
+
+
+class SnapshotStore:
+    """关键帧 + 增量的快照存储
+
+    目录结构：
+    - index.json：快照列表 [{id, created_at, segment, type}]
+    - seg_<关键帧ID>.jsonl：一个关键帧及其后续增量，每行一条记录
+    快照中未出现的仓库列表沿用上一快照（如调度器每次只更新一个时间段）。
+    """
+
+    def __init__(self, base_dir: Path, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        self.base_dir = Path(base_dir)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._last_state: Optional[Dict[str, Any]] = None
+
+    # ---- 索引 ----
+
+    def _index_path(self) -> Path:
+        return self.base_dir / INDEX_FILE
+
+    def _load_index(self) -> Dict[str, Any]:
+        path = self._index_path()
+        if path.exists():
+            try:
+                return read_json(path)
+            except Exception as e:
+                logger.error(f"读取快照索引失败: {e}")
+                raise
+        return {'version': 1, 'keyframe_interval': self.keyframe_interval, 'snapshots': []}
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        return self._load_index()['snapshots']
+
+    def find(self, key: str) -> Optional[Dict[str, Any]]:
+        """按完整ID查找；只给日期（YYYYMMDD）时返回当天第一个快照"""
+        snapshots = self.list_snapshots()
+        for entry in snapshots:
+            if entry['id'] == key:
+                return entry
+        for entry in snapshots:
+            if entry['id'].startswith(f"{key}_"):
+                return entry
+        return None
+
+    # ---- 写入 ----
+
+    def append(self, snapshot: Dict[str, Any], snapshot_id: Optional[str] = None,
+               created_at: Optional[datetime.datetime] = None) -> Dict[str, Any]:
+        """追加一个快照，返回索引条目"""
+        created_at = created_at or datetime.datetime.now()
+        snapshot_id = snapshot_id or created_at.strftime(ID_FORMAT)
+        # 通过序列化归一化（日期转字符串、记录转字典），并与调用方的对象解耦
+        snapshot = loads(dumps(snapshot))
+
+        index = self._load_index()
+        snapshots = index['snapshots']
+        existing_ids = {entry['id'] for entry in snapshots}
+        base_id, suffix = snapshot_id, 1
+        while snapshot_id in existing_ids:
+            suffix += 1
+            snapshot_id = f"{base_id}_{suffix}"
+
+        lists, meta = split_snapshot(snapshot)
+        previous = self._latest_state(snapshots)
+        segment_length = 0
+        if snapshots:
+            last_segment = snapshots[-1]['segment']
+            segment_length = sum(1 for entry in snapshots if entry['segment'] == last_segment)
+
+        if previous is None or segment_length >= self.keyframe_interval:
+            state_lists = dict(previous['lists']) if previous else {}
+            state_lists.update(lists)
+            record = {'type': 'keyframe', 'lists': state_lists}
+            segment = f"seg_{snapshot_id}.jsonl"
+        else:
+            state_lists = dict(previous['lists'])
+            record = {'type': 'delta', 'lists': {}}
+            for key, items in lists.items():
+                record['lists'][key] = diff_list(previous['lists'].get(key, []), items)
+                state_lists[key] = items
+            segment = snapshots[-1]['segment']
+
+        record.update({'id': snapshot_id, 'created_at': created_at.isoformat(), 'meta': meta})
+
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        append_jsonl(self.base_dir / segment, record)
+
+        entry = {'id': snapshot_id, 'created_at': record['created_at'], 'segment': segment, 'type': record['type']}
+        snapshots.append(entry)
+        index['keyframe_interval'] = self.keyframe_interval
+        write_json(self._index_path(), index, pretty=False)
+
+        self._last_state = {'id': snapshot_id, 'lists': state_lists, 'meta': meta}
+        logger.info(f"已保存趋势快照 {snapshot_id} ({record['type']}, 段 {segment})")
+        return entry
+
+    def _latest_state(self, snapshots: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not snapshots:
+            return None
+        last_id = snapshots[-1]['id']
+        if self._last_state is None or self._last_state['id'] != last_id:
+            self._last_state = self._reconstruct_state(snapshots[-1])
+        return self._last_state
+
+    # ---- 读取 ----
+
+    def _reconstruct_state(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """从所在段的关键帧开始重放到目标快照"""
+        state = None
+        for record in iter_jsonl(self.base_dir / entry['segment']):
+            state = self._apply(state, record)
+            if record['id'] == entry['id']:
+                return state
+        raise KeyError(f"快照 {entry['id']} 不在段 {entry['segment']} 中")
+
+    @staticmethod
+    def _apply(state: Optional[Dict[str, Any]], record: Dict[str, Any]) -> Dict[str, Any]:
+        if record['type'] == 'keyframe':
+            lists = dict(record['lists'])
+        else:
+            if state is None:
+                raise ValueError(f"增量快照 {record['id']} 之前缺少关键帧")
+            lists = dict(state['lists'])
+            for key, delta in record['lists'].items():
+                lists[key] = apply_list_delta(lists.get(key, []), delta)
+        return {'id': record['id'], 'lists': lists, 'meta': record.get('meta', {})}
+
+    @staticmethod
+    def _to_snapshot(state: Dict[str, Any]) -> Dict[str, Any]:
+        snapshot = dict(state['lists'])
+        snapshot.update(state['meta'])
+        return snapshot
+
+    def reconstruct(self, key: str) -> Optional[Dict[str, Any]]:
+        """重建指定快照的完整数据"""
+        entry = self.find(key)
+        if entry is None:
+            return None
+        return self._to_snapshot(self._reconstruct_state(entry))
+
+    def iter_snapshots(self) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """按时间顺序逐段重放所有快照，产出 (索引条目, 完整数据)"""
+        entries_by_id = {entry['id']: entry for entry in self.list_snapshots()}
+        segments = list(dict.fromkeys(entry['segment'] for entry in entries_by_id.values()))
+        for segment in segments:
+            state = None
+            for record in iter_jsonl(self.base_dir / segment):
+                state = self._apply(state, record)
+                entry = entries_by_id.get(record['id'])
+                if entry is not None and entry['segment'] == segment:
+                    yield entry, self._to_snapshot(state)
+
+    # ---- 维护 ----
+
+    def compact(self, keep_days: Optional[int] = None, daily_after_days: Optional[int] = None,
+                now: Optional[datetime.datetime] = None) -> Dict[str, int]:
+        """压缩存储：删除过旧的快照、把较旧的快照稀疏为每天一个，并重新编码所有段"""
+        now = now or datetime.datetime.now()
+        snapshots = self.list_snapshots()
+        if not snapshots:
+            return {'before': 0, 'after': 0}
+
+        # 稀疏化：较旧的快照每天只保留最后一个
+        last_of_day = {}
+        for entry in snapshots:
+            last_of_day[entry['id'][:8]] = entry['id']
+
+        def keep(entry: Dict[str, Any]) -> bool:
+            created = datetime.datetime.fromisoformat(entry['created_at'])
+            age_days = (now - created).total_seconds() / 86400
+            if keep_days is not None and age_days > keep_days:
+                return False
+            if daily_after_days is not None and age_days > daily_after_days:
+                return last_of_day[entry['id'][:8]] == entry['id']
+            return True
+
+        staging_dir = self.base_dir.with_name(self.base_dir.name + '.compacting')
+        if staging_dir.exists():
+            shutil.rmtree(staging_dir)
+        staging = SnapshotStore(staging_dir, self.keyframe_interval)
+
+        kept = 0
+        for entry, snapshot in self.iter_snapshots():
+            if keep(entry):
+                staging.append(snapshot, entry['id'], datetime.datetime.fromisoformat(entry['created_at']))
+                kept += 1
+
+        old_dir = self.base_dir.with_name(self.base_dir.name + '.old')
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+        if kept:
+            os.replace(self.base_dir, old_dir)
+            os.replace(staging_dir, self.base_dir)
+            shutil.rmtree(old_dir)
+        else:
+            shutil.rmtree(self.base_dir)
+            if staging_dir.exists():
+                shutil.rmtree(staging_dir)
+        self._last_state = None
+
+        logger.info(f"快照压缩完成: {len(snapshots)} -> {kept}")
+        return {'before': len(snapshots), 'after': kept}
+
+    def import_files(self, paths: List[Path], id_pattern: str = 'trends_backup_') -> int:
+        """按时间顺序导入旧的完整备份文件（文件名形如 trends_backup_YYYYMMDD_HHMMSS.json）"""
+        imported = 0
+        known = {entry['id'] for entry in self.list_snapshots()}
+        for path in sorted(paths, key=lambda p: p.name):
+            snapshot_id = path.stem.replace(id_pattern, '')
+            if snapshot_id in known:
+                continue
+            try:
+                created_at = datetime.datetime.strptime(snapshot_id, ID_FORMAT)
+            except ValueError:
+                logger.warning(f"跳过无法识别时间的文件: {path}")
+                continue
+            self.append(read_json(path), snapshot_id, created_at)
+            imported += 1
+        return imported
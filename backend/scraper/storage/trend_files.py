@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分时间段的趋势数据文件
+每个时间段（以及其中的每种语言）单独成文件，外加一个记录版本和更新时间的清单；
+写入方只重写自己负责的时间段，读取方按需加载切片
+"""
+
+import os
+import re
+import logging
+import datetime
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator
+
+from backend.scraper.core.file_lock import file_lock
+from backend.scraper.core.serializer import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+UNKNOWN_LANGUAGE = 'unknown'
+
+
+def language_slug(language: Optional[str]) -> str:
+    """语言名转换为文件名（C++ -> c-plus-plus，C# -> c-sharp）"""
+    if not language:
+        return UNKNOWN_LANGUAGE
+    slug = language.lower().replace('+', '-plus').replace('#', '-sharp')
+    slug = re.sub(r'[^a-z0-9]+', '-', slug).strip('-')
+    return slug or UNKNOWN_LANGUAGE
+
+
+class TrendFileStore:
+    """分时间段 / 分语言的趋势文件存储
+
+    目录结构：
+    - manifest.json：{version, lastUpdated, periods: {period: {file, count, lastUpdated, languages}}}
+    - <period>.json：该时间段的全部仓库
+    - <period>/<language>.json：该时间段内某种语言的仓库
+    数据文件先写（原子替换），清单最后在锁内更新，读取方看到的清单总是指向完整的文件。
+    """
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+        self._thread_lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.base_dir / MANIFEST_FILE
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """进程内和跨进程互斥，保护清单的读-改-写"""
+        with self._thread_lock, file_lock(self.base_dir):
+            yield
+
+    def read_manifest(self) -> Dict[str, Any]:
+        if self.manifest_path.exists():
+            try:
+                return read_json(self.manifest_path)
+            except Exception as e:
+                logger.warning(f"读取趋势清单失败: {e}")
+        return {'version': 0, 'lastUpdated': None, 'periods': {}}
+
+    def write_period(self, period: str, repositories: List[Dict[str, Any]],
+                     by_language: bool = True) -> Dict[str, Any]:
+        """写入一个时间段的数据并更新清单，返回该时间段的清单条目"""
+        now = datetime.datetime.now().isoformat()
+
+        languages: Dict[str, List[Dict[str, Any]]] = {}
+        if by_language:
+            for repo in repositories:
+                languages.setdefault(language_slug(repo.get('language')), []).append(repo)
+
+        with self._locked():
+            period_file = f"{period}.json"
+            write_json(self.base_dir / period_file, {
+                'period': period,
+                'lastUpdated': now,
+                'repositories': repositories,
+            })
+
+            language_entries = {}
+            if languages:
+                (self.base_dir / period).mkdir(exist_ok=True)
+                for slug, repos in languages.items():
+                    language_file = f"{period}/{slug}.json"
+                    write_json(self.base_dir / language_file, {
+                        'period': period,
+                        'language': repos[0].get('language') or None,
+                        'lastUpdated': now,
+                        'repositories': repos,
+                    })
+                    language_entries[slug] = {'file': language_file, 'count': len(repos)}
+
+            manifest = self.read_manifest()
+            previous = manifest['periods'].get(period, {})
+            entry = {
+                'file': period_file,
+                'count': len(repositories),
+                'lastUpdated': now,
+                'languages': language_entries,
+            }
+            manifest['periods'][period] = entry
+            manifest['version'] = manifest.get('version', 0) + 1
+            manifest['lastUpdated'] = now
+            write_json(self.manifest_path, manifest)
+
+            # 清单已不再引用的语言文件
+            for slug, stale in previous.get('languages', {}).items():
+                if slug not in language_entries:
+                    try:
+                        os.remove(self.base_dir / stale['file'])
+                    except OSError:
+                        pass
+
+        logger.info(f"趋势文件已更新: {self.base_dir / period_file} "
+                    f"({len(repositories)} 个仓库，{len(language_entries)} 种语言，清单版本 {manifest['version']})")
+        return entry
+
+    def read_period(self, period: str, language: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """读取一个时间段（或其中一种语言）的数据"""
+        entry = self.read_manifest()['periods'].get(period)
+        if not entry:
+            return None
+        if language is not None:
+            entry = entry.get('languages', {}).get(language_slug(language))
+            if not entry:
+                return None
+        return read_json(self.base_dir / entry['file'])
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+库/包使用量历史
+按时间桶记录每个关键词的库、包使用次数，增量计算真实增长率、移动平均和新兴库
+"""
+
+import logging
+import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from backend.scraper.core.serializer import append_jsonl, iter_jsonl, read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent.parent.parent
+DEFAULT_HISTORY_DIR = project_root / 'data' / 'usage_history'
+
+CATEGORIES = ('libraries', 'packages')
+
+
+class UsageHistoryStore:
+    """按关键词保存库/包使用量的时间桶历史
+
+    每个关键词两个文件：
+    - <keyword>.jsonl：追加写入的原始记录，每次爬取一行
+    - <keyword>.state.json：最近 window 个时间桶的计数矩阵，用于增量计算，
+      丢失时可从 jsonl 重放恢复
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None, window: int = 8,
+                 top_n: int = 200, bucket_format: str = '%Y-%m-%d'):
+        self.base_dir = Path(base_dir) if base_dir else DEFAULT_HISTORY_DIR
+        self.window = window
+        self.top_n = top_n
+        self.bucket_format = bucket_format
+
+    def _safe_name(self, keyword: str) -> str:
+        return keyword.replace(' ', '_').replace('/', '_').replace('\\', '_')
+
+    def _log_path(self, keyword: str) -> Path:
+        return self.base_dir / f"{self._safe_name(keyword)}.jsonl"
+
+    def _state_path(self, keyword: str) -> Path:
+        return self.base_dir / f"{self._safe_name(keyword)}.state.json"
+
+    def record(self, keyword: str, libraries: Dict[str, int], packages: Dict[str, int],
+               recorded_at: Optional[datetime.datetime] = None) -> bool:
+        """记录一次爬取结束时的使用量（同一时间桶内以最后一次为准）"""
+        recorded_at = recorded_at or datetime.datetime.now()
+        bucket = recorded_at.strftime(self.bucket_format)
+
+        entry = {
+            'bucket': bucket,
+            'recorded_at': recorded_at.isoformat(),
+            'libraries': self._top(libraries),
+            'packages': self._top(packages),
+        }
+
+        try:
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            append_jsonl(self._log_path(keyword), entry)
+
+            state = self._load_state(keyword)
+            self._apply(state, entry)
+            self._save_state(keyword, state)
+
+            logger.info(f"已记录关键词 '{keyword}' 的使用量历史 (时间桶 {bucket})")
+            return True
+
+        except Exception as e:
+            logger.error(f"记录使用量历史失败: {e}")
+            return False
+
+    def _top(self, counts: Dict[str, int]) -> Dict[str, int]:
+        items = sorted(counts.items(), key=lambda x: x[1], reverse=True)[:self.top_n]
+        return dict(items)
+
+    def _empty_state(self) -> Dict[str, Any]:
+        return {'buckets': [], 'series': {category: {} for category in CATEGORIES}}
+
+    def _apply(self, state: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        """把一条记录合并进计数矩阵，只移动窗口不重扫历史"""
+        buckets = state['buckets']
+        bucket = entry['bucket']
+
+        if buckets and buckets[-1] == bucket:
+            # 同一时间桶：覆盖最后一列
+            for category in CATEGORIES:
+                series = state['series'][category]
+                for values in series.values():
+                    values[-1] = 0
+        elif buckets and bucket < buckets[-1]:
+            # 乱序的旧记录不影响当前窗口
+            return
+        else:
+            buckets.append(bucket)
+            for category in CATEGORIES:
+                for values in state['series'][category].values():
+                    values.append(0)
+
+            if len(buckets) > self.window:
+                drop = len(buckets) - self.window
+                del buckets[:drop]
+                for category in CATEGORIES:
+                    for values in state['series'][category].values():
+                        del values[:drop]
+
+        width = len(buckets)
+        for category in CATEGORIES:
+            series = state['series'][category]
+            for name, count in entry.get(category, {}).items():
+                values = series.get(name)
+                if values is None:
+                    values = [0] * width
+                    series[name] = values
+                values[-1] = count
+
+            # 移除窗口内已全部为 0 的条目
+            for name in [n for n, values in series.items() if not any(values)]:
+                del series[name]
+
+    def _load_state(self, keyword: str) -> Dict[str, Any]:
+        state_path = self._state_path(keyword)
+        if state_path.exists():
+            try:
+                state = read_json(state_path)
+                if state.get('buckets') is not None and state.get('series') is not None:
+                    return state
+            except Exception as e:
+                logger.warning(f"读取使用量状态失败，将从历史重建: {e}")
+
+        return self._rebuild_state(keyword)
+
+    def _rebuild_state(self, keyword: str) -> Dict[str, Any]:
+        """从追加日志重放得到计数矩阵"""
+        state = self._empty_state()
+        log_path = self._log_path(keyword)
+        if not log_path.exists():
+            return state
+
+        for entry in iter_jsonl(log_path):
+            self._apply(state, entry)
+        return state
+
+    def _save_state(self, keyword: str, state: Dict[str, Any]) -> None:
+        write_json(self._state_path(keyword), state, pretty=False)
+
+    def compute_trends(self, keyword: str, category: str, current: Dict[str, int],
+                       ma_window: int = 3, emerging_min_count: int = 3) -> Dict[str, Dict[str, Any]]:
+        """用历史窗口计算当前计数的增长率、移动平均和新兴标记
+
+        current 为本次爬取的计数（尚未写入历史），与上一个时间桶比较。
+        """
+        state = self._load_state(keyword)
+        today = datetime.datetime.now().strftime(self.bucket_format)
+
+        # 与当前时间桶之前的最近一个桶比较
+        buckets = state['buckets']
+        history_width = len(buckets) - 1 if buckets and buckets[-1] == today else len(buckets)
+        series = state['series'].get(category, {})
+
+        trends = {}
+        for name, count in current.items():
+            history = series.get(name, [0] * len(buckets))[:history_width]
+            previous = history[-1] if history else None
+
+            window_values = (history + [count])[-ma_window:]
+            moving_average = sum(window_values) / len(window_values)
+
+            if history_width == 0:
+                growth_rate = None
+                trend = "暂无历史"
+            elif not previous:
+                growth_rate = None
+                trend = "新兴"
+            else:
+                growth_rate = (count - previous) / previous * 100
+                if growth_rate >= 10:
+                    trend = "上升"
+                elif growth_rate <= -10:
+                    trend = "下降"
+                else:
+                    trend = "稳定"
+
+            # 此前窗口内从未出现（或极少），本次达到阈值
+            emerging = history_width > 0 and count >= emerging_min_count and max(history, default=0) < emerging_min_count
+
+            trends[name] = {
+                'trend': trend,
+                'growth': f"{growth_rate:+.0f}%" if growth_rate is not None else None,
+                'growth_rate': round(growth_rate, 2) if growth_rate is not None else None,
+                'previous_count': previous,
+                'moving_average': round(moving_average, 2),
+                'emerging': emerging,
+                'history_buckets': history_width,
+            }
+
+        return trends
+
+    def get_history(self, keyword: str, category: str, name: str) -> List[Dict[str, Any]]:
+        """获取单个库/包在窗口内的计数序列"""
+        state = self._load_state(keyword)
+        values = state['series'].get(category, {}).get(name, [0] * len(state['buckets']))
+        return [{'bucket': bucket, 'count': count} for bucket, count in zip(state['buckets'], values)]
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+星标速度索引
+按仓库累积每次趋势 / 关键词运行的观测（时间、星数、today_stars、排名、时间段），
+每条观测以 O(1) 更新滚动的速度（星/小时）和加速度，"上升最快"查询无需回放历史
+"""
+
+import os
+import time
+import heapq
+import logging
+import datetime
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Set, Union
+
+from backend.scraper.core.file_lock import file_lock
+from backend.scraper.core.models import RepoRecord
+from backend.scraper.core.serializer import dumps, read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent.parent.parent
+DEFAULT_VELOCITY_DIR = project_root / 'data' / 'velocity'
+
+# today_stars 对应的统计窗口（小时），用于首次观测时估计速度
+PERIOD_HOURS = {'daily': 24, 'weekly': 24 * 7, 'monthly': 24 * 30}
+
+# 间隔过短的两次观测之间星数差异主要是噪声，只更新排名
+MIN_GAP_HOURS = 1 / 60
+
+METRICS = ('velocity', 'acceleration', 'rank_change')
+
+# 超过保留天数没有新观测的仓库从索引中删除
+DEFAULT_RETENTION_DAYS = 90
+# observations.jsonl 超过该大小时轮转，保留 LOG_BACKUPS 个旧文件
+DEFAULT_LOG_MAX_BYTES = 64 * 1024 * 1024
+LOG_BACKUPS = 3
+
+
+def _timestamp(value: Any, default: float) -> float:
+    """观测时间：优先使用记录的抓取时间（缓存命中的页面保留原始抓取时间）"""
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    if isinstance(value, str) and value:
+        try:
+            return datetime.datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return default
+
+
+class VelocityIndex:
+    """仓库级星标速度索引（线程安全）
+
+    每个仓库只保存最近一次观测和滚动聚合：
+    - velocity：星数差分速度的时间加权指数移动平均（半衰期 half_life 小时）
+    - acceleration：速度变化率的指数移动平均（星/小时²）
+    - rank / rank_change：各时间段最近排名和相对上一次的变化（正数表示上升）
+    原始观测追加写入 observations.jsonl（按大小轮转），索引本身不依赖它。
+
+    多个进程（定时任务、关键词爬虫）可能共用同一目录：save() 在文件锁内重新读取 index.json，
+    只合并本进程更新过的仓库，不会覆盖其他进程同时写入的结果。
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None, half_life: float = 24.0,
+                 retention_days: Optional[float] = None, log_max_bytes: Optional[int] = None):
+        self.base_dir = Path(base_dir) if base_dir else DEFAULT_VELOCITY_DIR
+        self.half_life = half_life
+        if retention_days is None:
+            retention_days = float(os.getenv('VELOCITY_RETENTION_DAYS', str(DEFAULT_RETENTION_DAYS)))
+        self.retention_days = retention_days
+        if log_max_bytes is None:
+            log_max_bytes = int(os.getenv('VELOCITY_LOG_MAX_BYTES', str(DEFAULT_LOG_MAX_BYTES)))
+        self.log_max_bytes = log_max_bytes
+        self._lock = threading.Lock()
+        self._repos: Optional[Dict[str, Dict[str, Any]]] = None
+        self._pending: List[bytes] = []
+        # 本进程上次保存后更新过的仓库
+        self._dirty: Set[str] = set()
+
+    @property
+    def index_path(self) -> Path:
+        return self.base_dir / 'index.json'
+
+    @property
+    def observations_path(self) -> Path:
+        return self.base_dir / 'observations.jsonl'
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        if self.index_path.exists():
+            try:
+                return read_json(self.index_path).get('repositories', {})
+            except Exception as e:
+                logger.warning(f"读取速度索引失败，将重新累积: {e}")
+        return {}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._repos is None:
+            self._repos = self._read_index()
+        return self._repos
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """跨进程互斥，保护 index.json 的读-合并-写和日志轮转（调用方已持有 self._lock）"""
+        with file_lock(self.base_dir):
+            yield
+
+    def _weight(self, gap_hours: float) -> float:
+        """时间加权的平滑系数：间隔越长，新观测的权重越大"""
+        return 1 - 0.5 ** (gap_hours / self.half_life)
+
+    def _update(self, full_name: str, ts: float, stars: int, today_stars: Optional[int],
+                rank: Optional[int], period: Optional[str]) -> bool:
+        repos = self._load()
+        state = repos.get(full_name)
+
+        if state is None:
+            hours = PERIOD_HOURS.get(period)
+            state = {
+                't': ts,
+                'stars': stars,
+                'velocity': today_stars / hours if today_stars and hours else 0.0,
+                'acceleration': 0.0,
+                'rank': {},
+                'rank_change': {},
+                'today_stars': {},
+                'observations': 0,
+            }
+            repos[full_name] = state
+        else:
+            gap_hours = (ts - state['t']) / 3600
+            if gap_hours < 0:
+                # 比已有观测更旧（如重放的缓存页面），忽略
+                return False
+            if gap_hours >= MIN_GAP_HOURS:
+                weight = self._weight(gap_hours)
+                instant = (stars - state['stars']) / gap_hours
+                velocity = state['velocity'] + weight * (instant - state['velocity'])
+                slope = (velocity - state['velocity']) / gap_hours
+                state['acceleration'] += weight * (slope - state['acceleration'])
+                state['velocity'] = velocity
+                state['t'] = ts
+                state['stars'] = stars
+
+        if period:
+            if rank is not None:
+                previous = state['rank'].get(period)
+                state['rank_change'][period] = previous - rank if previous is not None else 0
+                state['rank'][period] = rank
+            if today_stars is not None:
+                state['today_stars'][period] = today_stars
+        state['observations'] += 1
+        return True
+
+    def observe(self, full_name: str, stars: int, today_stars: Optional[int] = None,
+                rank: Optional[int] = None, period: Optional[str] = None,
+                source: str = 'trending', ts: Optional[float] = None) -> None:
+        """记录一条观测"""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            if self._update(full_name, ts, stars or 0, today_stars, rank, period):
+                self._pending.append(dumps({
+                    'full_name': full_name, 't': ts, 'stars': stars, 'today_stars': today_stars,
+                    'rank': rank, 'period': period, 'source': source,
+                }, pretty=False))
+                self._dirty.add(full_name)
+
+    def observe_records(self, records: Iterable[Union[RepoRecord, Dict[str, Any]]],
+                        period: Optional[str] = None, source: str = 'trending', ranked: bool = True) -> int:
+        """按列表顺序记录一批仓库（ranked 时以位置作为排名），返回记录条数"""
+        now = time.time()
+        count = 0
+        for position, record in enumerate(records, 1):
+            record = RepoRecord.from_api(record)
+            if not record.full_name:
+                continue
+            self.observe(
+                record.full_name,
+                record.stargazers_count or 0,
+                today_stars=record.today_stars,
+                rank=position if ranked else None,
+                period=period,
+                source=source,
+                ts=_timestamp(record.scraped_at, now),
+            )
+            count += 1
+        return count
+
+    def get(self, full_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self._load().get(full_name)
+            return dict(state) if state else None
+
+    def fastest_risers(self, limit: int = 20, metric: str = 'velocity', period: Optional[str] = None,
+                       min_observations: int = 2, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """上升最快的仓库
+
+        metric 为 velocity / acceleration / rank_change（rank_change 需指定 period）；
+        min_observations 过滤只出现过一次、速度仅来自 today_stars 估计的仓库，
+        since 只考虑该时间之后仍有观测的仓库。
+        """
+        if metric not in METRICS:
+            raise ValueError(f"不支持的指标: {metric}")
+        if metric == 'rank_change' and not period:
+            raise ValueError("按排名变化查询需要指定时间段")
+
+        def score(state: Dict[str, Any]) -> Optional[float]:
+            if metric == 'rank_change':
+                return state['rank_change'].get(period)
+            if period and period not in state['rank']:
+                return None
+            return state[metric]
+
+        with self._lock:
+            candidates = []
+            for full_name, state in self._load().items():
+                if state['observations'] < min_observations:
+                    continue
+                if since is not None and state['t'] < since:
+                    continue
+                value = score(state)
+                if value is not None:
+                    candidates.append((value, full_name, state))
+            top = heapq.nlargest(limit, candidates, key=lambda c: c[0])
+
+        return [dict(state, full_name=full_name, score=value) for value, full_name, state in top]
+
+    def _prune(self, repos: Dict[str, Dict[str, Any]]) -> int:
+        """删除超过保留天数没有新观测的仓库，返回删除数"""
+        if not self.retention_days or self.retention_days <= 0:
+            return 0
+        cutoff = time.time() - self.retention_days * 86400
+        stale = [full_name for full_name, state in repos.items() if state['t'] < cutoff]
+        for full_name in stale:
+            del repos[full_name]
+        return len(stale)
+
+    def _rotate_log(self) -> None:
+        """observations.jsonl 超过大小上限时轮转为 .1（旧的 .1 依次后移，最多保留 LOG_BACKUPS 个）"""
+        path = self.observations_path
+        if self.log_max_bytes <= 0 or not path.exists() or path.stat().st_size < self.log_max_bytes:
+            return
+        for n in range(LOG_BACKUPS - 1, 0, -1):
+            older = path.with_name(f"{path.name}.{n}")
+            if older.exists():
+                os.replace(older, path.with_name(f"{path.name}.{n + 1}"))
+        os.replace(path, path.with_name(f"{path.name}.1"))
+        logger.info(f"观测日志已轮转: {path}")
+
+    def save(self) -> None:
+        """在文件锁内重新读取索引，合并本进程更新过的仓库后写回
+
+        同一仓库两边都有更新时保留最近一次观测较新的状态；合并后清理过期仓库，
+        本进程的内存索引也替换为合并结果，之后的查询能看到其他进程的更新。
+        """
+        with self._lock:
+            if not self._dirty or self._repos is None:
+                return
+            try:
+                with self._locked():
+                    self._rotate_log()
+                    with open(self.observations_path, 'ab') as f:
+                        f.write(b''.join(line + b'\n' for line in self._pending))
+
+                    merged = self._read_index()
+                    for full_name in self._dirty:
+                        ours = self._repos.get(full_name)
+                        theirs = merged.get(full_name)
+                        if ours is not None and (theirs is None or ours['t'] >= theirs['t']):
+                            merged[full_name] = ours
+                    pruned = self._prune(merged)
+                    write_json(self.index_path, {'repositories': merged}, pretty=False)
+
+                self._repos = merged
+                self._pending = []
+                self._dirty = set()
+                if pruned:
+                    logger.info(f"速度索引已清理 {pruned} 个超过 {self.retention_days:g} 天未更新的仓库")
+            except Exception as e:
+                logger.error(f"保存速度索引失败: {e}")
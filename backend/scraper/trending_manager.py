@@ -7,12 +7,12 @@ GitHub 趋势数据管理器
 """
 
 import os
-import json
+import time
 import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 
 # 添加项目根目录到 Python 路径
 import sys
@@ -47,19 +47,28 @@ def load_env_file():
 load_env_file()
 
 from backend.scraper.core.api_client import GitHubAPIClient
+from backend.scraper.core.serializer import write_json
+from backend.scraper.core.models import RepoRecord
 from backend.scraper.crawlers.github_trending_html import GitHubTrendingHTMLCrawler
+from backend.scraper.storage.snapshot_store import SnapshotStore
+from backend.scraper.storage.velocity_index import VelocityIndex
 
 logger = logging.getLogger(__name__)
 
+PERIODS = ['daily', 'weekly', 'monthly']
+
+
 class TrendingDataManager:
     """趋势数据管理器"""
     
     def __init__(self):
         self.api_client = GitHubAPIClient()
-        # 使用 GitHub Trending HTML 爬虫作为数据源
-        self.crawler = GitHubTrendingHTMLCrawler()
+        # 使用 GitHub Trending HTML 爬虫作为数据源（共享进程内的 github.com 主机预算）
+        self.crawler = GitHubTrendingHTMLCrawler(api_client=self.api_client)
         self.data_dir = Path('public/trends/data')
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshots = SnapshotStore(self.data_dir / 'snapshots')
+        self.velocity = VelocityIndex()
         
     async def fetch_and_save_all_trends(self):
         """获取并保存所有时间段的趋势数据"""
@@ -71,16 +80,27 @@ class TrendingDataManager:
                 logger.error("GitHub API 连接失败")
                 return False
             
-            # 获取三个时间段的数据
-            daily_data = await self._fetch_period_data('daily')
-            weekly_data = await self._fetch_period_data('weekly') 
-            monthly_data = await self._fetch_period_data('monthly')
+            # 并发获取三个时间段的数据
+            period_data, changed = await self._fetch_periods(PERIODS)
+            daily_data = period_data['daily']
+            weekly_data = period_data['weekly']
+            monthly_data = period_data['monthly']
+
+            # 所有页面均未变化（304 或内容哈希命中）时不重写下游文件
+            if not changed and (self.data_dir / 'trends.json').exists():
+                logger.info("[SUCCESS] 所有趋势页面均未变化，跳过写入")
+                return True
+
+            # 累积星标速度观测（缓存命中的页面沿用原抓取时间，不会产生重复观测）
+            for period in PERIODS:
+                self.velocity.observe_records(period_data[period], period)
+            self.velocity.save()
             
-            # 构建完整的趋势数据
+            # 构建完整的趋势数据（输出边界：记录转换为前端读取的条目格式）
             trends_data = {
-                'daily': daily_data,
-                'weekly': weekly_data,
-                'monthly': monthly_data,
+                'daily': [repo.to_trending_item() for repo in daily_data],
+                'weekly': [repo.to_trending_item() for repo in weekly_data],
+                'monthly': [repo.to_trending_item() for repo in monthly_data],
                 'lastUpdated': datetime.now().isoformat(),
                 'metadata': {
                     'dailyCount': len(daily_data),
@@ -100,141 +120,38 @@ class TrendingDataManager:
             logger.error(f"获取趋势数据失败: {e}")
             return False
     
-    async def _fetch_period_data(self, period: str) -> List[Dict[str, Any]]:
+    async def _fetch_period_data(self, period: str) -> List[RepoRecord]:
         """获取指定时间段的趋势数据"""
-        logger.info(f"获取 {period} 趋势数据...")
-
-        try:
-            all_repos = []
-
-            # 1. 获取全语言趋势数据
-            logger.info(f"获取 {period} 全语言趋势数据...")
-            general_repos = self.crawler.fetch(period)
-            all_repos.extend(general_repos)
-            logger.info(f"全语言数据: {len(general_repos)} 个项目")
-
-            # 2. 获取热门语言的趋势数据
-            popular_languages = [
-                'javascript', 'python', 'java', 'typescript', 'c++', 'c#', 'php',
-                'c', 'shell', 'go', 'rust', 'kotlin', 'swift', 'dart', 'ruby',
-                'scala', 'r', 'matlab', 'perl', 'lua', 'haskell', 'clojure',
-                'vue', 'html', 'css', 'scss', 'less'
-            ]
-
-            for lang in popular_languages:
-                try:
-                    logger.info(f"获取 {period} {lang} 趋势数据...")
-                    lang_repos = self.crawler.fetch(period, language=lang)
-                    if lang_repos:
-                        all_repos.extend(lang_repos)
-                        logger.info(f"{lang} 数据: {len(lang_repos)} 个项目")
-
-                    # 添加延迟避免被限制
-                    await asyncio.sleep(1)
-
-                except Exception as e:
-                    logger.warning(f"获取 {lang} 数据失败: {e}")
-                    continue
-
-            # 3. 去重（基于full_name）
-            seen = set()
-            unique_repos = []
-            for repo in all_repos:
-                full_name = repo.get('full_name')
-                if full_name and full_name not in seen:
-                    seen.add(full_name)
-                    unique_repos.append(repo)
-
-            logger.info(f"{period} 数据获取完成: {len(unique_repos)} 个去重后的项目")
-            return unique_repos
-
-        except Exception as e:
-            logger.error(f"获取 {period} 数据失败: {e}")
-            return []
+        return (await self._fetch_periods([period]))[0][period]
+
+    async def _fetch_periods(self, periods: List[str]) -> Tuple[Dict[str, List[RepoRecord]], bool]:
+        """并发获取多个时间段 × 全部语言的趋势页面
+
+        各时间段并发汇总，页面在线程池中抓取并解析（页面到达即解析），
+        并发数和请求间隔由爬虫的主机预算统一控制。
+        返回各时间段的仓库和是否有页面内容发生变化。
+        """
+        started = time.monotonic()
+        logger.info(f"开始并发获取 {len(periods)} 个时间段的趋势页面 ({', '.join(periods)})...")
+
+        results = await asyncio.gather(*(
+            self.crawler.collect_trending(period, include_search=False)
+            for period in periods
+        ))
+
+        logger.info(f"趋势页面获取完成，耗时 {time.monotonic() - started:.1f} 秒，"
+                    f"预算统计: {self.crawler.budget.stats()}，轮询计划: {self.crawler.poll_schedule.summary()}")
+        period_data = {period: repos for period, (repos, _) in zip(periods, results)}
+        return period_data, any(changed for _, changed in results)
     
-    async def _get_recent_trending(self, days: int, min_stars: int, max_results: int) -> List[Dict[str, Any]]:
+    async def _get_recent_trending(self, days: int, min_stars: int, max_results: int) -> List[RepoRecord]:
         """获取最近指定天数的趋势项目"""
-        since_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-        
-        # 构建多个查询以获取更多样化的数据
-        queries = [
-            f'created:>{since_date} stars:>{min_stars}',
-            f'pushed:>{since_date} stars:>{min_stars//2}',
-            f'created:>{since_date} language:JavaScript stars:>5',
-            f'created:>{since_date} language:Python stars:>5',
-            f'created:>{since_date} language:TypeScript stars:>5',
-        ]
-        
-        all_repos = []
-        seen_repos = set()
-        
-        for query in queries:
-            try:
-                # 获取多页数据
-                for page in range(1, 3):  # 最多2页
-                    search_result = self.api_client.search_repositories(
-                        query=query,
-                        sort='stars',
-                        order='desc',
-                        per_page=50,
-                        page=page
-                    )
-                    
-                    if not search_result or 'items' not in search_result:
-                        break
-                    
-                    for repo in search_result['items']:
-                        repo_key = repo.get('full_name')
-                        if repo_key and repo_key not in seen_repos:
-                            seen_repos.add(repo_key)
-                            all_repos.append(repo)
-                            
-                            if len(all_repos) >= max_results:
-                                break
-                    
-                    if len(all_repos) >= max_results:
-                        break
-                    
-                    await asyncio.sleep(1)  # 避免速率限制
-                
-                if len(all_repos) >= max_results:
-                    break
-                    
-                await asyncio.sleep(2)  # 查询间隔
-                
-            except Exception as e:
-                logger.warning(f"查询失败 '{query}': {e}")
-                continue
-        
-        # 按星数排序
-        all_repos.sort(key=lambda x: x.get('stargazers_count', 0), reverse=True)
-        return all_repos[:max_results]
+        return await self.crawler._get_recent_trending(days, min_stars, max_results)
     
-    def _format_repository_data(self, repo: Dict[str, Any], period: str) -> Optional[Dict[str, Any]]:
+    def _format_repository_data(self, repo: Union[Dict[str, Any], RepoRecord], period: str) -> Optional[Dict[str, Any]]:
         """格式化仓库数据"""
         try:
-            # 从 HTML 源读取今日增长
-            stars = repo.get('stargazers_count', repo.get('stars', 0))
-            today = repo.get('today_stars', 0)
-
-            return {
-                'id': repo.get('id'),
-                'name': repo.get('name'),
-                'owner': repo.get('owner', {}).get('login') if isinstance(repo.get('owner'), dict) else str(repo.get('owner', '')),
-                'fullName': repo.get('full_name'),
-                'description': repo.get('description'),
-                'language': repo.get('language'),
-                'stars': stars,
-                'forks': repo.get('forks_count', repo.get('forks', 0)),
-                'todayStars': today,
-                'url': repo.get('html_url'),
-                'createdAt': repo.get('created_at'),
-                'updatedAt': repo.get('updated_at'),
-                'pushedAt': repo.get('pushed_at'),
-                'topics': repo.get('topics', []),
-                'trendPeriod': period,
-                'scrapedAt': datetime.now().isoformat()
-            }
+            return RepoRecord.from_api(repo).to_trending_dict(period)
         except Exception as e:
             logger.error(f"格式化仓库数据失败: {e}")
             return None
@@ -244,18 +161,12 @@ class TrendingDataManager:
         try:
             # 保存主要的trends.json文件
             trends_file = self.data_dir / 'trends.json'
-            with open(trends_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            write_json(trends_file, data)
 
             logger.info(f"趋势数据已保存到: {trends_file}")
 
-            # 同时保存带时间戳的备份文件
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_file = self.data_dir / f'trends_backup_{timestamp}.json'
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-
-            logger.info(f"备份文件已保存到: {backup_file}")
+            # 历史快照只记录相对上一次的变化
+            self.snapshots.append(data)
 
         except Exception as e:
             logger.error(f"保存趋势数据失败: {e}")
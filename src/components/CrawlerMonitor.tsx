@@ -7,6 +7,7 @@ import { Progress } from "@/components/ui/progress"
 import { Button } from "@/components/ui/button"
 import { RefreshCw, Play, Pause, AlertCircle, CheckCircle, Clock, X, ChevronDown, ChevronUp, History, ExternalLink, RotateCcw } from 'lucide-react'
 import { useRouter } from 'next/navigation'
+import { subscribeTaskProgress, isTerminalStatus } from '@/lib/crawl-progress'
 
 interface CrawlTask {
   id: number
@@ -35,6 +36,10 @@ export default function CrawlerMonitor({ className }: CrawlerMonitorProps) {
   const [notifications, setNotifications] = useState<Array<{id: string, type: 'success' | 'error', message: string, keyword: string}>>([])
   const [retryingTasks, setRetryingTasks] = useState<Set<number>>(new Set())
   const previousTasksRef = useRef<CrawlTask[]>([])
+  // 进行中任务的进度流（任务ID -> 取消订阅函数）
+  const streamsRef = useRef<Map<number, () => void>>(new Map())
+  // 有进度流中断（如进度中继未启动）时退回较快的轮询
+  const [streamFallback, setStreamFallback] = useState(false)
 
   // 部署时间戳 - 用于过滤新请求（可以从环境变量或构建时间获取）
   const deploymentTimestamp = useRef<Date>(new Date('2025-08-14T00:00:00Z')) // 当前部署时间
@@ -152,17 +157,69 @@ export default function CrawlerMonitor({ className }: CrawlerMonitorProps) {
     fetchTasks(true) // 初始加载显示loading
   }, [])
 
-  // 自动刷新（修复闪屏问题）
+  // 进度流推送的非终态更新直接合并到任务列表；终态交给 fetchTasks，由它比较新旧状态并发出通知
+  const applyProgress = (update: { id: number, status: CrawlTask['status'], progress: number, message?: string, total?: number }) => {
+    if (isTerminalStatus(update.status)) {
+      fetchTasks(false)
+      return
+    }
+    const merge = (list: CrawlTask[]) => list.map(task => task.id === update.id ? {
+      ...task,
+      status: update.status,
+      progress: update.progress,
+      message: update.message || task.message,
+      totalRepositories: update.total ?? task.totalRepositories
+    } : task)
+    previousTasksRef.current = merge(previousTasksRef.current)
+    setTasks(prev => merge(prev))
+    setLastUpdate(new Date())
+  }
+
+  const stopStreams = () => {
+    streamsRef.current.forEach(unsubscribe => unsubscribe())
+    streamsRef.current.clear()
+  }
+
+  // 为进行中的任务订阅进度流，已结束的任务取消订阅
+  useEffect(() => {
+    if (!autoRefresh) {
+      stopStreams()
+      return
+    }
+    const activeIds = new Set(
+      tasks.filter(task => task.status === 'running' || task.status === 'pending').map(task => task.id)
+    )
+    streamsRef.current.forEach((unsubscribe, taskId) => {
+      if (!activeIds.has(taskId)) {
+        unsubscribe()
+        streamsRef.current.delete(taskId)
+      }
+    })
+    activeIds.forEach(taskId => {
+      if (streamsRef.current.has(taskId)) return
+      const unsubscribe = subscribeTaskProgress(taskId, applyProgress, (finished) => {
+        // 保留记录，避免流中断后反复重连；该任务之后由轮询更新
+        if (!finished) setStreamFallback(true)
+      })
+      streamsRef.current.set(taskId, unsubscribe)
+    })
+  }, [tasks, autoRefresh])
+
+  // 组件卸载时关闭所有进度流
+  useEffect(() => stopStreams, [])
+
+  // 自动刷新（修复闪屏问题）：进度由推送流更新，列表轮询用于发现新任务，
+  // 并兜底推送流没有送达终态的任务（如爬虫进程被杀）；进度流不可用时退回 15 秒轮询
   useEffect(() => {
     if (!autoRefresh) return
 
     // 使用固定的刷新间隔，避免频繁重建interval
     const interval = setInterval(() => {
       fetchTasks(false) // 自动刷新不显示loading，减少闪屏
-    }, 15000) // 固定15秒刷新间隔
+    }, streamFallback ? 15000 : 30000)
 
     return () => clearInterval(interval)
-  }, [autoRefresh])
+  }, [autoRefresh, streamFallback])
 
   // 获取状态图标
   const getStatusIcon = (status: string) => {
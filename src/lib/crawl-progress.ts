@@ -0,0 +1,72 @@
+// 爬虫任务进度订阅：读取 /api/crawl/progress 的 NDJSON 流（每行一个 JSON）
+
+export interface CrawlProgressUpdate {
+  id: number
+  status: 'pending' | 'running' | 'completed' | 'failed'
+  progress: number
+  message?: string
+  total?: number
+}
+
+export const TERMINAL_STATUSES = ['completed', 'failed']
+
+export function isTerminalStatus(status?: string) {
+  return !!status && TERMINAL_STATUSES.includes(status)
+}
+
+// 订阅单个任务的进度，返回取消订阅的函数
+// 流结束时调用 onEnd(finished)：finished 为 false 表示流在任务结束前中断（中继不可用、网络错误等），
+// 调用方应退回轮询；主动取消订阅不会调用 onEnd
+export function subscribeTaskProgress(
+  taskId: number,
+  onUpdate: (update: CrawlProgressUpdate) => void,
+  onEnd: (finished: boolean) => void
+): () => void {
+  const controller = new AbortController()
+  let finished = false
+
+  const handleLine = (line: string) => {
+    // 中继用空行作为心跳
+    if (!line.trim()) return
+    try {
+      const update = JSON.parse(line) as CrawlProgressUpdate
+      if (update.id !== taskId) return
+      onUpdate(update)
+      if (isTerminalStatus(update.status)) finished = true
+    } catch (error) {
+      console.warn('忽略无法解析的进度:', line)
+    }
+  }
+
+  const run = async () => {
+    try {
+      const response = await fetch(`/api/crawl/progress?taskId=${taskId}`, {
+        signal: controller.signal,
+        cache: 'no-store',
+      })
+      if (!response.ok || !response.body) return
+
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        const lines = buffer.split('\n')
+        buffer = lines.pop() || ''
+        lines.forEach(handleLine)
+      }
+      handleLine(buffer + decoder.decode())
+    } catch (error) {
+      if (!controller.signal.aborted) {
+        console.warn('任务进度流中断:', error)
+      }
+    } finally {
+      if (!controller.signal.aborted) onEnd(finished)
+    }
+  }
+
+  run()
+  return () => controller.abort()
+}
@@ -0,0 +1,32 @@
+import { prisma } from '@/lib/db/prisma';
+
+// 任务进度的 LISTEN/NOTIFY 频道，与 backend/scraper/core/progress_reporter.py 一致
+const PROGRESS_CHANNEL = 'crawl_progress';
+// NOTIFY 负载上限为 8000 字节，消息只保留前 200 个字符
+const MAX_MESSAGE_LENGTH = 200;
+
+// 更新爬虫任务状态，并在同一事务中 NOTIFY crawl_progress：
+// 爬虫进程启动失败或异常退出时由路由写入的 failed 也会推送给订阅进度流的页面
+export async function updateCrawlTaskStatus(taskId: number, status: string, progress: number, message?: string) {
+  const terminal = status === 'completed' || status === 'failed';
+  await prisma.$transaction(async (tx) => {
+    const task = await tx.crawlTask.update({
+      where: { id: taskId },
+      data: {
+        status,
+        progress,
+        ...(message !== undefined ? { message } : {}),
+        ...(terminal ? { completed_at: new Date() } : {})
+      }
+    });
+    const payload = JSON.stringify({
+      id: task.id,
+      status: task.status,
+      progress: task.progress,
+      message: (task.message || '').slice(0, MAX_MESSAGE_LENGTH),
+      ts: new Date().toISOString().slice(0, 19),
+      total: task.total_repositories,
+    });
+    await tx.$executeRaw`SELECT pg_notify(${PROGRESS_CHANNEL}, ${payload})`;
+  });
+}
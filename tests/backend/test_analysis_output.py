@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+分析结果分片输出测试
+"""
+
+import sys
+import gzip
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from backend.scraper.core.serializer import read_json
+from backend.scraper.storage import analysis_output
+from backend.scraper.storage.analysis_output import write_sharded_analysis
+
+
+def _summary(count):
+    return {
+        'keyword': 'react',
+        'repositories': [{'full_name': f"u/r{i}", 'stargazers_count': i} for i in range(count)],
+    }
+
+
+class TestShardedAnalysis:
+    """测试分片写出"""
+
+    def test_pages_manifest_and_summary(self, tmp_path):
+        """测试按星数降序分页，清单和摘要中的链接使用传入的 URL 前缀"""
+        output = tmp_path / 'analysis_react.json'
+        manifest = write_sharded_analysis(_summary(5), str(output), page_size=2, url_prefix='/data/analytics/')
+
+        pages_dir = tmp_path / 'analysis_react'
+        assert manifest['page_count'] == 3 and manifest['total_repositories'] == 5
+        assert manifest['summary'] == '/data/analytics/analysis_react.json'
+        assert [p['file'] for p in manifest['pages']] == [
+            f"/data/analytics/analysis_react/repos_page_{n:04d}.json" for n in (1, 2, 3)
+        ]
+        assert [p['count'] for p in manifest['pages']] == [2, 2, 1]
+        assert [p['max_stars'] for p in manifest['pages']] == [4, 2, 0]
+        assert read_json(pages_dir / 'manifest.json') == manifest
+
+        first = read_json(pages_dir / 'repos_page_0001.json')
+        assert [r['full_name'] for r in first['repositories']] == ['u/r4', 'u/r3']
+
+        summary = read_json(output)
+        assert 'repositories' not in summary
+        assert summary['repository_pages']['manifest'] == '/data/analytics/analysis_react/manifest.json'
+        assert not (tmp_path / 'analysis_react.staging').exists()
+
+    def test_compressed_siblings(self, tmp_path, monkeypatch):
+        """测试生成与原文件内容一致的 .gz 副本；brotli 不可用时删除旧的 .br 副本"""
+        output = tmp_path / 'analysis_react.json'
+        stale_br = tmp_path / 'analysis_react.json.br'
+        stale_br.write_bytes(b'stale')
+        monkeypatch.setattr(analysis_output, 'BROTLI_AVAILABLE', False)
+
+        write_sharded_analysis(_summary(3), str(output), page_size=10)
+
+        for path in (output, tmp_path / 'analysis_react' / 'repos_page_0001.json',
+                     tmp_path / 'analysis_react' / 'manifest.json'):
+            assert gzip.decompress(path.with_name(path.name + '.gz').read_bytes()) == path.read_bytes()
+        assert not stale_br.exists()
+
+    def test_brotli_sibling(self, tmp_path):
+        """测试安装 brotli 时生成 .br 副本"""
+        brotli = pytest.importorskip('brotli')
+        output = tmp_path / 'analysis_react.json'
+        write_sharded_analysis(_summary(1), str(output))
+        assert brotli.decompress((tmp_path / 'analysis_react.json.br').read_bytes()) == output.read_bytes()
+
+    @pytest.mark.parametrize('page_size', [0, -1])
+    def test_invalid_page_size(self, tmp_path, page_size):
+        """测试分页大小必须为正整数"""
+        with pytest.raises(ValueError):
+            write_sharded_analysis(_summary(3), str(tmp_path / 'analysis_react.json'), page_size=page_size)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+爬取任务检查点测试
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.storage.crawl_checkpoint import CrawlCheckpoint
+
+
+class TestCrawlCheckpoint:
+    """测试检查点记录与恢复"""
+
+    def test_resume_from_other_task_and_truncated_line(self, tmp_path):
+        """测试重试任务合并原任务的检查点，写入途中截断的最后一行被忽略"""
+        original = CrawlCheckpoint(1, tmp_path)
+        original.record_page('q', 100, 1, 250, [{'full_name': 'u/a'}])
+        original.record_enriched('u/a', {'Python': 10}, ['web'])
+        original.record_analyzed('u/a', {'analyzed_files': 3})
+        with open(original.path, 'ab') as f:
+            f.write(b'{"type": "analyzed", "full_na')
+
+        retry = CrawlCheckpoint(2, tmp_path, resume_from=1)
+        assert retry.get_page('q', 100, 1) == {'total_count': 250, 'items': [{'full_name': 'u/a'}]}
+        assert retry.get_page('q', 100, 2) is None
+        assert retry.get_enriched('u/a') == {'languages': {'Python': 10}, 'topics': ['web']}
+        assert retry.get_analysis('u/a') == {'analyzed_files': 3}
+
+        # 重试的重试只需要读取上一次重试的检查点
+        assert CrawlCheckpoint(3, tmp_path, resume_from=2).is_analyzed('u/a')
+
+        retry.clear()
+        assert not retry.path.exists()
+        assert not original.path.exists()
+
+    def test_prune_old_checkpoints(self, tmp_path):
+        """测试创建检查点时删除过期的检查点，保留本任务和恢复来源"""
+        for task_id in (1, 2, 3):
+            CrawlCheckpoint(task_id, tmp_path).record_page('q', 100, 1, 0, [])
+        old = time.time() - 30 * 86400
+        for task_id in (1, 2):
+            os.utime(tmp_path / f"task_{task_id}.jsonl", (old, old))
+
+        CrawlCheckpoint(4, tmp_path, resume_from=1, max_age_days=7)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['task_1.jsonl', 'task_3.jsonl', 'task_4.jsonl']
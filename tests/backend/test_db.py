@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+数据库连接池测试
+"""
+
+import sys
+import types
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+import backend.scraper.core.db as db
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.status = 0
+        self.rollbacks = 0
+
+    def set_client_encoding(self, encoding):
+        self.encoding = encoding
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = 0
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def fake_psycopg2(monkeypatch):
+    fake = types.SimpleNamespace(
+        connect=lambda dsn: FakeConnection(),
+        extensions=types.SimpleNamespace(TRANSACTION_STATUS_IDLE=0),
+    )
+    monkeypatch.setattr(db, 'psycopg2', fake, raising=False)
+    return fake
+
+
+class TestConnectionPool:
+    """测试连接池"""
+
+    def test_acquire_waits_instead_of_failing_when_exhausted(self, fake_psycopg2):
+        """测试连接耗尽时等待归还，归还时回滚未完成的事务"""
+        pool = db.ConnectionPool('postgresql://x', minconn=1, maxconn=1)
+        first = db.PooledConnection(pool, pool.acquire())
+        first.raw.status = 2  # 事务进行中
+        raw = first.raw
+
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=2)))
+        waiter.start()
+        first.close()
+        waiter.join()
+
+        assert acquired == [raw]
+        assert raw.rollbacks == 1 and raw.encoding == 'UTF8'
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.05)
+
+        metrics = pool.metrics()
+        assert metrics['acquired'] == 2
+        assert metrics['created'] == 1
+        assert metrics['in_use'] == 1
+
+    def test_prepared_once_per_connection(self, fake_psycopg2):
+        """测试每个连接只 PREPARE 一次，归还后复用时不再 PREPARE；断开的连接重新建立后重新 PREPARE"""
+        pool = db.ConnectionPool('postgresql://x', minconn=0, maxconn=2)
+        prepare = 'PREPARE progress AS UPDATE t SET p = $1 WHERE id = $2'
+        execute = 'EXECUTE progress (%s, %s)'
+        # 新建连接 -> 复用同一连接 -> 连接断开后重新建立
+        for expected, broken in (([prepare, execute, execute], False),
+                                 ([execute, execute], True),
+                                 ([prepare, execute, execute], False)):
+            conn = db.PooledConnection(pool, pool.acquire())
+            cursor = MagicMock(connection=conn.raw)
+            for task_id in (1, 2):
+                conn.execute_prepared(cursor, 'progress', 'UPDATE t SET p = $1 WHERE id = $2', (50, task_id))
+            assert [call.args[0] for call in cursor.execute.call_args_list] == expected
+            if broken:
+                # 已断开的连接归还时丢弃，预备语句随之失效
+                conn.raw.closed = 1
+            conn.close()
+
+        metrics = pool.metrics()
+        assert metrics['prepares'] == 2
+        assert metrics['prepared_executions'] == 6
+        assert metrics['created'] == 2
+        assert metrics['discarded'] == 1 and metrics['open'] == 1
+
+    def test_concurrent_borrows_reuse_connections(self, fake_psycopg2):
+        """测试多个线程反复借还连接时复用已建立的连接，建立的连接数不超过并发数"""
+        pool = db.ConnectionPool('postgresql://x', minconn=1, maxconn=10)
+        barrier = threading.Barrier(4)
+
+        def worker():
+            barrier.wait()
+            for _ in range(50):
+                with db.PooledConnection(pool, pool.acquire(timeout=2)):
+                    pass
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metrics = pool.metrics()
+        assert metrics['acquired'] == 200
+        assert metrics['created'] <= 4
+        assert metrics['discarded'] == 0 and metrics['in_use'] == 0
+        assert metrics['idle'] == metrics['open'] == metrics['created']
+
+    def test_connect_context_manager_and_default_timeout(self, fake_psycopg2, monkeypatch):
+        """测试 with 代码块异常退出时连接仍归还，连接池耗尽时按默认超时报错而不是无限等待"""
+        monkeypatch.setattr(db, 'PSYCOPG2_AVAILABLE', True)
+        monkeypatch.setattr(db, '_pools', {})
+        monkeypatch.setenv('DB_POOL_MAX', '1')
+        monkeypatch.delenv('DB_POOL_MIN', raising=False)
+        monkeypatch.setenv('DB_POOL_TIMEOUT', '0.05')
+
+        with pytest.raises(ValueError):
+            with db.connect('postgresql://x') as conn:
+                conn.raw.status = 2
+                raise ValueError('boom')
+        pool = db.get_pool('postgresql://x')
+        assert pool.minconn == 1
+        assert pool.metrics()['in_use'] == 0
+
+        held = db.connect('postgresql://x')
+        with pytest.raises(TimeoutError):
+            db.connect('postgresql://x')
+        held.close()
+        with db.connect('postgresql://x') as conn:
+            assert conn.raw.rollbacks == 1
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+趋势仓库批量补全测试
+"""
+
+import sys
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.core.models import RepoRecord
+from backend.scraper.crawlers.enrichment import RepoEnricher, build_batch_query
+
+
+def _graphql(query, variables):
+    data = {}
+    for key, owner in variables.items():
+        if not key.startswith('o'):
+            continue
+        index = key[1:]
+        name = variables[f"n{index}"]
+        if name == 'gone':
+            data[f"r{index}"] = None
+            continue
+        data[f"r{index}"] = {
+            'databaseId': 1000 + int(index),
+            'createdAt': '2020-01-01T00:00:00Z',
+            'updatedAt': '2025-01-01T00:00:00Z',
+            'pushedAt': '2025-01-02T00:00:00Z',
+            'licenseInfo': {'spdxId': 'MIT'},
+            'repositoryTopics': {'nodes': [{'topic': {'name': f"{owner}-topic"}}]},
+            'issues': {'totalCount': 7},
+        }
+    return data
+
+
+def _records(*full_names):
+    return [RepoRecord(full_name=n, owner=n.split('/')[0], name=n.split('/')[1], id=1, created_at='now')
+            for n in full_names]
+
+
+class TestRepoEnricher:
+    """测试批量补全"""
+
+    def test_batch_query_uses_variables(self):
+        """测试仓库名通过变量传入查询"""
+        query, variables = build_batch_query(['a/b', 'c/d"x'])
+        assert 'r1: repository(owner: $o1, name: $n1)' in query
+        assert variables == {'o0': 'a', 'n0': 'b', 'o1': 'c', 'n1': 'd"x'}
+
+    def test_enriches_in_batches_and_caches(self, tmp_path):
+        """测试分批查询、补全字段并跨调用缓存"""
+        api_client = Mock()
+        api_client.graphql.side_effect = _graphql
+        enricher = RepoEnricher(api_client, cache_path=tmp_path / 'enrichment.json', batch_size=2)
+
+        daily = _records('a/one', 'b/two', 'c/gone')
+        assert enricher.enrich(daily) == 2
+        assert api_client.graphql.call_count == 2
+        assert daily[0].created_at == '2020-01-01T00:00:00Z'
+        assert daily[0].topics == ['a-topic'] and daily[0].license == 'MIT'
+        assert daily[2].id == 1
+
+        # 其他时间段（以及新进程）直接命中缓存
+        weekly = _records('b/two', 'c/gone')
+        reloaded = RepoEnricher(api_client, cache_path=tmp_path / 'enrichment.json', batch_size=2)
+        assert reloaded.enrich(weekly) == 1
+        assert api_client.graphql.call_count == 2
+        assert weekly[0].id == daily[1].id
+
+    def test_unavailable_api_leaves_records(self, tmp_path):
+        """测试 GraphQL 不可用时保留原记录并停止查询"""
+        api_client = Mock()
+        api_client.graphql.return_value = None
+        enricher = RepoEnricher(api_client, cache_path=tmp_path / 'enrichment.json', batch_size=1)
+
+        records = _records('a/one', 'b/two')
+        assert enricher.enrich(records) == 0
+        assert api_client.graphql.call_count == 1
+        assert records[0].created_at == 'now'
+
+    def test_deadline_stops_queries(self, tmp_path):
+        """测试截止时间到达后不再发出查询，已过期时不修改记录"""
+        api_client = Mock()
+        api_client.graphql.side_effect = _graphql
+        enricher = RepoEnricher(api_client, cache_path=tmp_path / 'enrichment.json', batch_size=1)
+
+        records = _records('a/one', 'b/two')
+        assert enricher.enrich(records, deadline=time.monotonic() - 1) == 0
+        assert api_client.graphql.call_count == 0
+        assert records[0].id == 1 and records[0].created_at == 'now'
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+主机访问预算测试
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.core.host_budget import HostBudget
+
+
+class TestHostBudget:
+    """测试主机访问预算"""
+
+    def _run(self, budget, workers, hold=0.02):
+        active = []
+        peak = [0]
+        starts = []
+        lock = threading.Lock()
+
+        def worker():
+            with budget.slot():
+                with lock:
+                    active.append(1)
+                    starts.append(time.monotonic())
+                    peak[0] = max(peak[0], len(active))
+                time.sleep(hold)
+                with lock:
+                    active.pop()
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return peak[0], sorted(starts)
+
+    def test_limits_concurrency(self):
+        """测试并发数不超过上限"""
+        peak, _ = self._run(HostBudget(max_concurrent=3, min_interval=0), workers=12)
+        assert 1 <= peak <= 3
+
+    def test_spaces_request_starts(self):
+        """测试相邻请求开始时间满足最小间隔"""
+        budget = HostBudget(max_concurrent=4, min_interval=0.02)
+        _, starts = self._run(budget, workers=5, hold=0)
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        assert min(gaps) >= 0.015
+        assert budget.stats()['requests'] == 5
+
+    def test_aimd_window(self):
+        """测试限流时窗口减半并冷却，成功后逐步恢复"""
+        budget = HostBudget(max_concurrent=8, min_interval=0)
+        budget.on_throttle(retry_after=0.05)
+        assert budget.stats()['concurrency'] == 4
+        assert budget.cooldown_remaining() > 0
+
+        started = time.monotonic()
+        with budget.slot():
+            pass
+        assert time.monotonic() - started >= 0.04
+
+        for _ in range(40):
+            budget.on_success()
+        assert budget.stats()['concurrency'] == 8
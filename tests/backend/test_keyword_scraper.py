@@ -8,6 +8,7 @@ GitHub 爬虫系统测试（重构后版本）
 import pytest
 import os
 import sys
+import json
 import asyncio
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
@@ -23,6 +24,7 @@ try:
     from backend.scraper.core.token_manager import GitHubTokenManager
     from backend.scraper.core.api_client import GitHubAPIClient
     from backend.scraper.crawlers.keyword_scraper import KeywordScraper
+    from backend.scraper.core.models import RepoRecord
     from backend.scraper.analyzers.code_analyzer import CodeAnalyzer
 except ImportError as e:
     pytest.skip(f"无法导入模块: {e}", allow_module_level=True)
@@ -199,21 +201,22 @@ class TestKeywordScraper:
         assert processed['owner'] == 'user'
         assert 'scraped_at' in processed
 
-    def test_save_results(self):
+    def test_save_results(self, tmp_path):
         """测试保存结果"""
         test_results = [
             {'name': 'repo1', 'stars': 100},
             {'name': 'repo2', 'stars': 200}
         ]
 
-        with patch('pathlib.Path.mkdir'), \
-             patch('builtins.open', create=True) as mock_open:
-            
-            mock_file = MagicMock()
-            mock_open.return_value.__enter__.return_value = mock_file
+        output_dir = tmp_path / 'test_output'
+        result = self.scraper.save_results(test_results, 'python', str(output_dir))
+        assert result is True
 
-            result = self.scraper.save_results(test_results, 'python', 'test_output')
-            assert result is True
+        saved_files = list(output_dir.glob('python_*.json'))
+        assert len(saved_files) == 1
+        assert json.loads(saved_files[0].read_text(encoding='utf-8')) == test_results
+        # 原子写入不应残留临时文件
+        assert not list(output_dir.glob('.*.tmp'))
 
 
 class TestCodeAnalyzer:
@@ -299,6 +302,233 @@ function App() {
                 assert result['file_count'] > 0
 
 
+class TestConcurrentKeywords:
+    """测试多关键词并发爬取"""
+
+    def test_crawl_keywords_shares_extra_info(self, tmp_path, monkeypatch):
+        """测试多个关键词并发爬取时结果按顺序返回，同一仓库的额外信息只请求一次"""
+        from backend.scraper.storage.velocity_index import VelocityIndex
+
+        monkeypatch.setenv('CODE_ANALYSIS_LIMIT', '-1')
+        scraper = KeywordScraper()
+        scraper.velocity = VelocityIndex(tmp_path)
+        item = {'id': 1, 'name': 'shared', 'full_name': 'user/shared', 'owner': {'login': 'user'},
+                'stargazers_count': 10}
+
+        with patch.object(scraper.api_client, 'search_repositories', return_value={'items': [item]}), \
+             patch.object(scraper.api_client, 'get_repository_languages', return_value={'Python': 1}) as mock_languages, \
+             patch.object(scraper.api_client, 'get_repository_topics', return_value=['web']), \
+             patch.object(scraper, 'save_results'), \
+             patch.object(scraper, '_generate_analysis_file'):
+            results = asyncio.run(scraper.crawl_keywords(['a', 'b', 'c'], concurrency=2))
+
+        assert [r['keyword'] for r in results] == ['a', 'b', 'c']
+        assert all(r['repositories'][0]['topics'] == ['web'] for r in results)
+        assert mock_languages.call_count == 1
+
+    def test_search_pages_fetched_and_deduplicated(self):
+        """测试翻页请求按结果总数并发发出，跨页重复的仓库只保留一份"""
+        scraper = KeywordScraper()
+
+        def search(query, sort, order, per_page, page):
+            ids = {1: [1, 2], 2: [2, 3], 3: [4, 5]}[page]
+            items = [{'id': i, 'name': f"r{i}", 'full_name': f"u/r{i}", 'owner': {'login': 'u'}} for i in ids]
+            return {'total_count': 250, 'items': items}
+
+        with patch.object(scraper.api_client, 'search_repositories', side_effect=search) as mock_search:
+            records = scraper._search_repositories_sync('python language:go', 250)
+
+        assert mock_search.call_count == 3
+        assert [r.id for r in records] == [1, 2, 3, 4, 5]
+
+    def test_incremental_skips_unchanged_repositories(self, monkeypatch):
+        """测试增量模式下 pushed_at 未变化的仓库不再补全，沿用上次的结果，但仍以新的星数入库"""
+        import datetime
+        import backend.scraper.crawlers.keyword_scraper as module
+
+        monkeypatch.setattr(module, 'DB_AVAILABLE', True)
+        monkeypatch.setenv('CODE_ANALYSIS_LIMIT', '-1')
+        scraper = KeywordScraper()
+        items = [{'id': i, 'name': f"r{i}", 'full_name': f"u/r{i}", 'owner': {'login': 'u'},
+                  'stargazers_count': 10 * i, 'pushed_at': '2025-01-01T00:00:00Z'} for i in (1, 2, 3)]
+        pushed_at = module._as_utc('2025-01-01T00:00:00+00:00')
+        analyzed_at = datetime.datetime(2025, 1, 2)
+        stored = {
+            'u/r1': {'pushed_at': pushed_at, 'code_files': 0, 'analyzed_at': None},
+            # 有新提交的仓库重新补全
+            'u/r2': {'pushed_at': module._as_utc('2024-12-01T00:00:00+00:00'), 'code_files': 0, 'analyzed_at': None},
+            'u/r3': {'pushed_at': pushed_at, 'code_files': 4, 'analyzed_at': analyzed_at},
+        }
+        previous = {'u/r1': {'full_name': 'u/r1', 'languages': {'Go': 1}, 'topics': ['cli'],
+                             'code_analysis_summary': {'analyzed_files': 2}}}
+        saved = []
+
+        with patch.object(scraper.api_client, 'search_repositories', return_value={'items': items}), \
+             patch.object(scraper, '_load_stored_state', return_value=stored), \
+             patch.object(scraper, '_load_previous_results', return_value=previous), \
+             patch.object(scraper, '_save_to_database', side_effect=lambda batch, *a, **k: saved.extend(batch)), \
+             patch.object(scraper, '_report_progress_sync'), \
+             patch.object(scraper, '_process_repository_data', wraps=scraper._process_repository_data) as mock_process, \
+             patch.object(scraper.api_client, 'get_repository_languages', return_value={}), \
+             patch.object(scraper.api_client, 'get_repository_topics', return_value=[]):
+            records = scraper._run_pipeline('k', [('k', 10)], 1, 10, incremental=True)
+
+        assert [r.full_name for r in records] == ['u/r1', 'u/r2', 'u/r3']
+        assert sorted(r.full_name for r in saved) == ['u/r1', 'u/r2', 'u/r3']
+        # 只有星数变化的仓库不重新补全，入库时写入本次搜索到的星数
+        assert {r.full_name: r.stargazers_count for r in saved} == {'u/r1': 10, 'u/r2': 20, 'u/r3': 30}
+        assert [call.args[0].full_name for call in mock_process.call_args_list] == ['u/r2']
+        assert (records[0].languages, records[0].topics) == ({'Go': 1}, ['cli'])
+        assert records[0].code_analysis_summary == {'analyzed_files': 2}
+        assert records[2].code_analysis_summary == {
+            'analyzed_files': 4, 'languages_found': [], 'analyzed_at': '2025-01-02T00:00:00'
+        }
+
+    def test_previous_results_file(self, tmp_path):
+        """测试只读取同一关键词最近一次的结果文件"""
+        from backend.scraper.core.serializer import write_json
+
+        scraper = KeywordScraper()
+        write_json(tmp_path / 'react_20250101_000000.json', [{'full_name': 'u/old'}])
+        write_json(tmp_path / 'react_20250102_000000.json', [{'full_name': 'u/new', 'languages': {'JS': 1}}])
+        write_json(tmp_path / 'react-native_20250103_000000.json', [{'full_name': 'u/other'}])
+
+        assert list(scraper._load_previous_results('react', str(tmp_path))) == ['u/new']
+        assert scraper._load_previous_results('vue', str(tmp_path)) == {}
+
+    def test_analyze_stage_runs_without_event_loop(self, monkeypatch):
+        """测试代码分析阶段在工作线程中同步执行，不为每个仓库调用 asyncio.run"""
+        import base64
+        import backend.scraper.crawlers.keyword_scraper as module
+
+        monkeypatch.setenv('CODE_ANALYSIS_LIMIT', '10')
+        scraper = KeywordScraper()
+        items = [{'id': 1, 'name': 'r1', 'full_name': 'u/r1', 'owner': {'login': 'u'}}]
+        source = {'content': base64.b64encode(b'import os\n').decode('ascii')}
+
+        def contents(owner, name, path=''):
+            return source if path else [{'type': 'file', 'name': 'main.py', 'path': 'main.py'}]
+
+        with patch.object(scraper.api_client, 'search_repositories', return_value={'items': items}), \
+             patch.object(scraper.api_client, 'get_repository_languages', return_value={}), \
+             patch.object(scraper.api_client, 'get_repository_topics', return_value=[]), \
+             patch.object(scraper.api_client, 'get_repository_contents', side_effect=contents), \
+             patch.object(module.asyncio, 'run', side_effect=AssertionError('asyncio.run')):
+            records = scraper._run_pipeline('k', [('k', 10)], None, 10)
+
+        assert records[0].code_analysis_summary['analyzed_files'] == 1
+
+    def test_rerun_skips_completed_api_calls(self, tmp_path, monkeypatch):
+        """测试中断后重新运行同一任务时，已完成的搜索页和补全不再请求 API"""
+        import backend.scraper.crawlers.keyword_scraper as module
+
+        monkeypatch.setenv('CODE_ANALYSIS_LIMIT', '-1')
+        items = [{'id': i, 'name': f"r{i}", 'full_name': f"u/r{i}", 'owner': {'login': 'u'}} for i in (1, 2)]
+
+        first = KeywordScraper()
+        first.checkpoint = module.CrawlCheckpoint(7, tmp_path)
+        with patch.object(first.api_client, 'search_repositories', return_value={'total_count': 2, 'items': items}), \
+             patch.object(first.api_client, 'get_repository_languages', return_value={'Go': 1}), \
+             patch.object(first.api_client, 'get_repository_topics', return_value=['cli']):
+            first._run_pipeline('k', [('k', 10)], None, 10)
+
+        rerun = KeywordScraper()
+        rerun.checkpoint = module.CrawlCheckpoint(7, tmp_path)
+        with patch.object(rerun.api_client, 'search_repositories') as mock_search, \
+             patch.object(rerun.api_client, 'get_repository_languages') as mock_languages:
+            records = rerun._run_pipeline('k', [('k', 10)], None, 10)
+
+        assert mock_search.call_count == 0
+        assert mock_languages.call_count == 0
+        assert [(r.full_name, r.languages, r.topics) for r in records] == [
+            ('u/r1', {'Go': 1}, ['cli']), ('u/r2', {'Go': 1}, ['cli'])
+        ]
+
+
+@pytest.fixture
+def fake_psycopg2(monkeypatch):
+    """用记录调用的假 psycopg2.extras.execute_values 代替数据库驱动
+
+    返回的对象中 calls 记录每次调用的 (sql, rows)；设置 fail(rows) 返回 True 时该次调用抛出异常。
+    fetch 时按行号返回 (100 + i, full_name)。
+    """
+    import types
+    import backend.scraper.crawlers.keyword_scraper as module
+
+    fake = types.SimpleNamespace(calls=[], fail=None)
+
+    def execute_values(cursor, sql, rows, page_size=100, fetch=False):
+        rows = list(rows)
+        if fake.fail is not None and fake.fail(rows):
+            raise ValueError('bad row')
+        fake.calls.append((sql, rows))
+        if fetch:
+            return [(100 + i, row[1]) for i, row in enumerate(rows)]
+
+    fake.extras = types.SimpleNamespace(execute_values=execute_values)
+    monkeypatch.setattr(module, 'psycopg2', fake, raising=False)
+    monkeypatch.setattr(module, 'DB_AVAILABLE', True)
+    return fake
+
+
+class TestBulkSave:
+    """测试批量入库"""
+
+    def test_save_to_database_uses_bulk_statements(self, fake_psycopg2):
+        """测试一批仓库只需固定几次数据库往返，返回的 ID 记入内存映射"""
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        cursor.fetchone.return_value = (7,)
+        scraper = KeywordScraper()
+        repos = [RepoRecord.from_api({'id': i, 'full_name': f"u/r{i}", 'html_url': 'x'}, 'k') for i in range(1000)]
+        repos.append(repos[0])
+
+        with patch.object(scraper, '_get_db_connection', return_value=conn):
+            scraper._save_to_database(repos, 'k', task_id=1)
+
+        calls = fake_psycopg2.calls
+        assert cursor.execute.call_count == 2  # 关键词 + 任务总数
+        assert len(calls) == 2
+        assert len(calls[0][1]) == 1000
+        assert calls[1][1][0][:2] == (100, 7)
+        assert scraper._repo_ids['u/r999'] == 1099
+        conn.commit.assert_called_once()
+
+    def test_save_to_database_falls_back_to_rows(self, fake_psycopg2):
+        """测试批量语句失败时逐行写入，只跳过出错的仓库"""
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        cursor.fetchone.return_value = (7,)
+        fake_psycopg2.fail = lambda rows: any(len(row) > 3 and row[1] == 'u/r1' for row in rows)
+        scraper = KeywordScraper()
+        repos = [RepoRecord.from_api({'id': i, 'full_name': f"u/r{i}", 'html_url': 'x'}, 'k') for i in range(3)]
+
+        with patch.object(scraper, '_get_db_connection', return_value=conn):
+            scraper._save_to_database(repos, 'k', task_id=1)
+
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        assert statements.count('SAVEPOINT repository_row') == 3
+        assert statements.count('ROLLBACK TO SAVEPOINT repository_row') == 1
+        assert sorted(scraper._repo_ids) == ['u/r0', 'u/r2']
+        conn.rollback.assert_called_once()
+        conn.commit.assert_called_once()
+
+    def test_code_files_single_statement_with_known_repo_id(self, fake_psycopg2):
+        """测试一个仓库的代码文件只用一条语句写入，仓库 ID 取自内存映射而不再查询"""
+        conn = MagicMock()
+        scraper = KeywordScraper()
+        scraper._repo_ids['u/r'] = 42
+        files = [{'filename': f"f{i}.py", 'path': f"src/f{i}.py", 'imports': ['os']} for i in range(300)]
+
+        with patch.object(scraper, '_get_db_connection', return_value=conn):
+            scraper._save_code_analysis_to_db({'full_name': 'u/r'}, {'file_analysis': files + files[:1]})
+
+        calls = fake_psycopg2.calls
+        conn.cursor.return_value.execute.assert_not_called()
+        assert len(calls) == 1 and len(calls[0][1]) == 300
+        assert calls[0][1][0][2] == 42
+
+
 @pytest.mark.integration
 class TestIntegration:
     """集成测试"""
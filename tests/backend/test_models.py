@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+仓库记录模型测试
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.core import serializer
+from backend.scraper.core.models import RepoRecord, records_to_dicts
+
+API_ITEM = {
+    'id': 1,
+    'node_id': 'MDEwOlJlcG9zaXRvcnkx',
+    'name': 'test-repo',
+    'full_name': 'user/test-repo',
+    'owner': {'login': 'user', 'id': 7, 'avatar_url': 'https://example.com/a.png'},
+    'description': 'Test repository',
+    'html_url': 'https://github.com/user/test-repo',
+    'language': 'Python',
+    'stargazers_count': 100,
+    'forks_count': 10,
+    'watchers_count': 50,
+    'size': 1000,
+    'license': {'key': 'mit', 'spdx_id': 'MIT'},
+    'created_at': '2023-01-01T00:00:00Z',
+    'updated_at': '2023-12-01T00:00:00Z',
+    'pushed_at': '2023-12-01T00:00:00Z'
+}
+
+
+class TestRepoRecord:
+    """测试仓库记录"""
+
+    def test_from_api_keeps_used_fields(self):
+        """测试只解码使用到的字段"""
+        record = RepoRecord.from_api(API_ITEM, keyword='python')
+        assert record.owner == 'user'
+        assert record.license == 'MIT'
+        assert record.keyword == 'python'
+        assert 'node_id' not in record
+        assert not hasattr(record, '__dict__')
+
+    def test_mapping_access(self):
+        """测试兼容原有字典访问方式"""
+        record = RepoRecord.from_api(API_ITEM)
+        record['code_analysis_summary'] = {'analyzed_files': 3}
+        assert record['full_name'] == 'user/test-repo'
+        assert record.get('topics', []) == []
+        assert record.get('missing', 'x') == 'x'
+        assert record.to_dict()['code_analysis_summary'] == {'analyzed_files': 3}
+        assert 'topics' not in record.to_dict()
+
+    def test_contains_matches_to_dict(self):
+        """测试 in 与 to_dict() 一致：可选字段为空时不存在"""
+        record = RepoRecord.from_api(API_ITEM)
+        assert 'full_name' in record and 'description' in record
+        assert 'languages' not in record and 'topics' not in record
+        record['languages'] = {'Python': 100}
+        assert 'languages' in record
+        assert [key for key in RepoRecord.OPTIONAL_FIELDS if key in record] == \
+            [key for key in RepoRecord.OPTIONAL_FIELDS if key in record.to_dict()]
+
+    def test_trending_formats(self):
+        """测试 Trending 文件与前端 API 两种输出格式"""
+        record = RepoRecord.from_api(API_ITEM)
+        item = record.to_trending_item()
+        assert item['owner'] == {'login': 'user', 'avatar_url': 'https://github.com/user.png'}
+        assert item['stargazers_count'] == 100
+
+        formatted = RepoRecord.from_api(item).to_trending_dict('daily')
+        assert formatted['fullName'] == 'user/test-repo'
+        assert formatted['owner'] == 'user'
+        assert formatted['trendPeriod'] == 'daily'
+
+    def test_serialized_at_output_boundary(self):
+        """测试序列化层在输出边界把记录转换为字典"""
+        record = RepoRecord.from_api(API_ITEM, keyword='python')
+        assert serializer.loads(serializer.dumps([record])) == records_to_dicts([record])
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+多阶段流水线测试
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.core.pipeline import Pipeline
+
+
+class TestPipeline:
+    """测试流水线"""
+
+    def test_stages_fan_out_batch_and_drop(self):
+        """测试展开、丢弃、分批和出错的条目都被正确统计"""
+        batches = []
+
+        def persist(batch):
+            batches.append(len(batch))
+            return batch
+
+        def check(n):
+            if n == 13:
+                raise ValueError("bad item")
+            return None if n % 2 else n
+
+        pipeline = (
+            Pipeline('test')
+            .add_stage('expand', lambda n: range(n * 10, n * 10 + 10), workers=2, fan_out=True)
+            .add_stage('filter', check, workers=3, queue_size=4)
+            .add_stage('persist', persist, batch_size=8, batch_timeout=0.05)
+        )
+        results = pipeline.run([0, 1, 2])
+
+        assert sorted(results) == list(range(0, 30, 2))
+        assert max(batches) <= 8
+        metrics = pipeline.metrics()
+        assert metrics['expand']['emitted'] == 30
+        assert metrics['filter']['processed'] == 30
+        assert metrics['filter']['errors'] == 1
+        assert metrics['filter']['max_queue_depth'] <= 4
+        assert metrics['persist']['processed'] == 15
+
+    def test_downstream_starts_before_upstream_finishes(self):
+        """测试条目完成上游处理后立即流向下游，而不是等待整个阶段结束"""
+        first_downstream = threading.Event()
+
+        def slow_source(n):
+            if n == 1:
+                # 第二个条目要等到第一个条目已到达下游才完成
+                assert first_downstream.wait(2)
+            return n
+
+        def sink(n):
+            first_downstream.set()
+            return n
+
+        pipeline = Pipeline('stream').add_stage('source', slow_source).add_stage('sink', sink)
+        started = time.monotonic()
+        assert pipeline.run([0, 1]) == [0, 1]
+        assert time.monotonic() - started < 2
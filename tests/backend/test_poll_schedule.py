@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Trending 自适应轮询计划测试
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.storage.poll_schedule import PollSchedule
+
+HOUR = 3600
+
+
+class TestPollSchedule:
+    """测试轮询计划"""
+
+    def test_new_page_is_due(self, tmp_path):
+        """测试从未抓取的页面总是需要抓取"""
+        schedule = PollSchedule(tmp_path / 'schedule.json')
+        assert schedule.is_due('page', now=0)
+
+    def test_hot_and_cold_pages(self, tmp_path):
+        """测试经常变化的页面保持高频，很少变化的页面逐步放宽但不超过最大陈旧时间"""
+        schedule = PollSchedule(tmp_path / 'schedule.json', min_interval=HOUR, max_staleness=8 * HOUR)
+
+        now = 0
+        for _ in range(10):
+            schedule.record('hot', changed=True, now=now)
+            schedule.record('cold', changed=False, now=now)
+            now += HOUR
+
+        assert schedule.record('hot', changed=True, now=now) == HOUR
+        assert schedule.record('cold', changed=False, now=now) == 8 * HOUR
+        assert schedule.is_due('hot', now=now + HOUR)
+        assert not schedule.is_due('cold', now=now + 7 * HOUR)
+        assert schedule.is_due('cold', now=now + 8 * HOUR)
+
+    def test_learns_change_interval(self, tmp_path):
+        """测试轮询间隔跟随观测到的变化间隔，并能持久化"""
+        path = tmp_path / 'schedule.json'
+        schedule = PollSchedule(path, min_interval=HOUR, max_staleness=24 * HOUR)
+
+        for day in range(5):
+            schedule.record('daily', changed=True, now=day * 6 * HOUR)
+        schedule.save()
+
+        reloaded = PollSchedule(path, min_interval=HOUR, max_staleness=24 * HOUR)
+        assert not reloaded.is_due('daily', now=24 * HOUR + 2 * HOUR)
+        assert reloaded.is_due('daily', now=24 * HOUR + 3 * HOUR)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+进度推送中继测试
+"""
+
+import sys
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.core.progress_reporter import progress_payload
+from backend.scraper.core.serializer import loads
+from backend.scraper.scripts.progress_relay import ProgressRelay, make_handler
+
+
+class TestProgressRelay:
+    """测试进度广播"""
+
+    def test_fan_out_and_latest_state(self):
+        """测试更新按任务分发给订阅方，新订阅方先收到当前状态，慢速订阅方丢弃最旧的消息"""
+        relay = ProgressRelay(queue_size=2)
+        everything, _ = relay.subscribe()
+        only_two, _ = relay.subscribe(2)
+
+        for progress in (10, 20, 30):
+            relay.publish(loads(progress_payload(1, 'running', progress, 'x' * 1000)))
+        relay.publish(loads(progress_payload(2, 'running', 50)))
+
+        assert [everything.get_nowait()['progress'] for _ in range(2)] == [30, 50]
+        assert only_two.get_nowait()['id'] == 2 and only_two.empty()
+        assert relay.stats['dropped'] == 2
+        assert len(relay.subscribe(1)[0].get_nowait()['message']) == 200
+
+    def test_http_stream_closes_when_task_finishes(self):
+        """测试 HTTP 订阅以 NDJSON 推送单个任务的进度，任务结束后关闭"""
+        relay = ProgressRelay()
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(relay))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            relay.publish(loads(progress_payload(3, 'running', 40)))
+            response = urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/progress?task_id=3", timeout=5)
+            first = loads(response.readline())
+            relay.publish(loads(progress_payload(4, 'running', 1)))
+            relay.publish(loads(progress_payload(3, 'completed', 100, total_repositories=12)))
+            rest = [loads(line) for line in response.read().splitlines() if line.strip()]
+        finally:
+            server.shutdown()
+
+        assert first['progress'] == 40
+        assert [(u['id'], u['status'], u.get('total')) for u in rest] == [(3, 'completed', 12)]
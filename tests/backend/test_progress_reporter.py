@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+后台任务进度上报测试
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.core.progress_reporter import ProgressReporter
+
+
+class TestProgressReporter:
+    """测试进度合并写入"""
+
+    def test_ticks_coalesced_and_terminal_flushed(self):
+        """测试状态变化不等待写入间隔，高频进度只写入最新值，终态返回前已写入"""
+        writes = []
+
+        def writer(task_id, status, progress, message, total):
+            time.sleep(0.05)  # 模拟数据库往返
+            writes.append((task_id, status, progress, total))
+
+        reporter = ProgressReporter(writer, interval=60)
+        reporter.report(1, 'running', 0, '开始')
+        assert reporter.flush(timeout=2)
+        assert writes == [(1, 'running', 0, None)]
+
+        started = time.monotonic()
+        for progress in range(1, 100):
+            reporter.report(1, 'running', progress, f"{progress}%")
+        # 上报不等待数据库写入，写入间隔内的普通进度不落库
+        assert time.monotonic() - started < 0.5
+        assert len(writes) == 1
+
+        reporter.report(1, 'completed', 100, '完成', total_repositories=42)
+        assert writes == [(1, 'running', 0, None), (1, 'completed', 100, 42)]
+        assert reporter.stats['reported'] == 101
+        reporter.close()
+
+    def test_failed_terminal_update_retried_before_flush_returns(self):
+        """测试终态写入失败后保留重试，report / flush 返回前已写入"""
+        writes = []
+        failures = [RuntimeError('db down'), RuntimeError('db down')]
+
+        def writer(task_id, status, progress, message, total):
+            if failures:
+                raise failures.pop()
+            writes.append((task_id, status, total))
+
+        reporter = ProgressReporter(writer, interval=60, retry_delay=0.01)
+        reporter.report(7, 'completed', 100, '完成', total_repositories=3)
+        assert writes == [(7, 'completed', 3)]
+        assert reporter.stats['errors'] == 2 and reporter.stats['dropped'] == 0
+        reporter.close()
+
+    def test_writer_errors_give_up_after_max_attempts(self):
+        """测试一直写入失败时达到重试上限后放弃，flush 不会一直阻塞"""
+        def writer(*args):
+            raise RuntimeError('db down')
+
+        reporter = ProgressReporter(writer, interval=0.01, max_attempts=3, retry_delay=0.01)
+        reporter.report(7, 'failed', 0, 'boom')
+        assert reporter.flush(timeout=2)
+        assert reporter.stats['errors'] == 3 and reporter.stats['dropped'] == 1
+        reporter.close()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+趋势定时任务测试
+"""
+
+import sys
+import asyncio
+from unittest.mock import Mock, AsyncMock
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.core.models import RepoRecord
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    # 调度器模块导入时会在当前目录创建 scheduler.log
+    monkeypatch.chdir(tmp_path)
+    module = pytest.importorskip('backend.scraper.scheduler')
+
+    instance = module.TrendingScheduler.__new__(module.TrendingScheduler)
+    instance.scraper = Mock()
+    instance.scraper.trending_crawler.collect_trending = AsyncMock()
+    instance._save_trending_data = AsyncMock()
+    return instance
+
+
+class TestTrendingScheduler:
+    """测试定时任务只在页面变化时保存"""
+
+    def test_unchanged_pages_skip_save(self, scheduler):
+        """测试所有页面都未变化时不重写快照和趋势文件"""
+        repos = [RepoRecord(full_name='octo/hello', owner='octo', name='hello')]
+        scheduler.scraper.trending_crawler.collect_trending.return_value = (repos, False)
+
+        asyncio.run(scheduler.run_daily_job())
+
+        scheduler.scraper.trending_crawler.collect_trending.assert_awaited_once_with(period='daily')
+        scheduler._save_trending_data.assert_not_awaited()
+
+    def test_changed_pages_are_saved(self, scheduler):
+        """测试有页面变化时保存汇总结果"""
+        repos = [RepoRecord(full_name='octo/hello', owner='octo', name='hello')]
+        scheduler.scraper.trending_crawler.collect_trending.return_value = (repos, True)
+
+        asyncio.run(scheduler.run_weekly_job())
+
+        scheduler._save_trending_data.assert_awaited_once_with(repos, 'weekly')
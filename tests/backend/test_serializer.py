@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+JSON 序列化层测试
+"""
+
+import sys
+import json
+import datetime
+import threading
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.core import serializer
+
+BACKENDS = ['stdlib'] + (['orjson'] if serializer.ORJSON_AVAILABLE else [])
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    serializer.set_backend(request.param)
+    yield request.param
+    serializer._backend = None
+
+
+class TestSerializer:
+    """测试序列化层"""
+
+    def test_compact_by_default(self, backend, monkeypatch):
+        """测试默认紧凑输出且不转义中文"""
+        monkeypatch.delenv('SCRAPER_JSON_PRETTY', raising=False)
+        data = serializer.dumps({'名称': '仓库', 'stars': [1, 2]})
+        assert data == '{"名称":"仓库","stars":[1,2]}'.encode('utf-8')
+
+    def test_pretty_opt_in(self, backend):
+        """测试显式开启缩进"""
+        data = serializer.dumps({'a': 1}, pretty=True)
+        assert data.decode('utf-8') == '{\n  "a": 1\n}'
+
+    def test_datetime_and_set(self, backend):
+        """测试日期与集合的序列化"""
+        value = serializer.loads(serializer.dumps({
+            'at': datetime.datetime(2025, 1, 2, 3, 4, 5),
+            'tags': {'x'}
+        }))
+        assert value == {'at': '2025-01-02T03:04:05', 'tags': ['x']}
+
+    def test_write_json_atomic(self, backend, tmp_path):
+        """测试原子写入后内容完整且无临时文件残留"""
+        target = tmp_path / 'out.json'
+        target.write_text('old', encoding='utf-8')
+
+        serializer.write_json(target, {'items': list(range(5))})
+
+        assert json.loads(target.read_text(encoding='utf-8')) == {'items': [0, 1, 2, 3, 4]}
+        assert [p.name for p in tmp_path.iterdir()] == ['out.json']
+
+    def test_write_json_concurrent_threads(self, backend, tmp_path):
+        """测试同一进程的多个线程同时写同一文件时临时文件互不冲突"""
+        target = tmp_path / 'out.json'
+
+        def write(n):
+            for _ in range(20):
+                serializer.write_json(target, {'writer': n, 'items': list(range(100))})
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert json.loads(target.read_text(encoding='utf-8'))['writer'] in range(4)
+        assert [p.name for p in tmp_path.iterdir()] == ['out.json']
+
+    @pytest.mark.skipif(sys.platform == 'win32', reason='Windows 不支持 POSIX 权限位')
+    def test_write_json_file_mode(self, backend, tmp_path):
+        """测试新文件按 umask 设置权限（而不是 mkstemp 的 0600），已有文件保留原权限"""
+        created = tmp_path / 'new.json'
+        serializer.write_json(created, {'a': 1})
+        assert created.stat().st_mode & 0o777 == 0o666 & ~serializer._UMASK
+
+        existing = tmp_path / 'existing.json'
+        existing.write_text('old', encoding='utf-8')
+        existing.chmod(0o640)
+        serializer.write_json(existing, {'a': 2})
+        assert existing.stat().st_mode & 0o777 == 0o640
+
+    def test_jsonl_roundtrip(self, backend, tmp_path):
+        """测试 JSON Lines 追加与读取"""
+        target = tmp_path / 'log.jsonl'
+        serializer.append_jsonl(target, {'n': 1})
+        serializer.append_jsonl(target, {'n': 2})
+        with open(target, 'ab') as f:
+            f.write(b'{broken\n')
+
+        assert list(serializer.iter_jsonl(target)) == [{'n': 1}, {'n': 2}]
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+趋势快照存储测试
+"""
+
+import sys
+import datetime
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.storage.snapshot_store import SnapshotStore
+
+
+def _repo(name, stars, **extra):
+    item = {'full_name': name, 'name': name.split('/')[1], 'stargazers_count': stars, 'today_stars': 0}
+    item.update(extra)
+    return item
+
+
+def _snapshot(daily, weekly=None, run=0):
+    data = {'daily': daily, 'lastUpdated': f"2025-01-01T00:0{run}:00", 'metadata': {'run': run}}
+    if weekly is not None:
+        data['weekly'] = weekly
+    return data
+
+
+class TestSnapshotStore:
+    """测试快照存储"""
+
+    def test_roundtrip_with_deltas(self, tmp_path):
+        """测试进入/离开榜单、排名变化、星数和字段变化都能精确重建"""
+        store = SnapshotStore(tmp_path / 'snapshots')
+        snapshots = [
+            _snapshot([_repo('a/a', 10), _repo('b/b', 5), _repo('c/c', 3)], [_repo('w/w', 1)], run=0),
+            _snapshot([_repo('d/d', 50), _repo('a/a', 12, today_stars=2), _repo('c/c', 3, language='Go')], run=1),
+            _snapshot([_repo('c/c', 3, language='Go'), _repo('d/d', 51)], [_repo('x/x', 9), _repo('w/w', 2)], run=2),
+        ]
+        base = datetime.datetime(2025, 1, 1)
+        for i, snapshot in enumerate(snapshots):
+            store.append(snapshot, created_at=base + datetime.timedelta(hours=i))
+
+        entries = store.list_snapshots()
+        assert [e['type'] for e in entries] == ['keyframe', 'delta', 'delta']
+
+        # 第二个快照没有 weekly，沿用上一快照
+        assert store.reconstruct(entries[1]['id']) == dict(snapshots[1], weekly=snapshots[0]['weekly'])
+        assert store.reconstruct(entries[2]['id']) == snapshots[2]
+        # 只给日期时返回当天第一个快照
+        assert store.reconstruct('20250101') == snapshots[0]
+
+        # 新实例从磁盘恢复上一状态后继续写增量
+        reopened = SnapshotStore(tmp_path / 'snapshots')
+        reopened.append(snapshots[0], created_at=base + datetime.timedelta(hours=3))
+        assert reopened.reconstruct(reopened.list_snapshots()[-1]['id']) == snapshots[0]
+
+    def test_keyframe_interval_and_compact(self, tmp_path):
+        """测试按间隔写关键帧，压缩后较旧的快照每天只保留一个"""
+        store = SnapshotStore(tmp_path / 'snapshots', keyframe_interval=3)
+        base = datetime.datetime(2025, 1, 1)
+        for i in range(8):
+            created = base + datetime.timedelta(hours=6 * i)
+            store.append(_snapshot([_repo('a/a', i), _repo(f"n/{i}", 1)], run=i), created_at=created)
+
+        assert [e['type'] for e in store.list_snapshots()][:4] == ['keyframe', 'delta', 'delta', 'keyframe']
+
+        expected = store.reconstruct('20250102_180000')
+        result = store.compact(daily_after_days=1, now=datetime.datetime(2025, 1, 3))
+        assert result == {'before': 8, 'after': 5}
+        ids = [e['id'] for e in store.list_snapshots()]
+        assert ids == ['20250101_180000', '20250102_000000', '20250102_060000',
+                       '20250102_120000', '20250102_180000']
+        assert store.reconstruct('20250102_180000') == expected
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+分时间段趋势文件测试
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.storage.trend_files import TrendFileStore, language_slug
+
+
+def _repos(period, languages):
+    return [{'fullName': f"{period}/{i}", 'language': lang} for i, lang in enumerate(languages)]
+
+
+class TestTrendFileStore:
+    """测试趋势文件存储"""
+
+    def test_language_slug(self):
+        """测试语言名转换为文件名"""
+        assert language_slug('C++') == 'c-plus-plus'
+        assert language_slug('C#') == 'c-sharp'
+        assert language_slug('Jupyter Notebook') == 'jupyter-notebook'
+        assert language_slug(None) == 'unknown'
+
+    def test_concurrent_writers_keep_each_period(self, tmp_path):
+        """测试并发写入不同时间段时不会丢失对方的更新"""
+        store = TrendFileStore(tmp_path)
+        threads = [
+            threading.Thread(target=store.write_period, args=(period, _repos(period, ['Python', 'Go', None])))
+            for period in ('daily', 'weekly', 'monthly')
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        manifest = store.read_manifest()
+        assert manifest['version'] == 3
+        assert set(manifest['periods']) == {'daily', 'weekly', 'monthly'}
+        assert store.read_period('weekly')['repositories'] == _repos('weekly', ['Python', 'Go', None])
+        assert store.read_period('daily', 'python')['repositories'] == [{'fullName': 'daily/0', 'language': 'Python'}]
+
+    def test_rewrite_removes_stale_language_files(self, tmp_path):
+        """测试重写时间段后，不再出现的语言文件被删除，其他时间段不受影响"""
+        store = TrendFileStore(tmp_path)
+        store.write_period('daily', _repos('daily', ['Python', 'Rust']))
+        store.write_period('weekly', _repos('weekly', ['Rust']))
+        store.write_period('daily', _repos('daily', ['Python']))
+
+        assert not (tmp_path / 'daily' / 'rust.json').exists()
+        assert store.read_period('daily', 'Rust') is None
+        assert store.read_period('weekly', 'Rust')['repositories'] == _repos('weekly', ['Rust'])
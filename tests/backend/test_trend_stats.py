@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+趋势统计引擎测试
+"""
+
+import sys
+import random
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.analyzers.trend_stats import (
+    summarize_counts,
+    rank_percentiles,
+    calculate_trends,
+    calculate_code_statistics,
+)
+
+
+def _naive_percentile(value, sorted_values):
+    """原有实现：每次线性扫描"""
+    count_below = sum(1 for v in sorted_values if v < value)
+    count_equal = sum(1 for v in sorted_values if v == value)
+    return round((count_below + count_equal / 2) / len(sorted_values) * 100, 1)
+
+
+class TestTrendStats:
+    """测试趋势统计引擎"""
+
+    def test_percentiles_match_naive_implementation(self):
+        """测试百分位与逐个扫描的结果一致"""
+        rng = random.Random(42)
+        counts = {f'lib{i}': rng.randint(1, 50) for i in range(500)}
+        sorted_counts = sorted(counts.values())
+
+        percentiles = rank_percentiles(counts)
+        for name, count in counts.items():
+            assert percentiles[name] == _naive_percentile(count, sorted_counts)
+
+    def test_summary_quartiles(self):
+        """测试四分位数和异常值阈值"""
+        stats = summarize_counts([1, 2, 3, 4, 5, 6, 7, 100])
+        assert stats['count'] == 8
+        assert stats['median'] == 4.5
+        assert stats['q1'] == 3
+        assert stats['q3'] == 7
+        assert stats['iqr'] == 4
+        assert stats['outlier_upper'] == 13
+
+    def test_calculate_trends_flags_outliers(self):
+        """测试趋势判定和异常值标记"""
+        counts = {'a': 1, 'b': 2, 'c': 3, 'd': 4, 'e': 5, 'f': 6, 'g': 7, 'h': 100}
+        trends = calculate_trends(counts, category_fn=lambda name: 'other')
+
+        assert trends['h']['trend'] == 'up'
+        assert trends['h']['outlier'] is True
+        assert trends['a']['trend'] == 'down'
+        assert trends['d']['trend'] == 'stable'
+        assert trends['a']['category'] == 'other'
+
+    def test_code_statistics_only_details_top_items(self):
+        """测试统一统计只输出前 N 个条目的明细"""
+        libraries = {f'lib{i}': i for i in range(1, 1001)}
+        result = calculate_code_statistics(libraries, {}, {}, top_n=5)
+
+        assert result['packages'] == {}
+        assert result['libraries']['summary']['count'] == 1000
+        assert list(result['libraries']['top']) == ['lib1000', 'lib999', 'lib998', 'lib997', 'lib996']
+        assert result['libraries']['top']['lib1000']['percentile'] == 100.0
+
+    @pytest.mark.slow
+    def test_large_input(self):
+        """测试数万个不同导入的计算"""
+        rng = random.Random(0)
+        counts = {f'lib{i}': rng.randint(1, 10000) for i in range(50000)}
+        trends = calculate_trends(counts)
+        assert len(trends) == 50000
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+GitHub Trending HTML 爬虫测试
+"""
+
+import sys
+import time
+import asyncio
+from unittest.mock import Mock
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    from backend.scraper.core.models import RepoRecord
+    from backend.scraper.core.host_budget import HostBudget
+    from backend.scraper.crawlers.github_trending_html import GitHubTrendingHTMLCrawler
+    from backend.scraper.storage.page_cache import PageCache
+except ImportError as e:
+    pytest.skip(f"无法导入模块: {e}", allow_module_level=True)
+
+
+def _record(full_name, **fields):
+    owner, name = full_name.split('/')
+    return RepoRecord(full_name=full_name, owner=owner, name=name, **fields)
+
+
+class TestComprehensiveTrending:
+    """测试多来源趋势汇总"""
+
+    @pytest.fixture(autouse=True)
+    def setup_crawler(self, tmp_path):
+        self.api_client = Mock()
+        # GraphQL 不可用：补全阶段保留原记录
+        self.api_client.graphql.return_value = None
+        self.crawler = GitHubTrendingHTMLCrawler(
+            budget=HostBudget(max_concurrent=4, min_interval=0), api_client=self.api_client,
+            page_cache=PageCache(tmp_path / 'pages.json')
+        )
+
+    def test_merges_sources_and_dedupes(self):
+        """测试按来源顺序合并、按 full_name 去重并用搜索结果补全字段"""
+        pages = {
+            None: [_record('a/one', today_stars=5), _record('b/two')],
+            'python': [_record('b/two'), _record('c/three')],
+        }
+        self.crawler.fetch_scheduled = lambda period, lang=None: (pages.get(lang, []), True)
+        self.api_client.search_repositories.return_value = {'items': [
+            {'id': 42, 'full_name': 'a/one', 'owner': {'login': 'a'}, 'name': 'one',
+             'stargazers_count': 9, 'topics': ['x']},
+            {'id': 43, 'full_name': 'd/four', 'owner': {'login': 'd'}, 'name': 'four'},
+        ]}
+
+        repos = asyncio.run(self.crawler.get_comprehensive_trending('daily', languages=['python']))
+
+        assert [r.full_name for r in repos] == ['a/one', 'b/two', 'c/three', 'd/four']
+        assert repos[0].id == 42
+        assert repos[0].topics == ['x']
+        assert repos[0].today_stars == 5
+
+    def test_time_budget_drops_slow_sources(self):
+        """测试超出时间预算的来源被放弃"""
+        def fetch_scheduled(period, lang=None):
+            if lang == 'slow':
+                time.sleep(1)
+            return [_record(f"{lang or 'all'}/repo")], True
+
+        self.crawler.fetch_scheduled = fetch_scheduled
+        started = time.monotonic()
+        repos = asyncio.run(self.crawler.get_comprehensive_trending(
+            'weekly', languages=['slow'], time_budget=0.2, include_search=False
+        ))
+
+        assert time.monotonic() - started < 0.9
+        assert [r.full_name for r in repos] == ['all/repo']
+
+    def test_time_budget_covers_enrichment(self):
+        """测试补全只使用剩余的时间预算，超时返回未补全的结果"""
+        def graphql(query, variables):
+            time.sleep(1)
+            return {'r0': {'databaseId': 7}}
+
+        self.api_client.graphql.side_effect = graphql
+        self.crawler.fetch_scheduled = lambda period, lang=None: ([_record('a/one', id=-1)], True)
+        started = time.monotonic()
+        repos = asyncio.run(self.crawler.get_comprehensive_trending(
+            'weekly', languages=[], time_budget=0.3, include_search=False
+        ))
+
+        assert time.monotonic() - started < 0.9
+        assert [(r.full_name, r.id) for r in repos] == [('a/one', -1)]
+
+
+SAMPLE_PAGE = """
+<html><body><main>
+<article class="Box-row">
+  <h2 class="h3 lh-condensed"><a href="/octo/hello">
+    <span class="text-normal">octo /</span>
+    hello
+  </a></h2>
+  <p class="col-9 color-fg-muted my-1 pr-4">A <g-emoji>🚀</g-emoji> demo repo</p>
+  <div class="f6 color-fg-muted mt-2">
+    <span itemprop="programmingLanguage">Python</span>
+    <a class="Link--muted" href="/octo/hello/stargazers"> 1,234 </a>
+    <a class="Link--muted" href="/octo/hello/forks"> 56 </a>
+    <span class="d-inline-block float-sm-right">78 stars today</span>
+  </div>
+</article>
+<article class="Box-row">
+  <h2><a href="/acme/tool">acme / tool</a></h2>
+  <div><span>2.5k stars</span><span>3 forks</span></div>
+</article>
+<article class="Box-row"><h2>no link</h2></article>
+</main></body></html>
+"""
+
+
+def _comparable(records):
+    return [(r.full_name, r.description, r.language, r.stargazers_count, r.forks_count, r.today_stars)
+            for r in records]
+
+
+class TestTrendingParsers:
+    """测试各解析后端输出一致"""
+
+    EXPECTED = [
+        ('octo/hello', 'A🚀demo repo', 'Python', 1234, 56, 78),
+        ('acme/tool', '', '', 2500, 3, 0),
+    ]
+
+    @pytest.mark.parametrize('backend', ['selectolax', 'lxml', 'bs4'])
+    def test_backends_match(self, backend):
+        from backend.scraper.crawlers import trending_parsers
+        if not trending_parsers.AVAILABLE[backend]:
+            pytest.skip(f"{backend} 未安装")
+
+        records = trending_parsers.PARSERS[backend](SAMPLE_PAGE)
+        assert _comparable(records) == self.EXPECTED
+
+    def test_unenriched_fields(self):
+        """测试未补全的记录使用不会与真实仓库ID重合的负数临时ID，且不伪造创建/更新时间"""
+        from backend.scraper.crawlers import trending_parsers
+        backend = next((name for name, available in trending_parsers.AVAILABLE.items() if available), None)
+        if backend is None:
+            pytest.skip("没有可用的解析后端")
+
+        records = trending_parsers.PARSERS[backend](SAMPLE_PAGE)
+        assert all(r.id < 0 for r in records)
+        assert records[0].id == trending_parsers.stable_repo_id('Octo/Hello') != records[1].id
+        assert all(r.created_at is None and r.updated_at is None for r in records)
+
+
+class TestConditionalFetch:
+    """测试条件请求与内容哈希"""
+
+    def _response(self, status, text='', headers=None):
+        resp = Mock()
+        resp.status_code = status
+        resp.text = text
+        resp.headers = headers or {}
+        return resp
+
+    def test_304_and_hash_hit_skip_parsing(self, tmp_path):
+        """测试 304 和条目区块未变化时返回缓存结果且不重新解析"""
+        session = Mock()
+        crawler = GitHubTrendingHTMLCrawler(
+            session=session, budget=HostBudget(min_interval=0),
+            page_cache=PageCache(tmp_path / 'pages.json')
+        )
+        crawler._parse_html = Mock(return_value=[_record('octo/hello', today_stars=3)])
+
+        session.get.return_value = self._response(200, '<nav>a</nav>' + SAMPLE_PAGE, {'ETag': 'W/"v1"'})
+        items, changed = crawler.fetch_page('daily')
+        assert changed and [r.full_name for r in items] == ['octo/hello']
+
+        session.get.return_value = self._response(304)
+        items, changed = crawler.fetch_page('daily')
+        assert session.get.call_args.kwargs['headers']['If-None-Match'] == 'W/"v1"'
+        assert not changed and items[0].today_stars == 3
+
+        # 页头变化但条目区块相同
+        session.get.return_value = self._response(200, '<nav>b</nav>' + SAMPLE_PAGE)
+        items, changed = crawler.fetch_page('daily')
+        assert not changed and len(items) == 1
+        assert crawler._parse_html.call_count == 1
+
+        # 缓存已落盘，新实例可直接使用
+        assert PageCache(tmp_path / 'pages.json').records('https://github.com/trending?since=daily')
+
+    def test_throttled_page_is_requeued(self, tmp_path):
+        """测试 429 不阻塞事件循环，页面冷却后重新排队"""
+        session = Mock()
+        budget = HostBudget(min_interval=0)
+        crawler = GitHubTrendingHTMLCrawler(
+            session=session, budget=budget, page_cache=PageCache(tmp_path / 'pages.json')
+        )
+        crawler._parse_html = Mock(return_value=[_record('octo/hello')])
+        session.get.side_effect = [
+            self._response(429, headers={'Retry-After': '0.2'}),
+            self._response(200, SAMPLE_PAGE),
+        ]
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.ensure_future(ticker())
+            result = await crawler.collect_trending('daily', languages=[], include_search=False)
+            task.cancel()
+            return result, ticks
+
+        (repos, changed), ticks = asyncio.run(run())
+        assert [r.full_name for r in repos] == ['octo/hello'] and changed
+        assert ticks >= 10
+        assert budget.stats()['throttles'] == 1
+
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+库/包使用量历史测试
+"""
+
+import sys
+import datetime
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scraper.storage.usage_history import UsageHistoryStore
+
+
+class TestUsageHistoryStore:
+    """测试使用量历史存储"""
+
+    def test_growth_against_previous_bucket(self, tmp_path):
+        """测试与上一个时间桶比较得到真实增长率"""
+        store = UsageHistoryStore(base_dir=tmp_path)
+        day1 = datetime.datetime.now() - datetime.timedelta(days=2)
+        day2 = datetime.datetime.now() - datetime.timedelta(days=1)
+
+        store.record('react', {'axios': 10, 'lodash': 4}, {'npm': 5}, recorded_at=day1)
+        store.record('react', {'axios': 12, 'lodash': 4}, {'npm': 5}, recorded_at=day2)
+
+        trends = store.compute_trends('react', 'libraries', {'axios': 15, 'lodash': 2, 'zod': 6})
+        assert trends['axios']['growth'] == '+25%'
+        assert trends['axios']['trend'] == '上升'
+        assert trends['lodash']['trend'] == '下降'
+        assert trends['zod']['trend'] == '新兴'
+        assert trends['zod']['emerging'] is True
+        assert trends['axios']['moving_average'] == round((10 + 12 + 15) / 3, 2)
+
+    def test_same_bucket_keeps_last_record(self, tmp_path):
+        """测试同一时间桶内以最后一次记录为准"""
+        store = UsageHistoryStore(base_dir=tmp_path)
+        now = datetime.datetime.now()
+        store.record('vue', {'vuex': 3}, {}, recorded_at=now)
+        store.record('vue', {'vuex': 7}, {}, recorded_at=now)
+
+        history = store.get_history('vue', 'libraries', 'vuex')
+        assert history == [{'bucket': now.strftime('%Y-%m-%d'), 'count': 7}]
+
+    def test_state_rebuilt_from_log(self, tmp_path):
+        """测试状态文件丢失后从追加日志重建"""
+        store = UsageHistoryStore(base_dir=tmp_path, window=2)
+        base = datetime.datetime(2025, 1, 1)
+        for day, count in enumerate([1, 2, 3]):
+            store.record('go', {'gin': count}, {}, recorded_at=base + datetime.timedelta(days=day))
+
+        (tmp_path / 'go.state.json').unlink()
+        history = store.get_history('go', 'libraries', 'gin')
+        assert [h['count'] for h in history] == [2, 3]
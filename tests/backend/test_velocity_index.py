@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+星标速度索引测试
+"""
+
+import sys
+import time
+import datetime
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from backend.scraper.storage.velocity_index import VelocityIndex, LOG_BACKUPS
+
+HOUR = 3600
+
+
+class TestVelocityIndex:
+    """测试速度索引"""
+
+    def test_velocity_acceleration_and_rank(self, tmp_path):
+        """测试速度、加速度和排名变化随观测增量更新"""
+        index = VelocityIndex(tmp_path, half_life=1e-9)  # 不平滑，便于断言
+        index.observe('a/a', 100, today_stars=48, rank=5, period='daily', ts=0)
+        assert index.get('a/a')['velocity'] == 2.0
+
+        index.observe('a/a', 110, rank=3, period='daily', ts=HOUR)
+        index.observe('a/a', 140, rank=1, period='daily', ts=2 * HOUR)
+        state = index.get('a/a')
+        assert state['velocity'] == pytest.approx(30.0)
+        assert state['acceleration'] == pytest.approx(20.0)
+        assert state['rank_change']['daily'] == 2
+
+        # 比已有观测更旧的观测被忽略
+        index.observe('a/a', 90, ts=HOUR)
+        assert index.get('a/a')['stars'] == 140
+
+    def test_fastest_risers_and_persistence(self, tmp_path):
+        """测试上升最快查询和落盘后重新加载"""
+        index = VelocityIndex(tmp_path)
+        start = datetime.datetime.now().replace(microsecond=0) - datetime.timedelta(hours=3)
+        for hour in range(3):
+            scraped_at = (start + datetime.timedelta(hours=hour)).isoformat()
+            index.observe_records([
+                {'full_name': 'fast/repo', 'stargazers_count': 100 * hour, 'scraped_at': scraped_at},
+                {'full_name': 'slow/repo', 'stargazers_count': hour, 'scraped_at': scraped_at},
+            ], period='daily')
+        # 只观测过一次的仓库不参与排名
+        index.observe('new/repo', 10 ** 6)
+
+        risers = index.fastest_risers(limit=2)
+        assert [r['full_name'] for r in risers] == ['fast/repo', 'slow/repo']
+        with pytest.raises(ValueError):
+            index.fastest_risers(metric='rank_change')
+
+        index.save()
+        reloaded = VelocityIndex(tmp_path)
+        assert reloaded.get('fast/repo') is not None
+        assert reloaded.get('fast/repo') == index.get('fast/repo')
+        assert len((tmp_path / 'observations.jsonl').read_text().splitlines()) == 7
+
+    def test_save_merges_other_writers(self, tmp_path):
+        """测试两个实例交替保存时互不覆盖对方更新的仓库"""
+        now = time.time()
+        first = VelocityIndex(tmp_path)
+        second = VelocityIndex(tmp_path)
+        first.observe('a/a', 10, ts=now)
+        second.observe('b/b', 20, ts=now)
+        second.observe('a/a', 5, ts=now - HOUR)
+        first.save()
+        second.save()
+
+        reloaded = VelocityIndex(tmp_path)
+        assert reloaded.get('a/a')['stars'] == 10  # 保留较新的观测
+        assert reloaded.get('b/b')['stars'] == 20
+        assert second.get('a/a')['stars'] == 10
+        assert len((tmp_path / 'observations.jsonl').read_bytes().splitlines()) == 3
+
+    def test_prune_and_rotate(self, tmp_path):
+        """测试清理过期仓库和观测日志轮转"""
+        now = time.time()
+        index = VelocityIndex(tmp_path, retention_days=30, log_max_bytes=1)
+        index.observe('old/repo', 1, ts=now - 31 * 86400)
+        index.observe('new/repo', 1, ts=now)
+        index.save()
+        assert index.get('old/repo') is None and index.get('new/repo') is not None
+
+        for n in range(LOG_BACKUPS + 1):
+            index.observe('new/repo', n, ts=now + (n + 1) * HOUR)
+            index.save()
+        log = tmp_path / 'observations.jsonl'
+        assert len(log.read_bytes().splitlines()) == 1
+        assert sorted(p.name for p in tmp_path.glob('observations.jsonl.*')) == [
+            f"observations.jsonl.{n}" for n in range(1, LOG_BACKUPS + 1)
+        ]